@@ -0,0 +1,7 @@
+// Q10: Security Access Analysis - Point selection for M2 hybrid
+// Returns points of the zone's access points and equipment; events aggregated in TimescaleDB
+// Parameters: $ZONE_ID - zone to analyze
+
+MATCH (z:Node {id: '$ZONE_ID'})-[]->(n:Node)-[:HAS_POINT]->(p:Node {type: 'Point'})
+WHERE n.type IN ['AccessPoint', 'Equipment']
+RETURN DISTINCT p.id AS point_id;
@@ -0,0 +1,10 @@
+// Q11: IT Infrastructure Impact - Point selection for M2 hybrid
+// Returns temperature/humidity points of spaces hosting IT equipment
+// Parameter: $BUILDING_ID - building to analyze
+
+MATCH (sp:Node {type: 'Space', building_id: '$BUILDING_ID'})-[:CONTAINS]->(it:Node {type: 'Equipment'})
+WHERE toLower(it.name) =~ '.*(server|network|switch|router|ups).*'
+WITH DISTINCT sp
+MATCH (sp)-[:CONTAINS]->(:Node {type: 'Equipment'})-[:HAS_POINT]->(p:Node {type: 'Point'})
+WHERE p.quantity IN ['temperature', 'humidity']
+RETURN DISTINCT p.id AS point_id;
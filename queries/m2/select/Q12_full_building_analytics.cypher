@@ -0,0 +1,6 @@
+// Q12: Full Building Analytics - Point selection for M2 hybrid
+// Returns all point IDs of the building; KPIs aggregated in TimescaleDB
+// Parameters: $BUILDING_ID - building to analyze
+
+MATCH (p:Node {type: 'Point', building_id: '$BUILDING_ID'})
+RETURN p.id AS point_id;
@@ -0,0 +1,10 @@
+// Q13: Office Hours Comfort - Point selection for M2 hybrid
+// Returns thermostat setpoint and people counter points of matching spaces
+// Parameters: $SPACE_TYPE - space type pattern
+
+MATCH (sp:Node {type: 'Space'})<-[:LOCATED_IN]-(eq:Node {type: 'Equipment'})
+      -[:HAS_POINT]->(p:Node {type: 'Point'})
+WHERE sp.space_type STARTS WITH '$SPACE_TYPE'
+  AND ((eq.equipment_type = 'Thermostat' AND p.name CONTAINS 'setpoint')
+       OR (eq.equipment_type = 'PeopleCounter' AND p.name = 'occupancy_count'))
+RETURN DISTINCT p.id AS point_id;
@@ -0,0 +1,6 @@
+// Q7: Sensor Drift Detection - Point selection for M2 hybrid
+// Returns the building's point IDs; statistics computed in TimescaleDB
+// Parameters: $BUILDING_ID - building to analyze
+
+MATCH (p:Node {type: 'Point', building_id: '$BUILDING_ID'})
+RETURN p.id AS point_id;
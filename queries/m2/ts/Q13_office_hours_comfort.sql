@@ -14,6 +14,6 @@ FROM timeseries
 WHERE point_id = ANY($POINT_IDS)
   AND time >= '$DATE_START'::timestamptz
   AND time < '$DATE_END'::timestamptz
-  AND EXTRACT(HOUR FROM ts.time) BETWEEN 9 AND 17  -- Office hours (9h-17h)
+  AND EXTRACT(HOUR FROM time) BETWEEN 9 AND 17  -- Office hours (9h-17h)
 GROUP BY office_hour, point_id
 ORDER BY point_id;
@@ -1112,59 +1112,79 @@ def workflow_benchmark():
                 "responses": {},  # Store actual results for cross-engine validation
             }
             
+            # One warm connection per scenario@RAM (dataset info/templates cached for the run)
+            from basetype_benchmark.runner.session import ScenarioSession
+            session = ScenarioSession(scenario, selected_ds["path"])
+            try:
+                session.open()
+                log(f"Session {scenario} ouverte ({session.connect_s * 1000:.0f}ms)", "ok")
+            except Exception as e:
+                log(f"Échec connexion {scenario}: {e}", "error")
+
             print()
-            for q_idx, query in enumerate(queries, 1):
-                progress = progress_bar(q_idx, len(queries), width=30, prefix=f"  {scenario}@{ram_str} ")
-                print(f"\r{progress} {query}...", end="", flush=True)
+            try:
+                for q_idx, query in enumerate(queries, 1):
+                    progress = progress_bar(q_idx, len(queries), width=30, prefix=f"  {scenario}@{ram_str} ")
+                    print(f"\r{progress} {query}...", end="", flush=True)
 
-                try:
-                    # Reset peak RAM before each query for accurate per-query measurement
-                    for container in sc_info["containers"]:
-                        m = get_container_metrics(container)
-                        m.reset_peak()
+                    try:
+                        # Reset peak RAM before each query for accurate per-query measurement
+                        for container in sc_info["containers"]:
+                            m = get_container_metrics(container)
+                            m.reset_peak()
 
-                    # Small pause to let memory stabilize (GC, buffers)
-                    time.sleep(0.1)
+                        # Small pause to let memory stabilize (GC, buffers)
+                        time.sleep(0.1)
 
-                    # Capture metrics before query
-                    m_before = {c: get_container_metrics(c) for c in sc_info["containers"]}
+                        # Capture metrics before query
+                        m_before = {c: get_container_metrics(c) for c in sc_info["containers"]}
 
-                    row_count, latency_ms, rows_data = execute_query_for_scenario(
-                        scenario, query, selected_ds["path"], return_rows=True
-                    )
+                        row_count, latency_ms, rows_data = execute_query_for_scenario(
+                            scenario, query, selected_ds["path"], return_rows=True, session=session
+                        )
 
-                    # Capture metrics after query (peak is now query-specific)
-                    m_after = {c: get_container_metrics(c) for c in sc_info["containers"]}
-                    
-                    # Aggregate RAM across all containers (sum, not max)
-                    query_mem_mb = sum(m_after[c].memory_mb for c in sc_info["containers"])
-                    query_peak_mb = sum(m_after[c].memory_peak_mb for c in sc_info["containers"])
+                        # Capture metrics after query (peak is now query-specific)
+                        m_after = {c: get_container_metrics(c) for c in sc_info["containers"]}
                     
-                    # Per-container breakdown for detailed analysis
-                    mem_breakdown = {c: {
-                        "memory_mb": m_after[c].memory_mb,
-                        "peak_mb": m_after[c].memory_peak_mb,
-                    } for c in sc_info["containers"]}
+                        # Aggregate RAM across all containers (sum, not max)
+                        query_mem_mb = sum(m_after[c].memory_mb for c in sc_info["containers"])
+                        query_peak_mb = sum(m_after[c].memory_peak_mb for c in sc_info["containers"])
                     
-                    scenario_results["queries"][query] = {
-                        "row_count": row_count,
-                        "latency_ms": latency_ms,
-                        "memory_mb": query_mem_mb,
-                        "memory_peak_mb": query_peak_mb,
-                        "memory_by_container": mem_breakdown,
-                        "status": "ok"
-                    }
+                        # Per-container breakdown for detailed analysis
+                        mem_breakdown = {c: {
+                            "memory_mb": m_after[c].memory_mb,
+                            "peak_mb": m_after[c].memory_peak_mb,
+                        } for c in sc_info["containers"]}
                     
-                    # Store response fingerprint for cross-engine validation
-                    if rows_data:
-                        scenario_results["responses"][query] = {
+                        scenario_results["queries"][query] = {
                             "row_count": row_count,
-                            "sample": rows_data[:5] if len(rows_data) > 5 else rows_data,
-                            "hash": hash(str(sorted(str(r) for r in rows_data))) if rows_data else 0,
+                            "latency_ms": latency_ms,
+                            "memory_mb": query_mem_mb,
+                            "memory_peak_mb": query_peak_mb,
+                            "memory_by_container": mem_breakdown,
+                            "status": "ok"
                         }
+
+                        # M2/O2 : latence bout-en-bout (graphe + TimescaleDB), détail par étape
+                        timing = session.last_timing if session.hybrid is not None else None
+                        if timing is not None:
+                            scenario_results["queries"][query]["stages_ms"] = timing.stages()
+                            scenario_results["queries"][query]["point_ids"] = timing.n_point_ids
+                    
+                        # Store response fingerprint for cross-engine validation
+                        if rows_data:
+                            scenario_results["responses"][query] = {
+                                "row_count": row_count,
+                                "sample": rows_data[:5] if len(rows_data) > 5 else rows_data,
+                                "hash": hash(str(sorted(str(r) for r in rows_data))) if rows_data else 0,
+                            }
                     
-                except Exception as e:
-                    scenario_results["queries"][query] = {"error": str(e), "status": "error"}
+                    except Exception as e:
+                        scenario_results["queries"][query] = {"error": str(e), "status": "error"}
+
+            finally:
+                # Hand the warm connection(s) back even on Ctrl+C or errors
+                session.close()
             
             print(f"\r{progress_bar(len(queries), len(queries), width=30, prefix=f'  {scenario}@{ram_str} ')} Terminé")
             
@@ -1421,114 +1441,30 @@ def load_data_for_scenario(scenario: str, dataset_path: Path, ram_gb: int, graph
     return {"status": "unknown_scenario"}
 
 
-def execute_query_for_scenario(scenario: str, query: str, dataset_path: Path, return_rows: bool = False) -> tuple:
+def execute_query_for_scenario(
+    scenario: str,
+    query: str,
+    dataset_path: Path,
+    return_rows: bool = False,
+    session=None,
+) -> tuple:
     """Execute a query for a specific scenario.
-    
+
+    Args:
+        session: Optional open ScenarioSession. When provided, the warm
+                 connection and cached dataset info/templates are reused;
+                 otherwise a one-shot session is opened and closed.
+
     Returns:
-        If return_rows=False: (row_count, latency_ms)
-        If return_rows=True: (row_count, latency_ms, rows_data)
+        (row_count, latency_ms, rows_data) - rows_data is None unless return_rows=True
     """
-    from basetype_benchmark.runner.engines.postgres import PostgresEngine
-    from basetype_benchmark.runner.engines.memgraph import MemgraphEngine
-    from basetype_benchmark.runner.engines.oxigraph import OxigraphEngine
-    from basetype_benchmark.runner.params import (
-        extract_dataset_info_from_parquet,
-        extract_timeseries_range_from_parquet,
-        get_query_variants,
-        substitute_params,
-    )
-    
-    queries_dir = Path(__file__).parent / "queries"
-    parquet_dir = dataset_path / "parquet"
-    
-    # Extract dataset info for parameter substitution
-    dataset_info = extract_dataset_info_from_parquet(parquet_dir / "nodes.parquet")
-    ts_range = extract_timeseries_range_from_parquet(parquet_dir / "timeseries.parquet")
-    dataset_info.update(ts_range)
-    
-    # Get profile name from path
-    profile = dataset_path.name.split("_seed")[0] if "_seed" in dataset_path.name else "small-2d"
-    
-    # Generate one variant of parameters
-    variants = get_query_variants(query, profile, dataset_info, seed=42, scenario=scenario, n_variants=1)
-    params = variants[0] if variants else {}
-    
-    if scenario in ("P1", "P2"):
-        matches = list(queries_dir.glob(f"p1_p2/{query}_*.sql"))
-        if not matches:
-            raise FileNotFoundError(f"Query {query} not found for P1/P2")
-        query_text = matches[0].read_text()
-        
-        # Substitute params
-        query_text = substitute_params(query_text, params)
-        
-        # Remove comments
-        lines = [l for l in query_text.split("\n") if not l.strip().startswith("--")]
-        query_text = "\n".join(lines)
-        
-        engine = PostgresEngine(scenario)
-        engine.connect()
-        if return_rows:
-            rows, latency_ms = engine.execute_query_with_results(query_text)
-            engine.close()
-            return len(rows), latency_ms, rows
-        else:
-            row_count, latency_ms = engine.execute_query(query_text)
-            engine.close()
-            return row_count, latency_ms, None
-    
-    elif scenario in ("M1", "M2"):
-        query_dir = "m1" if scenario == "M1" else "m2/graph"
-        matches = list(queries_dir.glob(f"{query_dir}/{query}_*.cypher"))
-        if not matches:
-            raise FileNotFoundError(f"Query {query} not found for {scenario}")
-        query_text = matches[0].read_text()
-        
-        # Substitute params
-        query_text = substitute_params(query_text, params)
-        
-        # Remove comments
-        lines = [l for l in query_text.split("\n") if not l.strip().startswith("//")]
-        query_text = "\n".join(lines)
-        
-        engine = MemgraphEngine(scenario)
-        engine.connect()
-        if return_rows:
-            rows, latency_ms = engine.execute_query_with_results(query_text)
-            engine.close()
-            return len(rows), latency_ms, rows
-        else:
-            row_count, latency_ms = engine.execute_query(query_text)
-            engine.close()
-            return row_count, latency_ms, None
-    
-    elif scenario == "O2":
-        # O2 only (O1 removed from benchmark)
-        query_dir = "o2/graph"
-        matches = list(queries_dir.glob(f"{query_dir}/{query}_*.sparql"))
-        if not matches:
-            raise FileNotFoundError(f"Query {query} not found for {scenario}")
-        query_text = matches[0].read_text()
-        
-        # Substitute params
-        query_text = substitute_params(query_text, params)
-        
-        # Remove comments
-        lines = [l for l in query_text.split("\n") if not l.strip().startswith("#")]
-        query_text = "\n".join(lines)
-        
-        engine = OxigraphEngine(scenario)
-        engine.connect()
-        if return_rows:
-            rows, latency_ms = engine.execute_query_with_results(query_text)
-            engine.close()
-            return len(rows), latency_ms, rows
-        else:
-            row_count, latency_ms = engine.execute_query(query_text)
-            engine.close()
-            return row_count, latency_ms, None
-    
-    raise ValueError(f"Unknown scenario: {scenario}")
+    from basetype_benchmark.runner.session import ScenarioSession
+
+    if session is not None:
+        return session.execute(query, return_rows=return_rows)
+
+    with ScenarioSession(scenario, dataset_path) as one_shot:
+        return one_shot.execute(query, return_rows=return_rows)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
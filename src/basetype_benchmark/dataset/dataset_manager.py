@@ -113,7 +113,7 @@ class DatasetManager:
             formats: Liste des formats d'export (None = tous)
                     Options: 'parquet', 'postgresql', 'postgresql_jsonb',
                              'memgraph', 'memgraph_m1', 'oxigraph', 'oxigraph_o1'
-            n_workers: Number of worker processes (for mode='parallel' only)
+            n_workers: Number of worker processes (parallel mode or sharded vectorized)
             mode: Simulation mode:
                 - "vectorized": NumPy vectorized (100-500x faster, RECOMMENDED)
                 - "sequential": Original Python step-by-step
@@ -479,7 +479,7 @@ class DatasetManager:
         Args:
             profile_name: Nom du profil
             seed: Graine
-            n_workers: Number of worker processes (for mode='parallel' only)
+            n_workers: Number of worker processes (parallel mode or sharded vectorized)
             mode: Simulation mode:
                 - "vectorized": NumPy vectorized (100-500x faster, RECOMMENDED)
                 - "sequential": Original Python step-by-step
@@ -11,17 +11,24 @@ Exports the generated dataset to:
 
 import hashlib
 import json
+import os
+import re
+import shutil
 import statistics
 import sys
 import tempfile
 import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 
@@ -124,6 +131,121 @@ def generate_daily_chunks(
         )
 
 
+# Rows per Arrow batch when building daily chunks from timeseries.parquet
+CHUNK_EXPORT_BATCH_ROWS = int(os.getenv("BTB_CHUNK_EXPORT_BATCH_ROWS", "1000000"))
+
+_US_PER_DAY = 86_400_000_000
+
+# json.dumps spelling of non-finite floats
+_JSON_NON_FINITE = {"nan": "NaN", "inf": "Infinity", "-inf": "-Infinity"}
+
+
+def _json_numbers(values: pa.Array) -> pa.Array:
+    """JSON number text of a float column (same float64 as json.dumps once parsed).
+
+    Arrow writes the shortest round-trip form; integral values get '.0' so
+    that they still load as floats.
+    """
+    text = pc.cast(pc.cast(values, pa.float64()), pa.string())
+    integral = pc.match_substring_regex(text, r"^-?[0-9]+$")
+    text = pc.if_else(integral, pc.binary_join_element_wise(text, ".0", ""), text)
+    for arrow_text, json_text in _JSON_NON_FINITE.items():
+        text = pc.if_else(pc.equal(text, arrow_text), json_text, text)
+    return pc.fill_null(text, "NaN")
+
+
+def _json_lists(offsets: np.ndarray, items: pa.Array) -> pa.Array:
+    """'[a, b, ...]' per slice items[offsets[i]:offsets[i + 1]]."""
+    lists = pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), items)
+    return pc.binary_join_element_wise("[", pc.binary_join(lists, ", "), "]", "")
+
+
+def _daily_chunk_batch(samples: pa.Table) -> pa.RecordBatch:
+    """One row per (point, day) of samples, sorted by point_id then day.
+
+    Columns: point_id, date_day (ISO date), timestamps and values (JSON
+    arrays, epoch seconds / floats in time order), count.
+    """
+    samples = samples.sort_by([("point_id", "ascending"), ("timestamp", "ascending")])
+    n = samples.num_rows
+    point_ids = samples.column("point_id").combine_chunks()
+    us = samples.column("timestamp").cast(pa.timestamp("us")).cast(pa.int64()).to_numpy()
+    day = us // _US_PER_DAY
+
+    # Sorted, so a new dictionary code marks the start of a new point
+    codes = pc.dictionary_encode(point_ids).indices.to_numpy()
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = (codes[1:] != codes[:-1]) | (day[1:] != day[:-1])
+    offsets = np.append(np.flatnonzero(starts), n).astype(np.int32)
+    first = offsets[:-1]
+
+    seconds = pc.cast(pa.array(us // 1_000_000), pa.string())
+    values = _json_numbers(samples.column("value").combine_chunks())
+    return pa.RecordBatch.from_pydict({
+        "point_id": pc.cast(point_ids.take(pa.array(first)), pa.string()),
+        "date_day": pc.cast(pa.array(day[first].astype(np.int32), pa.date32()), pa.string()),
+        "timestamps": _json_lists(offsets, seconds),
+        "values": _json_lists(offsets, values),
+        "count": pa.array(np.diff(offsets)),
+    })
+
+
+def _grouped_by_point(pf: pq.ParquetFile, batch_rows: int) -> bool:
+    """Whether each point's rows are contiguous in the file (reads point_id only)."""
+    seen = set()
+    last = None
+    for batch in pf.iter_batches(batch_size=batch_rows, columns=["point_id"]):
+        ids = pc.cast(batch.column(0), pa.string())
+        if len(ids) == 0:
+            continue
+        change = np.ones(len(ids), dtype=bool)
+        change[1:] = pc.not_equal(ids[1:], ids[:-1]).to_numpy(zero_copy_only=False)
+        for pid in ids.filter(pa.array(change)).to_pylist():
+            if pid == last:
+                continue
+            if pid in seen:
+                return False
+            seen.add(pid)
+            last = pid
+    return True
+
+
+def iter_daily_chunk_batches(
+    timeseries_file: Path,
+    batch_rows: int = CHUNK_EXPORT_BATCH_ROWS,
+) -> Iterator[pa.RecordBatch]:
+    """Stream timeseries.parquet as daily chunk batches (see _daily_chunk_batch).
+
+    The simulator writes each point's samples contiguously, so batches are
+    cut at point boundaries (the last point of a batch is carried over to
+    the next) and memory stays bounded by one batch. Files that are not
+    grouped by point are read whole and sorted once.
+    """
+    pf = pq.ParquetFile(timeseries_file)
+    columns = ["point_id", "timestamp", "value"]
+
+    if not _grouped_by_point(pf, batch_rows):
+        table = pf.read(columns=columns)
+        if table.num_rows:
+            yield _daily_chunk_batch(table)
+        return
+
+    carry = None
+    for batch in pf.iter_batches(batch_size=batch_rows, columns=columns):
+        table = pa.Table.from_batches([batch])
+        if carry is not None:
+            table = pa.concat_tables([carry, table])
+        if table.num_rows == 0:
+            continue
+        pending = pc.equal(table.column("point_id"), table.column("point_id")[-1])
+        carry = table.filter(pending)
+        ready = table.filter(pc.invert(pending))
+        if ready.num_rows:
+            yield _daily_chunk_batch(ready)
+    if carry is not None and carry.num_rows:
+        yield _daily_chunk_batch(carry)
+
+
 def generate_daily_aggregates(
     point_id: str,
     samples: List[Tuple[datetime, float]]
@@ -246,7 +368,8 @@ def export_parquet_streaming(
         output_dir: Output directory
         duration_days: Duration for timeseries generation
         batch_size: Number of timeseries rows per batch
-        n_workers: Number of worker processes (for mode='parallel' only)
+        n_workers: Number of worker processes (mode='parallel', or sharded
+            vectorized simulation; default BTB_SIM_WORKERS, 0 = single pass)
         mode: Simulation mode:
             - "vectorized": NumPy vectorized (100-500x faster, RECOMMENDED)
             - "sequential": Original Python step-by-step
@@ -279,11 +402,22 @@ def export_parquet_streaming(
 
     # Use frequency-aware Parquet export (respects per-point frequencies)
     if effective_mode == "vectorized":
-        from .simulation.vectorized import export_timeseries_parquet_by_frequency
+        from .simulation.engine import SimulationConfig
+        from .simulation.parallel import SIM_WORKERS
+        from .simulation.vectorized import SIM_CONTEXT, ContextModel, export_timeseries_parquet_by_frequency
         from datetime import datetime
 
         rng = random.Random(dataset.seed)
         ts_path = output_dir / "timeseries.parquet"
+        start_time = datetime(2024, 1, 1, 0, 0, 0)
+        seed = rng.randint(0, 2**31)
+
+        # Occupancy/weather-driven means from config/simulation.yaml
+        context = None
+        if SIM_CONTEXT:
+            context = ContextModel.from_config(
+                SimulationConfig.load(Path("config/simulation.yaml")), start_time, seed
+            )
         
         print(f"  Using frequency-aware export (respects per-point frequencies)")
         
@@ -291,11 +425,13 @@ def export_parquet_streaming(
             points=dataset.points,
             duration_days=duration_days,
             output_path=str(ts_path),
-            start_time=datetime(2024, 1, 1, 0, 0, 0),
-            seed=rng.randint(0, 2**31),
+            start_time=start_time,
+            seed=seed,
             show_progress=True,
             classify_func=None,
             max_ram_gb=10.0,
+            workers=n_workers or SIM_WORKERS or None,
+            context=context,
         )
 
         print(f"\nExported to Parquet (frequency-aware vectorized): {output_dir}")
@@ -359,11 +495,122 @@ def export_parquet_streaming(
 # SHARED TIMESERIES EXPORT (for P1, P2, M2, O2)
 # =============================================================================
 
+# Rows per batch of the timeseries CSV exports (bounds their memory use)
+TS_CSV_BATCH_ROWS = int(os.getenv("BTB_TS_CSV_BATCH_ROWS", "500000"))
+
+
+def _point_building_lookup(nodes_parquet: Path) -> Optional[Tuple[pa.Array, pa.Array]]:
+    """(point ids, building ids) of the Point nodes, building '' when unknown."""
+    if not nodes_parquet.exists():
+        return None
+    nodes = pq.read_table(nodes_parquet, columns=["id", "type", "building_id"])
+    points = nodes.filter(pc.equal(nodes.column("type"), "Point"))
+    ids = pc.cast(points.column("id").combine_chunks(), pa.string())
+    buildings = pc.fill_null(pc.cast(points.column("building_id").combine_chunks(), pa.string()), "")
+    return ids, buildings
+
+
+def _timeseries_csv_batch(batch: pa.RecordBatch, lookup: Optional[Tuple[pa.Array, pa.Array]]) -> pa.RecordBatch:
+    """point_id,time[,building_id],value columns of one timeseries.parquet batch.
+
+    building_id is resolved on the batch's distinct point ids only, then
+    expanded through the dictionary indices.
+    """
+    point_ids = batch.column("point_id")
+    if not pa.types.is_dictionary(point_ids.type):
+        point_ids = pc.dictionary_encode(point_ids)
+    distinct = pc.cast(point_ids.dictionary, pa.string())
+    columns = {
+        "point_id": distinct.take(point_ids.indices),
+        "time": batch.column("timestamp"),
+    }
+    if lookup is not None:
+        ids, buildings = lookup
+        per_point = pc.fill_null(buildings.take(pc.index_in(distinct, value_set=ids)), "")
+        columns["building_id"] = per_point.take(point_ids.indices)
+    columns["value"] = batch.column("value")
+    return pa.RecordBatch.from_pydict(columns)
+
+
+def _write_csv_rows(f, batch: pa.RecordBatch) -> None:
+    """Append batch rows to an open CSV file (unquoted unless a value needs it)."""
+    import pyarrow.csv as pa_csv
+
+    # Decide before writing: Arrow flushes sub-batches as it goes, so a
+    # failed unquoted write would leave partial rows behind
+    needs_quotes = any(
+        pc.any(pc.match_substring_regex(column, '[",\r\n]')).as_py()
+        for column in batch.columns
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type)
+    )
+    quoting = "needed" if needs_quotes else "none"
+    pa_csv.write_csv(batch, f, pa_csv.WriteOptions(include_header=False, quoting_style=quoting))
+
+
+def write_timeseries_csv(
+    ts_parquet: Path,
+    out_paths: List[Path],
+    nodes_parquet: Optional[Path] = None,
+    batch_size: int = TS_CSV_BATCH_ROWS,
+    progress: bool = False,
+) -> int:
+    """Stream timeseries.parquet to one or more CSV files.
+
+    Batches are converted and written one at a time with Arrow (point_id is
+    read dictionary-encoded), so memory is bounded by batch_size rows plus one
+    Parquet row group, whatever the dataset duration. With several out_paths,
+    batches are dealt round-robin, giving shards of similar size that each
+    carry the header.
+
+    Args:
+        ts_parquet: timeseries.parquet
+        out_paths: CSV files to write
+        nodes_parquet: When given, a building_id column is added (point_id,
+            time, building_id, value); otherwise point_id, time, value
+        batch_size: Rows per batch
+        progress: Print a progress line per batch
+
+    Returns:
+        Rows written
+    """
+    lookup = _point_building_lookup(nodes_parquet) if nodes_parquet is not None else None
+    if nodes_parquet is not None:
+        if lookup is None:
+            print(f"[WARN] nodes.parquet not found, building_id will be empty")
+            lookup = (pa.array([], pa.string()), pa.array([], pa.string()))
+        else:
+            print(f"[INFO] Loaded {len(lookup[0]):,} point->building mappings")
+    header = b"point_id,time,building_id,value\n" if lookup is not None else b"point_id,time,value\n"
+
+    pf = pq.ParquetFile(ts_parquet, read_dictionary=["point_id"])
+    total_rows = pf.metadata.num_rows
+    start_time = time.time()
+    rows_written = 0
+    files = [open(path, "wb", buffering=1 << 20) for path in out_paths]
+    try:
+        for f in files:
+            f.write(header)
+        for i, batch in enumerate(pf.iter_batches(batch_size=batch_size, columns=["point_id", "timestamp", "value"])):
+            _write_csv_rows(files[i % len(files)], _timeseries_csv_batch(batch, lookup))
+            rows_written += batch.num_rows
+            if progress:
+                elapsed = time.time() - start_time
+                rate = rows_written / elapsed if elapsed > 0 else 0
+                pct = rows_written / total_rows * 100 if total_rows else 100.0
+                eta = (total_rows - rows_written) / rate if rate > 0 else 0
+                print(f"\r         [{pct:5.1f}%] {rows_written:,}/{total_rows:,} rows ({rate:,.0f}/s) ETA: {eta:.0f}s   ", end="", flush=True)
+    finally:
+        for f in files:
+            f.close()
+    return rows_written
+
+
 def export_timeseries_csv_shared(
     parquet_dir: Path,
     shared_ts_path: Path,
     force: bool = False,
-    batch_size: int = 100_000
+    batch_size: int = TS_CSV_BATCH_ROWS,
+    shards: int = 1,
 ) -> bool:
     """Export timeseries.csv ONCE for all scenarios that need it (P1, P2, M2, O2).
 
@@ -374,21 +621,21 @@ def export_timeseries_csv_shared(
     This enables efficient building-level queries (Q7, Q12) without expensive JOINs
     on 30M+ timeseries rows.
 
-    Uses PyArrow streaming to minimize RAM usage - only one batch in memory at a time.
-    Typical RAM usage: ~50-100 MB regardless of dataset size.
+    Streams with write_timeseries_csv: host RAM stays bounded by one batch
+    (plus one Parquet row group) regardless of dataset size or duration.
 
     Args:
         parquet_dir: Directory containing timeseries.parquet and nodes.parquet
         shared_ts_path: Target path for the shared timeseries.csv
         force: If True, re-export even if file exists
-        batch_size: Number of rows per batch (default 100k for ~10MB RAM per batch)
+        batch_size: Number of rows per batch
+        shards: With N > 1, write N files timeseries.partNN.csv next to
+            shared_ts_path instead of one file (for one loader per shard,
+            see get_shared_timeseries_shards)
 
     Returns:
         True if exported, False if skipped (already exists)
     """
-    import io
-    import pyarrow.csv as pa_csv
-
     ts_parquet = parquet_dir / "timeseries.parquet"
     nodes_parquet = parquet_dir / "nodes.parquet"
 
@@ -396,70 +643,41 @@ def export_timeseries_csv_shared(
         print(f"[WARN] timeseries.parquet not found at {parquet_dir}")
         return False
 
-    if shared_ts_path.exists() and not force:
-        size_mb = shared_ts_path.stat().st_size / (1024 * 1024)
-        print(f"[SKIP] timeseries.csv already exists ({size_mb:.0f} MB)")
+    out_paths = [shared_ts_path] if shards <= 1 else _shard_paths(shared_ts_path, shards)
+    if all(p.exists() for p in out_paths) and not force:
+        size_mb = sum(p.stat().st_size for p in out_paths) / (1024 * 1024)
+        print(f"[SKIP] {shared_ts_path.name} already exists ({size_mb:.0f} MB)")
         return False
 
     # Ensure parent directory exists
     shared_ts_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Build point_id -> building_id mapping from nodes.parquet
-    # This is small (~50k points) and fits easily in RAM
-    point_to_building = {}
-    if nodes_parquet.exists():
-        nodes_df = pd.read_parquet(nodes_parquet, columns=["id", "type", "building_id"])
-        points_df = nodes_df[nodes_df["type"] == "Point"]
-        point_to_building = dict(zip(points_df["id"], points_df["building_id"].fillna("")))
-        print(f"[INFO] Loaded {len(point_to_building):,} point->building mappings")
-    else:
-        print(f"[WARN] nodes.parquet not found, building_id will be empty")
-
-    # Get total row count from Parquet metadata (fast, no data read)
-    pf = pq.ParquetFile(ts_parquet)
-    total_rows = pf.metadata.num_rows
-
-    print(f"[EXPORT] timeseries.csv (shared with building_id) - {total_rows:,} rows (~{batch_size//1000}k batch)")
+    total_rows = pq.ParquetFile(ts_parquet).metadata.num_rows
+    target = shared_ts_path.name if shards <= 1 else f"{len(out_paths)} shards"
+    print(f"[EXPORT] timeseries.csv (shared with building_id, {target}) - {total_rows:,} rows (~{batch_size//1000}k batch)")
     start_time = time.time()
 
-    # Stream export using PyArrow (minimal RAM: only 1 batch in memory)
-    rows_written = 0
-    with open(shared_ts_path, "wb") as f:
-        # Write header with building_id for Digital Twin patterns
-        f.write(b"point_id,time,building_id,value\n")
-
-        for batch in pf.iter_batches(batch_size=batch_size):
-            # Convert to pandas for easy manipulation
-            df = batch.to_pandas()
-
-            # Rename timestamp -> time if needed
-            if "timestamp" in df.columns:
-                df = df.rename(columns={"timestamp": "time"})
+    rows_written = write_timeseries_csv(ts_parquet, out_paths, nodes_parquet=nodes_parquet,
+                                        batch_size=batch_size, progress=True)
 
-            # Add building_id from mapping (vectorized lookup)
-            df["building_id"] = df["point_id"].map(point_to_building).fillna("")
+    elapsed = time.time() - start_time
+    size_mb = sum(p.stat().st_size for p in out_paths) / (1024 * 1024)
+    rate = rows_written / elapsed if elapsed > 0 else 0
+    print(f"\r         Done: {size_mb:.0f} MB in {elapsed:.1f}s ({rate:,.0f} rows/s)                    ")
 
-            # Reorder columns: point_id, time, building_id, value
-            df = df[["point_id", "time", "building_id", "value"]]
+    return True
 
-            # Write to CSV without header
-            buf = io.BytesIO()
-            df.to_csv(buf, index=False, header=False)
-            f.write(buf.getvalue())
 
-            rows_written += len(df)
-            # Progress every batch
-            elapsed = time.time() - start_time
-            rate = rows_written / elapsed if elapsed > 0 else 0
-            pct = rows_written / total_rows * 100
-            eta = (total_rows - rows_written) / rate if rate > 0 else 0
-            print(f"\r         [{pct:5.1f}%] {rows_written:,}/{total_rows:,} rows ({rate:,.0f}/s) ETA: {eta:.0f}s   ", end="", flush=True)
+def _shard_paths(shared_ts_path: Path, shards: int) -> List[Path]:
+    """timeseries.part00.csv ... next to shared_ts_path."""
+    return [shared_ts_path.with_name(f"{shared_ts_path.stem}.part{i:02d}{shared_ts_path.suffix}")
+            for i in range(shards)]
 
-    elapsed = time.time() - start_time
-    size_mb = shared_ts_path.stat().st_size / (1024 * 1024)
-    print(f"\r         Done: {size_mb:.0f} MB in {elapsed:.1f}s ({rows_written/elapsed:,.0f} rows/s)                    ")
 
-    return True
+def get_shared_timeseries_shards(export_dir: Path) -> List[Path]:
+    """Shard files written by export_timeseries_csv_shared(shards=N), in order."""
+    shared = get_shared_timeseries_path(export_dir)
+    return sorted(shared.parent.glob(f"{shared.stem}.part[0-9][0-9]{shared.suffix}"))
 
 
 def get_shared_timeseries_path(export_dir: Path) -> Path:
@@ -560,10 +778,7 @@ def export_postgresql_csv(
 
     # Timeseries
     if not skip_timeseries and (parquet_dir / "timeseries.parquet").exists():
-        ts_df = pd.read_parquet(parquet_dir / "timeseries.parquet")
-        ts_df.rename(columns={"timestamp": "time"}).to_csv(
-            output_dir / "pg_timeseries.csv", index=False
-        )
+        write_timeseries_csv(parquet_dir / "timeseries.parquet", [output_dir / "pg_timeseries.csv"])
 
     print(f"Exported PostgreSQL CSV: {output_dir}")
 
@@ -609,10 +824,7 @@ def export_postgresql_jsonb_csv(
 
     # Timeseries (same format)
     if not skip_timeseries and (parquet_dir / "timeseries.parquet").exists():
-        ts_df = pd.read_parquet(parquet_dir / "timeseries.parquet")
-        ts_df.rename(columns={"timestamp": "time"}).to_csv(
-            output_dir / "pg_timeseries.csv", index=False
-        )
+        write_timeseries_csv(parquet_dir / "timeseries.parquet", [output_dir / "pg_timeseries.csv"])
 
     print(f"Exported PostgreSQL JSONB CSV: {output_dir}")
 
@@ -671,10 +883,7 @@ def export_memgraph_csv(
 
     # Timeseries for TimescaleDB (M2 hybrid)
     if not skip_timeseries and (parquet_dir / "timeseries.parquet").exists():
-        ts_df = pd.read_parquet(parquet_dir / "timeseries.parquet")
-        ts_df.rename(columns={"timestamp": "time"}).to_csv(
-            output_dir / "timeseries.csv", index=False
-        )
+        write_timeseries_csv(parquet_dir / "timeseries.parquet", [output_dir / "timeseries.csv"])
 
     print(f"Exported Memgraph CSV: {output_dir}")
 
@@ -688,170 +897,254 @@ def export_memgraph_chunks_csv(
 
     Uses one chunk per (point, day) pair. This dramatically reduces the number
     of graph nodes compared to fixed-size chunks (e.g., ~18k vs ~520k for small-2d).
+    Chunks are built column-wise from streamed batches (iter_daily_chunk_batches)
+    and appended to the CSV as they are produced.
 
     Args:
         parquet_dir: Directory containing Parquet files
         output_dir: Output directory for CSV files
         chunk_size: Ignored (kept for API compatibility)
     """
+    import pyarrow.csv as pacsv
+
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    ts_df = pd.read_parquet(parquet_dir / "timeseries.parquet")
-
-    # Count unique points for progress
-    point_ids = ts_df["point_id"].unique()
-    total_points = len(point_ids)
-    print(f"          Generating daily chunks for {total_points:,} points...")
+    ts_path = parquet_dir / "timeseries.parquet"
+    total_rows = pq.ParquetFile(ts_path).metadata.num_rows
+    print(f"          Generating daily chunks for {total_rows:,} samples...")
 
-    chunks_data = []
     start_time = time.time()
-
-    # Group by point_id and generate daily chunks
-    for i, (point_id, group) in enumerate(ts_df.groupby("point_id"), 1):
-        samples = list(zip(group["timestamp"], group["value"]))
-        samples.sort(key=lambda x: x[0])
-
-        for chunk in generate_daily_chunks(point_id, samples):
-            chunks_data.append({
-                "point_id": chunk.point_id,
-                "date_day": chunk.date_day,
-                "timestamps": json.dumps(chunk.timestamps),
-                "values": json.dumps(chunk.values)
-            })
-
-        _print_progress(i, total_points, "          Points", start_time, every_n=500)
-
-    # Write CSV
-    print(f"          Writing {len(chunks_data):,} chunks to CSV...")
-    pd.DataFrame(chunks_data).to_csv(
-        output_dir / "mg_chunks.csv", index=False
-    )
+    n_chunks = 0
+    n_samples = 0
+    schema = pa.schema([(name, pa.string()) for name in ("point_id", "date_day", "timestamps", "values")])
+    options = pacsv.WriteOptions(include_header=True, quoting_style="needed")
+
+    with pacsv.CSVWriter(output_dir / "mg_chunks.csv", schema, write_options=options) as writer:
+        for chunks in iter_daily_chunk_batches(ts_path):
+            writer.write_batch(chunks.select(schema.names))
+            n_chunks += chunks.num_rows
+            n_samples += pc.sum(chunks.column("count")).as_py()
+            _print_progress(n_samples, total_rows, "          Samples", start_time, every_n=1)
 
     elapsed = time.time() - start_time
-    print(f"          Done: {len(chunks_data):,} daily chunks in {elapsed:.1f}s")
+    print(f"          Done: {n_chunks:,} daily chunks in {elapsed:.1f}s")
 
 
 # =============================================================================
 # OXIGRAPH N-TRIPLES EXPORT
 # =============================================================================
 
-def export_ntriples(parquet_dir: Path, output_dir: Path) -> None:
+# Namespaces - aligned with SPARQL queries in queries/o1/ and queries/o2/
+# Queries use: PREFIX btb: <http://basetype.benchmark/ontology#>
+NT_PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "btb": "http://basetype.benchmark/ontology#",  # Aligned with SPARQL queries
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
+# Node URIs use base URI that matches SPARQL query expectations
+# Queries use: BIND(<http://basetype.benchmark/$METER_ID> AS ?meter)
+NODE_IRI_BASE = "http://basetype.benchmark/"
+
+# Characters replaced by '_' in node IRIs
+_IRI_UNSAFE_PATTERN = r'[^a-zA-Z0-9_\-\.:]'
+_IRI_UNSAFE = re.compile(_IRI_UNSAFE_PATTERN)
+
+# Relation mappings - use btb: to match queries (btb:feeds, btb:contains, etc.)
+# 10 relation types matching README complexity description; other types
+# map to btb:<lowercase type>. Node types map to btb:<type>.
+NT_REL_MAPPING = {
+    "CONTAINS": "contains",
+    "LOCATED_IN": "locatedIn",
+    "HAS_POINT": "hasPoint",
+    "FEEDS": "feeds",
+    "SERVES": "serves",
+    "HAS_PART": "hasPart",
+    "OCCUPIES": "occupies",
+    "CONTROLS": "controls",
+    "MONITORS": "monitors",
+    "IS_METERED_BY": "isMeteredBy",
+}
+
+# Rows per Arrow batch and worker processes for export_ntriples
+NT_EXPORT_BATCH_ROWS = int(os.getenv("BTB_NT_EXPORT_BATCH_ROWS", "100000"))
+NT_EXPORT_WORKERS = int(os.getenv("BTB_NT_EXPORT_WORKERS", "1"))
+
+
+def _nt_iri(ids: pa.Array) -> pa.Array:
+    """<http://basetype.benchmark/{sanitized id}> for a string column."""
+    sanitized = pc.replace_substring_regex(pc.cast(ids, pa.string()), _IRI_UNSAFE_PATTERN, "_")
+    return pc.binary_join_element_wise(f"<{NODE_IRI_BASE}", sanitized, ">", "")
+
+
+def _nt_literal(values: pa.Array) -> pa.Array:
+    """Plain literal for a string column (quotes and newlines escaped)."""
+    escaped = pc.replace_substring(pc.cast(values, pa.string()), '"', '\\"')
+    escaped = pc.replace_substring(escaped, "\n", "\\n")
+    return pc.binary_join_element_wise('"', escaped, '"', "")
+
+
+def _nt_lines(subjects: pa.Array, predicate: str, objects: pa.Array) -> pa.Array:
+    """'{s} <{p}> {o} .\\n' per row (null where subject or object is null)."""
+    return pc.binary_join_element_wise(subjects, f" <{predicate}> ", objects, " .\n", "")
+
+
+def _write_lines(f, lines: pa.Array) -> int:
+    """Write newline-terminated strings straight from the Arrow data buffer."""
+    lines = lines.drop_null()
+    if len(lines) == 0:
+        return 0
+    offset_type = np.int64 if pa.types.is_large_string(lines.type) else np.int32
+    _, offsets_buf, data_buf = lines.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=offset_type)[lines.offset:lines.offset + len(lines) + 1]
+    f.write(memoryview(data_buf)[int(offsets[0]):int(offsets[-1])])
+    return len(lines)
+
+
+def _node_property_lines(node_iris: List[str], properties: List[Optional[str]]) -> List[str]:
+    """Triples for the string properties of the JSON properties column."""
+    try:
+        import orjson  # type: ignore
+        _loads = orjson.loads
+    except Exception:
+        _loads = json.loads
+
+    btb = NT_PREFIXES["btb"]
+    lines = []
+    for node_iri, blob in zip(node_iris, properties):
+        if not blob:
+            continue
+        for key, value in _loads(blob).items():
+            if key in ("name", "id", "building_id"):  # Already handled column-wise
+                continue
+            if isinstance(value, str) and value:
+                escaped = value.replace('"', '\\"').replace('\n', '\\n')
+                lines.append(f'{node_iri} <{btb}{key}> "{escaped}" .\n')
+    return lines
+
+
+def _write_node_triples(f, batch: pa.RecordBatch) -> int:
+    """Write the triples of one nodes.parquet batch, returns the count."""
+    rdf, rdfs, btb = NT_PREFIXES["rdf"], NT_PREFIXES["rdfs"], NT_PREFIXES["btb"]
+    cols = batch.schema.names
+    ids = batch.column("id")
+    node_iri = _nt_iri(ids)
+    n = 0
+
+    type_iri = pc.binary_join_element_wise(f"<{btb}", pc.cast(batch.column("type"), pa.string()), ">", "")
+    n += _write_lines(f, _nt_lines(node_iri, f"{rdf}type", type_iri))
+
+    # ID property (btb:id) - queries use this for filtering
+    n += _write_lines(f, _nt_lines(node_iri, f"{btb}id", _nt_literal(ids)))
+
+    # Name property (btb:name) - queries use this; rdfs:label kept for compatibility
+    if "name" in cols:
+        name = _nt_literal(batch.column("name"))
+        has_name = pc.fill_null(pc.not_equal(pc.cast(batch.column("name"), pa.string()), ""), False)
+        n += _write_lines(f, _nt_lines(node_iri, f"{btb}name", name).filter(has_name))
+        n += _write_lines(f, _nt_lines(node_iri, f"{rdfs}label", name).filter(has_name))
+
+    # building_id - CRITICAL: use parquet column (not JSON) for query filtering
+    # Queries filter on btb:building_id "building_1" etc.
+    if "building_id" in cols:
+        building = pc.cast(batch.column("building_id"), pa.string())
+        has_building = pc.fill_null(pc.not_equal(building, ""), False)
+        n += _write_lines(f, _nt_lines(node_iri, f"{btb}building_id", _nt_literal(building)).filter(has_building))
+
+    # Properties from JSON column
+    if "properties" in cols:
+        lines = _node_property_lines(node_iri.to_pylist(), batch.column("properties").to_pylist())
+        f.write("".join(lines).encode("utf-8"))
+        n += len(lines)
+    return n
+
+
+def _write_edge_triples(f, batch: pa.RecordBatch) -> int:
+    """Write the triples of one edges.parquet batch, returns the count."""
+    btb = NT_PREFIXES["btb"]
+    rel = pc.dictionary_encode(pc.cast(batch.column("rel_type"), pa.string()))
+    predicates = pa.array(
+        [f" <{btb}{NT_REL_MAPPING.get(r, r.lower())}> " for r in rel.dictionary.to_pylist()], pa.string()
+    )
+    predicate = predicates.take(rel.indices)
+    lines = pc.binary_join_element_wise(
+        _nt_iri(batch.column("src_id")), predicate, _nt_iri(batch.column("dst_id")), " .\n", ""
+    )
+    return _write_lines(f, lines)
+
+
+def _ntriples_part(kind: str, parquet_file: str, row_groups: List[int], out_path: str, batch_rows: int) -> int:
+    """Write the triples of some row groups of nodes/edges.parquet to out_path."""
+    write = _write_node_triples if kind == "nodes" else _write_edge_triples
+    pf = pq.ParquetFile(parquet_file)
+    n = 0
+    with open(out_path, "wb", buffering=1 << 20) as f:
+        for batch in pf.iter_batches(batch_size=batch_rows, row_groups=row_groups):
+            n += write(f, batch)
+    return n
+
+
+def export_ntriples(
+    parquet_dir: Path,
+    output_dir: Path,
+    workers: int = NT_EXPORT_WORKERS,
+    ordered: bool = True,
+    batch_rows: int = NT_EXPORT_BATCH_ROWS,
+) -> None:
     """Export Parquet to N-Triples format for Oxigraph.
 
+    Triples are built column-wise with Arrow compute on batches of
+    batch_rows and written straight from the Arrow buffers, so memory stays
+    bounded by one batch whatever the graph size. Within a batch, triples
+    are grouped by predicate (node types, ids, names, ...), then edges.
+
     Args:
         parquet_dir: Directory containing Parquet files
         output_dir: Output directory for N-Triples file
+        workers: Processes, each exporting a share of the row groups to a
+            part file (1 = in-process, no part files)
+        ordered: Concatenate part files in row-group order (same output as
+            workers=1); False appends them as they finish
+        batch_rows: Rows per Arrow batch
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-
-    nodes_df = pd.read_parquet(parquet_dir / "nodes.parquet")
-    edges_df = pd.read_parquet(parquet_dir / "edges.parquet")
-
-    # Prefixes - aligned with SPARQL queries in queries/o1/ and queries/o2/
-    # Queries use: PREFIX btb: <http://basetype.benchmark/ontology#>
-    prefixes = {
-        "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
-        "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
-        "btb": "http://basetype.benchmark/ontology#",  # Aligned with SPARQL queries
-        "xsd": "http://www.w3.org/2001/XMLSchema#",
-    }
-
-    # Type mappings - all use btb: prefix to match queries
-    type_mapping = {
-        "Site": "btb:Site",
-        "Building": "btb:Building",
-        "Floor": "btb:Floor",
-        "Space": "btb:Space",
-        "Equipment": "btb:Equipment",
-        "Point": "btb:Point",
-        "Tenant": "btb:Tenant",
-    }
-
-    # Relation mappings - use btb: to match queries (btb:feeds, btb:contains, etc.)
-    # 10 relation types matching README complexity description
-    rel_mapping = {
-        "CONTAINS": "btb:contains",
-        "LOCATED_IN": "btb:locatedIn",
-        "HAS_POINT": "btb:hasPoint",
-        "FEEDS": "btb:feeds",
-        "SERVES": "btb:serves",
-        "HAS_PART": "btb:hasPart",
-        "OCCUPIES": "btb:occupies",
-        "CONTROLS": "btb:controls",
-        "MONITORS": "btb:monitors",
-        "IS_METERED_BY": "btb:isMeteredBy",
-    }
-
-    triples = []
-
-    def uri(id_str: str) -> str:
-        # Node URIs use base URI that matches SPARQL query expectations
-        # Queries use: BIND(<http://basetype.benchmark/$METER_ID> AS ?meter)
-        # Sanitize IRI: replace invalid characters
-        import re
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-\.:]', '_', str(id_str))
-        return f"<http://basetype.benchmark/{sanitized}>"
-
-    def literal(value: str, datatype: str = None) -> str:
-        escaped = value.replace('"', '\\"').replace('\n', '\\n')
-        if datatype:
-            return f'"{escaped}"^^<{prefixes["xsd"]}{datatype}>'
-        return f'"{escaped}"'
-
-    # Helper to expand prefix
-    def expand_prefix(prefixed: str) -> str:
-        """Expand btb:Something to full URI."""
-        if prefixed.startswith("btb:"):
-            return prefixes["btb"] + prefixed[4:]
-        return prefixed  # Unknown prefix, return as-is
-
-    # Export nodes
-    for _, row in nodes_df.iterrows():
-        node_uri = uri(row["id"])
-        node_type = type_mapping.get(row["type"], f"btb:{row['type']}")
-
-        # Type triple
-        triples.append(f'{node_uri} <{prefixes["rdf"]}type> <{expand_prefix(node_type)}> .')
-
-        # ID property (btb:id) - queries use this for filtering
-        triples.append(f'{node_uri} <{prefixes["btb"]}id> {literal(row["id"])} .')
-
-        # Name property (btb:name) - queries use this, not rdfs:label
-        name = row.get("name", "")
-        if name:
-            triples.append(f'{node_uri} <{prefixes["btb"]}name> {literal(name)} .')
-            # Also keep rdfs:label for compatibility
-            triples.append(f'{node_uri} <{prefixes["rdfs"]}label> {literal(name)} .')
-
-        # building_id - CRITICAL: use parquet column (not JSON) for query filtering
-        # Queries filter on btb:building_id "building_1" etc.
-        building_id = row.get("building_id", "")
-        if building_id:
-            triples.append(f'{node_uri} <{prefixes["btb"]}building_id> {literal(building_id)} .')
-
-        # Properties from JSON column
-        props = json.loads(row["properties"]) if row["properties"] else {}
-        for key, value in props.items():
-            if key in ("name", "id", "building_id"):  # Already handled above
-                continue
-            if isinstance(value, str) and value:
-                triples.append(f'{node_uri} <{prefixes["btb"]}{key}> {literal(value)} .')
-
-    # Export edges
-    for _, row in edges_df.iterrows():
-        src_uri = uri(row["src_id"])
-        dst_uri = uri(row["dst_id"])
-        rel = rel_mapping.get(row["rel_type"], f"btb:{row['rel_type'].lower()}")
-        rel_uri = expand_prefix(rel)
-        triples.append(f'{src_uri} <{rel_uri}> {dst_uri} .')
-
-    # Write to file
-    with open(output_dir / "graph.nt", "w", encoding="utf-8") as f:
-        f.write("\n".join(triples))
-
-    print(f"Exported N-Triples: {len(triples)} triples")
+    out_file = output_dir / "graph.nt"
+    t0 = time.time()
+
+    # One task per row group, so batch boundaries (and thus the output) do
+    # not depend on the number of workers
+    tasks = []
+    for kind in ("nodes", "edges"):
+        path = parquet_dir / f"{kind}.parquet"
+        tasks.extend((kind, str(path), [rg]) for rg in range(pq.ParquetFile(path).num_row_groups))
+
+    total = 0
+    if workers <= 1:
+        with open(out_file, "wb", buffering=1 << 20) as f:
+            for kind, path, row_groups in tasks:
+                write = _write_node_triples if kind == "nodes" else _write_edge_triples
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, row_groups=row_groups):
+                    total += write(f, batch)
+    else:
+        part_dir = Path(tempfile.mkdtemp(prefix="graph_nt_", dir=output_dir))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool, open(out_file, "wb") as out:
+                futures = {
+                    pool.submit(_ntriples_part, kind, path, row_groups, str(part_dir / f"part{i:05d}.nt"), batch_rows): i
+                    for i, (kind, path, row_groups) in enumerate(tasks)
+                }
+                done = futures if ordered else as_completed(futures)
+                for future in done:
+                    total += future.result()
+                    with open(part_dir / f"part{futures[future]:05d}.nt", "rb") as part:
+                        shutil.copyfileobj(part, out, 1 << 20)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    print(f"Exported N-Triples: {total} triples in {time.time() - t0:.1f}s")
 
 
 def export_oxigraph_chunks_ntriples(
@@ -862,6 +1155,8 @@ def export_oxigraph_chunks_ntriples(
     """Export timeseries as daily chunks N-Triples for O1.
 
     Uses one chunk per (point, day) pair (standard BOS daily archive pattern).
+    Triples are built column-wise from the streamed chunk batches and written
+    straight from the Arrow buffers.
 
     Args:
         parquet_dir: Directory containing Parquet files
@@ -870,63 +1165,40 @@ def export_oxigraph_chunks_ntriples(
     """
     output_dir = Path(output_dir)
 
-    ts_df = pd.read_parquet(parquet_dir / "timeseries.parquet")
+    ts_path = parquet_dir / "timeseries.parquet"
+    total_rows = pq.ParquetFile(ts_path).metadata.num_rows
+    print(f"          Generating O1 daily chunk triples for {total_rows:,} samples...")
 
-    # Count unique points for progress
-    point_ids = ts_df["point_id"].unique()
-    total_points = len(point_ids)
-    print(f"          Generating O1 daily chunk triples for {total_points:,} points...")
+    ts_ns = "http://example.org/ts/"
+    xsd = NT_PREFIXES["xsd"]
 
-    prefixes = {
-        "ts": "http://example.org/ts/",
-        "xsd": "http://www.w3.org/2001/XMLSchema#",
-    }
+    def typed(values: pa.Array, datatype: str) -> pa.Array:
+        return pc.binary_join_element_wise('"', values, f'"^^<{xsd}{datatype}>', "")
 
-    triples = []
     start_time = time.time()
-    chunk_count = 0
-
-    def node_uri(id_str: str) -> str:
-        # Node URIs must match graph.nt URIs for JOIN via hasChunk relation
-        import re
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-\.:]', '_', str(id_str))
-        return f"<http://basetype.benchmark/{sanitized}>"
-
-    def chunk_uri(id_str: str) -> str:
-        # Chunk URIs can use urn: scheme (only accessed via hasChunk)
-        import re
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-\.:]', '_', str(id_str))
-        return f"<urn:chunk:{sanitized}>"
-
-    def literal(value, datatype: str) -> str:
-        return f'"{value}"^^<{prefixes["xsd"]}{datatype}>'
-
-    # Generate daily chunks
-    for i, (point_id, group) in enumerate(ts_df.groupby("point_id"), 1):
-        samples = list(zip(group["timestamp"], group["value"]))
-        samples.sort(key=lambda x: x[0])
-
-        point_ref = node_uri(point_id)
-
-        for chunk in generate_daily_chunks(point_id, samples):
-            # Use date_day in URI instead of numeric index
-            chunk_ref = chunk_uri(f"{point_id}_{chunk.date_day}")
-
-            triples.append(f'{point_ref} <{prefixes["ts"]}hasChunk> {chunk_ref} .')
-            triples.append(f'{chunk_ref} <{prefixes["ts"]}dateDay> {literal(chunk.date_day, "date")} .')
-            triples.append(f'{chunk_ref} <{prefixes["ts"]}timestamps> {literal(json.dumps(chunk.timestamps), "string")} .')
-            triples.append(f'{chunk_ref} <{prefixes["ts"]}values> {literal(json.dumps(chunk.values), "string")} .')
-            chunk_count += 1
+    n_chunks = 0
+    n_samples = 0
+    n_triples = 0
+    with open(output_dir / "chunks.nt", "wb", buffering=1 << 20) as f:
+        for chunks in iter_daily_chunk_batches(ts_path):
+            # Node URIs must match graph.nt URIs for JOIN via hasChunk relation;
+            # chunk URIs can use urn: scheme (only accessed via hasChunk)
+            point_ref = _nt_iri(chunks.column("point_id"))
+            chunk_key = pc.binary_join_element_wise(chunks.column("point_id"), chunks.column("date_day"), "_")
+            chunk_ref = pc.binary_join_element_wise(
+                "<urn:chunk:", pc.replace_substring_regex(chunk_key, _IRI_UNSAFE_PATTERN, "_"), ">", ""
+            )
 
-        _print_progress(i, total_points, "          Points", start_time, every_n=500)
-
-    # Write to file
-    print(f"          Writing {len(triples):,} triples to N-Triples...")
-    with open(output_dir / "chunks.nt", "w", encoding="utf-8") as f:
-        f.write("\n".join(triples))
+            n_triples += _write_lines(f, _nt_lines(point_ref, f"{ts_ns}hasChunk", chunk_ref))
+            n_triples += _write_lines(f, _nt_lines(chunk_ref, f"{ts_ns}dateDay", typed(chunks.column("date_day"), "date")))
+            n_triples += _write_lines(f, _nt_lines(chunk_ref, f"{ts_ns}timestamps", typed(chunks.column("timestamps"), "string")))
+            n_triples += _write_lines(f, _nt_lines(chunk_ref, f"{ts_ns}values", typed(chunks.column("values"), "string")))
+            n_chunks += chunks.num_rows
+            n_samples += pc.sum(chunks.column("count")).as_py()
+            _print_progress(n_samples, total_rows, "          Samples", start_time, every_n=1)
 
     elapsed = time.time() - start_time
-    print(f"          Done: {chunk_count:,} chunks, {len(triples):,} triples in {elapsed:.1f}s")
+    print(f"          Done: {n_chunks:,} chunks, {n_triples:,} triples in {elapsed:.1f}s")
 
 
 def export_oxigraph_aggregates_ntriples(
@@ -952,14 +1224,12 @@ def export_oxigraph_aggregates_ntriples(
 
     def node_uri(id_str: str) -> str:
         # Node URIs must match graph.nt for JOIN via hasDailyAgg
-        import re
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-\.:]', '_', str(id_str))
+        sanitized = _IRI_UNSAFE.sub('_', str(id_str))
         return f"<http://basetype.benchmark/{sanitized}>"
 
     def agg_uri(id_str: str) -> str:
         # Aggregate URIs can use urn: scheme
-        import re
-        sanitized = re.sub(r'[^a-zA-Z0-9_\-\.:]', '_', str(id_str))
+        sanitized = _IRI_UNSAFE.sub('_', str(id_str))
         return f"<urn:agg:{sanitized}>"
 
     def literal(value, datatype: str) -> str:
@@ -1136,10 +1406,7 @@ def export_for_target(
         export_ntriples(parquet_dir, output_dir)
         # Export timeseries for TimescaleDB (O2 is hybrid like M2)
         if not skip_timeseries and (parquet_dir / "timeseries.parquet").exists():
-            ts_df = pd.read_parquet(parquet_dir / "timeseries.parquet")
-            ts_df.rename(columns={"timestamp": "time"}).to_csv(
-                output_dir / "timeseries.csv", index=False
-            )
+            write_timeseries_csv(parquet_dir / "timeseries.parquet", [output_dir / "timeseries.csv"])
 
     elif target == "oxigraph_o1":
         # O1 uses chunks, not timeseries.csv
@@ -1194,6 +1461,9 @@ def main():
     ], default="all", help="Target format")
     parser.add_argument("--output", type=Path, default=Path("output"),
                         help="Output directory")
+    parser.add_argument("--ts-shards", type=int, default=None,
+                        help="Also write the shared timeseries CSV (with building_id) "
+                             "to the output directory, split into N shard files")
 
     args = parser.parse_args()
 
@@ -1202,6 +1472,11 @@ def main():
     else:
         export_for_target(args.parquet_dir, args.target, args.output)
 
+    if args.ts_shards:
+        export_timeseries_csv_shared(
+            args.parquet_dir, get_shared_timeseries_path(args.output), force=True, shards=args.ts_shards
+        )
+
 
 if __name__ == "__main__":
     main()
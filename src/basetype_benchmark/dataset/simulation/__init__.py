@@ -8,8 +8,8 @@ This module provides physical simulation of building automation points with:
 - Type-specific simulators for different point categories
 """
 from .engine import SimulationEngine, SimulationConfig, PointInfo
-from .occupancy import OccupancyModel, OccupancyContext
-from .environment import EnvironmentModel, EnvironmentContext, ClimatePreset
+from .occupancy import OccupancyModel, OccupancyContext, OccupancyArrays
+from .environment import EnvironmentModel, EnvironmentContext, EnvironmentArrays, ClimatePreset
 from .point_simulator import PointSimulator, PointConfig, SimulationState, SimulationSample
 from .ou_process import OUProcess, BoundedOUProcess
 
@@ -21,8 +21,10 @@ __all__ = [
     # Context models
     "OccupancyModel",
     "OccupancyContext",
+    "OccupancyArrays",
     "EnvironmentModel",
     "EnvironmentContext",
+    "EnvironmentArrays",
     "ClimatePreset",
     # Base classes
     "PointSimulator",
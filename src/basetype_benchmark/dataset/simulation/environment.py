@@ -13,6 +13,8 @@ import random
 from dataclasses import dataclass, field
 from datetime import datetime
 
+import numpy as np
+
 
 @dataclass
 class EnvironmentContext:
@@ -24,6 +26,16 @@ class EnvironmentContext:
     season_factor: float  # -1 (winter) to 1 (summer)
 
 
+@dataclass
+class EnvironmentArrays:
+    """Environmental conditions over a vector of timestamps."""
+    outdoor_temp: np.ndarray  # °C
+    outdoor_humidity: np.ndarray  # %RH
+    solar_intensity: np.ndarray  # 0-1 normalized
+    is_daytime: np.ndarray  # bool
+    season_factor: np.ndarray  # -1 (winter) to 1 (summer)
+
+
 @dataclass
 class EnvironmentModel:
     """
@@ -49,6 +61,11 @@ class EnvironmentModel:
 
     # Internal state
     _weather_offset: float = field(default=0.0, repr=False)
+    # Blocked scan of get_environment_array: steps into the current block,
+    # weather entering it and partial sum of its scaled noise
+    _weather_phase: int = field(default=0, repr=False)
+    _weather_entry: float = field(default=0.0, repr=False)
+    _weather_cum: float = field(default=0.0, repr=False)
     rng: random.Random = field(default_factory=random.Random)
 
     def get_environment(self, timestamp: datetime) -> EnvironmentContext:
@@ -115,6 +132,99 @@ class EnvironmentModel:
             season_factor=season_factor,
         )
 
+    def get_environment_array(
+        self,
+        timestamps: np.ndarray,
+        rng: np.random.Generator | None = None,
+    ) -> EnvironmentArrays:
+        """
+        Vectorized get_environment() over numpy datetime64 timestamps.
+
+        Same formulas, one weather update per timestamp. The weather offset
+        AR(1) is run as a blocked scan whose blocks are counted from the last
+        reset_weather(), and the noise is drawn timestep-major, so splitting
+        the timestamps over consecutive calls gives the same values as one
+        call.
+
+        Args:
+            timestamps: datetime64 array, in time order
+            rng: Random generator for weather noise (default: seeded from self.rng)
+
+        Returns:
+            EnvironmentArrays with one value per timestamp
+        """
+        if rng is None:
+            rng = np.random.default_rng(self.rng.getrandbits(64))
+        n = len(timestamps)
+
+        days = timestamps.astype("datetime64[D]")
+        day_of_year = (days - timestamps.astype("datetime64[Y]")).astype(np.int64) + 1
+        minutes = (timestamps - days) // np.timedelta64(1, "m")
+        hour = (minutes // 60) + (minutes % 60) / 60.0
+
+        # Season factor (-1 = winter solstice, +1 = summer solstice)
+        season_factor = -np.cos(2 * np.pi * (day_of_year - 10) / 365)
+        seasonal_temp = self.annual_mean_temp + self.annual_amplitude * season_factor
+
+        # Diurnal temperature component (peak around 15:00)
+        diurnal_factor = -np.cos(2 * np.pi * (hour - 3) / 24)
+        diurnal_temp = self.daily_amplitude * diurnal_factor * (0.5 + 0.5 * np.maximum(0, season_factor))
+
+        # Weather and humidity noise, one pair per timestamp
+        noise = rng.standard_normal((n, 2))
+
+        # Weather noise: x[i] = p x[i-1] + e[i], zero-start inside blocks of
+        # B steps, then the offset entering each block is carried and decayed
+        p = self.weather_persistence
+        # Blocks short enough that 1/p^k stays well within float range
+        B = 64 if p >= 0.5 else max(1, int(30 / -math.log10(max(p, 1e-30))))
+        phase = self._weather_phase
+        n_blocks = -(-(phase + n) // B)
+        powers = p ** np.arange(B, dtype=np.float64)
+        # Within a block: x[k] = p^k * cumsum(e[j] / p^j); a block left open
+        # by the previous call resumes from its partial sum
+        scaled = np.zeros(n_blocks * B)
+        scaled[phase:phase + n] = math.sqrt(1 - p ** 2) * self.weather_sigma * noise[:, 0]
+        scaled = scaled.reshape(n_blocks, B) / powers
+        if phase:
+            scaled[0, phase - 1] = self._weather_cum
+        cum = np.cumsum(scaled, axis=1)
+        zero_start = cum * powers
+        offset = np.empty(n_blocks)
+        state = self._weather_entry if phase else self._weather_offset
+        for b in range(n_blocks):
+            offset[b] = state
+            state = p ** B * state + zero_start[b, -1]
+        weather = (zero_start + offset[:, np.newaxis] * (p * powers)).reshape(-1)[phase:phase + n]
+        if n:
+            self._weather_offset = float(weather[-1])
+            self._weather_phase = (phase + n) % B
+            self._weather_entry = float(offset[-1])
+            self._weather_cum = float(cum[-1, self._weather_phase - 1]) if self._weather_phase else 0.0
+
+        outdoor_temp = seasonal_temp + diurnal_temp + weather
+
+        # Humidity (higher at night)
+        outdoor_humidity = np.clip(
+            self.humidity_mean - diurnal_factor * 15 + 5 * noise[:, 1], 20, 100
+        )
+
+        # Solar intensity: bell curve around solar noon, scaled by season
+        hour_angle = np.abs(hour - 12.5)
+        solar_intensity = np.where(
+            hour_angle > 7,
+            0.0,
+            np.maximum(0, np.cos(np.pi * hour_angle / 14)) * (0.5 + 0.5 * np.maximum(0, season_factor)),
+        )
+
+        return EnvironmentArrays(
+            outdoor_temp=outdoor_temp,
+            outdoor_humidity=outdoor_humidity,
+            solar_intensity=solar_intensity,
+            is_daytime=solar_intensity > 0.05,
+            season_factor=season_factor,
+        )
+
     def get_design_temps(self) -> tuple[float, float]:
         """
         Get design temperatures for heating/cooling.
@@ -129,6 +239,9 @@ class EnvironmentModel:
     def reset_weather(self):
         """Reset weather noise to neutral."""
         self._weather_offset = 0.0
+        self._weather_phase = 0
+        self._weather_entry = 0.0
+        self._weather_cum = 0.0
 
 
 @dataclass
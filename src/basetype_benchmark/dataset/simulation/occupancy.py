@@ -13,6 +13,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, time, timedelta
 from typing import Any
 
+import numpy as np
+
 
 @dataclass
 class OccupancyContext:
@@ -27,6 +29,14 @@ class OccupancyContext:
         return 0.0 < self.occupancy_level < 1.0
 
 
+@dataclass
+class OccupancyArrays:
+    """Occupancy over a vector of timestamps (see OccupancyModel.get_occupancy_array)."""
+    is_occupied: np.ndarray  # bool
+    occupancy_level: np.ndarray  # float64, 0.0 to 1.0
+    in_transition: np.ndarray  # bool, same rule as OccupancyContext.in_transition
+
+
 @dataclass
 class DaySchedule:
     """Schedule for a single type of day."""
@@ -176,6 +186,58 @@ class OccupancyModel:
             people_density=level,
         )
 
+    def get_occupancy_array(self, timestamps: np.ndarray) -> OccupancyArrays:
+        """
+        Vectorized get_occupancy() over numpy datetime64 timestamps.
+
+        Gives the same levels as calling get_occupancy() on each timestamp
+        (minute resolution, seconds are ignored).
+
+        Args:
+            timestamps: datetime64 array
+
+        Returns:
+            OccupancyArrays with one value per timestamp
+        """
+        days = timestamps.astype("datetime64[D]")
+        # 1970-01-01 was a Thursday (weekday 3)
+        weekdays = (days.astype(np.int64) + 3) % 7
+        minutes = ((timestamps - days) // np.timedelta64(1, "m")).astype(np.float64)
+
+        level = np.zeros(len(timestamps), dtype=np.float64)
+        for weekday, schedule in self.schedules.items():
+            if not schedule.is_occupied:
+                continue
+            day_mask = weekdays == weekday
+            if not np.any(day_mask):
+                continue
+            m = minutes[day_mask]
+            start_minutes = schedule.occupied_start.hour * 60 + schedule.occupied_start.minute
+            end_minutes = schedule.occupied_end.hour * 60 + schedule.occupied_end.minute
+            transition = schedule.transition_minutes
+
+            # Same piecewise profile as get_occupancy, later pieces first
+            day_level = np.zeros(len(m), dtype=np.float64)
+            ramp_down = 1.0 - self._smooth_ramp_array((m - (end_minutes - transition)) / (2 * transition))
+            ramp_up = self._smooth_ramp_array((m - (start_minutes - transition)) / (2 * transition))
+            day_level = np.where(m < end_minutes + transition, ramp_down, day_level)
+            day_level = np.where(m < end_minutes - transition, 1.0, day_level)
+            day_level = np.where(m < start_minutes + transition, ramp_up, day_level)
+            day_level = np.where(m < start_minutes - transition, 0.0, day_level)
+            level[day_mask] = day_level * schedule.peak_density
+
+        return OccupancyArrays(
+            is_occupied=level > 0.1,
+            occupancy_level=level,
+            in_transition=(level > 0.0) & (level < 1.0),
+        )
+
+    @staticmethod
+    def _smooth_ramp_array(t: np.ndarray) -> np.ndarray:
+        """Vectorized _smooth_ramp."""
+        t = np.clip(t, 0.0, 1.0)
+        return t * t * (3 - 2 * t)
+
     def _smooth_ramp(self, t: float) -> float:
         """
         Smooth S-curve transition (eased in/out).
@@ -4,16 +4,28 @@ Parallel Simulation Module.
 Provides parallel execution of point simulation using multiprocessing.
 Each worker process holds its own partition of points and simulators,
 avoiding serialization overhead between timesteps.
+
+The sharded vectorized mode (iter_shard_batches) instead runs the
+VectorizedSimulator on fixed-size shards of points across a process pool;
+shard seeds are spawned from one SeedSequence, so the output does not
+depend on the number of workers.
 """
 from __future__ import annotations
 
 import multiprocessing as mp
 from multiprocessing import shared_memory
+import os
 import random
 import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Iterator, List, Dict, Tuple, Optional
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Dict, Tuple, Optional
+
+import numpy as np
 
 from .occupancy import OccupancyModel, OccupancyContext
 from .environment import EnvironmentModel, EnvironmentContext, ClimatePreset
@@ -35,6 +47,15 @@ from .simulators import (
 # Golden ratio hash for seed derivation
 GOLDEN_RATIO_HASH = 2654435761
 
+# Sharded vectorized mode: worker processes (0 = single pass per group, no
+# shards) and points per shard. Shards, not workers, fix the random streams.
+SIM_WORKERS = int(os.getenv("BTB_SIM_WORKERS", "0"))
+SIM_SHARD_POINTS = int(os.getenv("BTB_SIM_SHARD_POINTS", "4096"))
+
+# Working memory per shard (time windows are sized from it, see
+# VectorizedSimulator.iter_windows); peak RAM is about workers times this
+SIM_SHARD_RAM_BYTES = int(float(os.getenv("BTB_SIM_SHARD_RAM_MB", "1024")) * 1024 * 1024)
+
 
 @dataclass
 class PointInfo:
@@ -424,3 +445,128 @@ def generate_parallel(
         for pool in pools:
             pool.close()
             pool.join()
+
+
+# ============================================================================
+# SHARDED VECTORIZED SIMULATION
+# ============================================================================
+
+@dataclass
+class ShardTask:
+    """One shard of points simulated by a VectorizedSimulator."""
+    points: List[Any]
+    n_timesteps: int
+    dt: float
+    seed: np.random.SeedSequence
+    start_time: datetime
+    deadband: bool = True
+    max_ram_bytes: float = SIM_SHARD_RAM_BYTES
+    classify_func: Optional[Callable[[Any], str]] = None
+    context: Optional[Any] = None  # vectorized.ContextModel
+
+
+def shard_tasks(
+    points: List[Any],
+    n_timesteps: int,
+    dt: float,
+    seed: np.random.SeedSequence,
+    start_time: datetime,
+    shard_points: int = SIM_SHARD_POINTS,
+    **kwargs,
+) -> List[ShardTask]:
+    """Cut points into shards of shard_points, each with a spawned seed."""
+    shards = [points[i:i + shard_points] for i in range(0, len(points), max(1, shard_points))]
+    return [
+        ShardTask(shard, n_timesteps, dt, child, start_time, **kwargs)
+        for shard, child in zip(shards, seed.spawn(len(shards)))
+    ]
+
+
+def _shard_batches(task: ShardTask, work_dir: Optional[Path] = None):
+    """Simulate one shard and yield its samples as Arrow record batches."""
+    from .vectorized import WINDOW_BYTES_PER_VALUE, create_simulator_from_points
+
+    simulator = create_simulator_from_points(
+        points=task.points,
+        n_timesteps=task.n_timesteps,
+        dt=task.dt,
+        classify_func=task.classify_func,
+        context=task.context,
+    )
+    window_steps = simulator.window_steps_for(task.max_ram_bytes, WINDOW_BYTES_PER_VALUE)
+    yield from simulator.iter_window_batches(
+        task.seed, [p.id for p in task.points], task.start_time, window_steps,
+        deadband=task.deadband, work_dir=work_dir,
+    )
+
+
+def _sample_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("point_id", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("value", pa.float32()),
+    ])
+
+
+def _shard_to_file(task: ShardTask, out_path: str) -> int:
+    """Write one shard as an Arrow IPC stream, returns the sample count."""
+    import pyarrow as pa
+
+    n = 0
+    with pa.OSFile(out_path, "wb") as sink, pa.ipc.new_stream(sink, _sample_schema()) as writer:
+        for batch in _shard_batches(task, Path(out_path).parent):
+            writer.write_batch(batch)
+            n += batch.num_rows
+    return n
+
+
+def iter_shard_batches(
+    tasks: List[ShardTask],
+    workers: int = 1,
+    work_dir: Optional[Path] = None,
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Run shard tasks and yield (task index, record batch) in task order.
+
+    With workers > 1, each shard is simulated in a worker process and
+    written as an Arrow IPC stream to a part file, which the parent
+    memory-maps and reads back without copying. The batches are the same
+    as with workers=1 (in-process), so the caller's output is identical
+    for any worker count. At most 2 * workers shards are in flight.
+
+    Args:
+        tasks: Shards, in output order
+        workers: Worker processes (1 = in-process)
+        work_dir: Where to write part files (default: system temp dir)
+
+    Yields:
+        (task index, pyarrow.RecordBatch)
+    """
+    import pyarrow as pa
+
+    if workers <= 1:
+        for i, task in enumerate(tasks):
+            for batch in _shard_batches(task, work_dir):
+                yield i, batch
+        return
+
+    part_dir = Path(tempfile.mkdtemp(prefix="btb_shards_", dir=work_dir))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            submitted = 0
+            for i in range(len(tasks)):
+                while submitted < len(tasks) and submitted < i + 2 * workers:
+                    path = part_dir / f"shard{submitted:05d}.arrows"
+                    pending[submitted] = (pool.submit(_shard_to_file, tasks[submitted], str(path)), path)
+                    submitted += 1
+                future, path = pending.pop(i)
+                future.result()
+                with pa.memory_map(str(path)) as source:
+                    for batch in pa.ipc.open_stream(source):
+                        yield i, batch
+                path.unlink()
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
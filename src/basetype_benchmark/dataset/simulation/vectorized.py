@@ -12,10 +12,17 @@ Where Z ~ N(0,1) and all coefficients are constant → vectorizable.
 """
 from __future__ import annotations
 
+import copy
+import itertools
+import os
+
 import numpy as np
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Iterator, Tuple, List, Dict, Any
+from typing import Iterator, Tuple, List, Dict, Any, Callable, Optional
+
+from .environment import ClimatePreset, EnvironmentModel
+from .occupancy import OccupancyModel
 
 
 @dataclass
@@ -83,20 +90,149 @@ DEFAULT_PARAMS: Dict[str, PointParams] = {
     ),
 }
 
+# Timesteps per block of the blocked OU scan; bounds are enforced on the state
+# carried between blocks (and on every emitted value). Fixed, since it shapes
+# the generated data
+SIM_BLOCK_STEPS = 16
+
+# Working memory per segment of the scan (float32 random draws and partial
+# sums); it only affects speed and memory, not the generated values
+SIM_SEGMENT_BYTES = int(float(os.getenv("BTB_SIM_SEGMENT_MB", "64")) * 1024 * 1024)
+
+# Timesteps per segment of the deadband filter (segments are filtered in
+# parallel, then corrected in order) and working memory per block of points
+DEADBAND_SEGMENT_STEPS = int(os.getenv("BTB_DEADBAND_SEGMENT_STEPS", "1024"))
+DEADBAND_BLOCK_BYTES = int(float(os.getenv("BTB_DEADBAND_BLOCK_MB", "256")) * 1024 * 1024)
+
+# Working memory per simulated value when streaming time windows (float32
+# trajectory, transmission mask and deadband temporaries)
+WINDOW_BYTES_PER_VALUE = 8
+
 # Unknown type fallback
 DEFAULT_PARAMS["unknown"] = PointParams(
     mean=50.0, theta=1.0/(5*60), sigma=0.1,
     deadband=1.0, min_value=0.0, max_value=100.0
 )
 
+# Modulate OU means with occupancy and weather in the exports (0 = constant means)
+SIM_CONTEXT = os.getenv("BTB_SIM_CONTEXT", "1") != "0"
+
+
+def _seed_children(seed, n: int) -> List[np.random.SeedSequence]:
+    """The first n children of a seed (int or SeedSequence), without spawning.
+
+    Unlike SeedSequence.spawn, this does not advance the parent, so the same
+    seed always gives the same streams.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [
+        np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (i,), pool_size=seed.pool_size)
+        for i in range(n)
+    ]
+
+
+@dataclass
+class ContextModel:
+    """
+    Occupancy and outdoor conditions that drive the OU means.
+
+    The mean of each point becomes mean + gains · signals(t), with the
+    signals of CONTEXT_SIGNALS computed for whole segments by the array
+    versions of the occupancy and environment models, and per-type gains
+    taken from the point behaviors of config/simulation.yaml:
+    - temperature: night setback, occupancy heat load, envelope losses
+    - co2: accumulation from the outdoor baseline with occupancy
+    - power: base load plus occupancy load
+    Weather noise is drawn from its own stream of seed (see weather_rng), so
+    all shards and windows of a run see the same weather. weather_persistence
+    is per base_step and is rescaled to the dt of each simulator, so all
+    sampling frequencies share the same weather time constant.
+    """
+    occupancy: OccupancyModel
+    environment: EnvironmentModel
+    point_behaviors: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    start_time: datetime = datetime(2024, 1, 1)
+    seed: int = 0
+    base_step: float = 60.0  # seconds per weather_persistence step
+
+    CONTEXT_SIGNALS = ("unoccupied", "occupied_level", "occupancy_level", "outdoor_temp", "one")
+
+    @classmethod
+    def from_config(cls, config: Any, start_time: datetime, seed: int) -> "ContextModel":
+        """Create from a SimulationConfig (see engine.SimulationConfig.load)."""
+        climate = (config.environment or {}).get("climate", "temperate")
+        preset = getattr(ClimatePreset, climate, ClimatePreset.temperate)
+        return cls(
+            occupancy=OccupancyModel.from_config(config.occupancy or {}),
+            environment=preset(),
+            point_behaviors=config.point_behaviors or {},
+            start_time=start_time,
+            seed=seed,
+            base_step=float((config.simulation or {}).get("base_step_seconds", 60)),
+        )
+
+    def weather_rng(self) -> np.random.Generator:
+        """Generator for weather noise, a child stream of seed.
+
+        The simulator draws its OU, meter and alarm noise from children 0-2
+        of its own seed (often the same seed), so weather uses child 3.
+        """
+        return np.random.default_rng(_seed_children(self.seed, 4)[3])
+
+    def environment_for(self, dt: float) -> EnvironmentModel:
+        """Fresh copy of the environment with weather_persistence per dt."""
+        env = copy.deepcopy(self.environment)
+        env.weather_persistence = env.weather_persistence ** (dt / self.base_step)
+        env.reset_weather()
+        return env
+
+    def gains(self, point_type: str, mean: float) -> List[float]:
+        """Gains of a point on CONTEXT_SIGNALS (all zero: constant mean)."""
+        behavior = self.point_behaviors.get(point_type, {})
+        if point_type == "temperature":
+            day = behavior.get("setpoint_day", 21.0)
+            night = behavior.get("setpoint_night", 18.0)
+            heat = behavior.get("occupancy_influence", 2.0)
+            outdoor = behavior.get("outdoor_influence", 0.1)
+            # outdoor * (T_out - setpoint), the setpoint dropping at night
+            return [(1 - outdoor) * (night - day), heat, 0.0, outdoor, -outdoor * mean]
+        if point_type == "co2":
+            baseline = behavior.get("baseline", 400)
+            rise = min(behavior.get("occupancy_rate", 30) * 10, behavior.get("max_co2", 1500) - baseline)
+            return [0.0, rise, 0.0, 0.0, baseline - mean]
+        if point_type == "power":
+            base = behavior.get("base_load_ratio", 0.2)
+            load = behavior.get("occupancy_load_ratio", 0.8)
+            return [0.0, 0.0, mean * load, 0.0, mean * (base - 1)]
+        return [0.0] * len(self.CONTEXT_SIGNALS)
+
+    def signals(
+        self,
+        timestamps: np.ndarray,
+        environment: EnvironmentModel,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        """CONTEXT_SIGNALS over timestamps, shape (n_signals, n) float32."""
+        occ = self.occupancy.get_occupancy_array(timestamps)
+        env = environment.get_environment_array(timestamps, rng)
+        occupied = occ.is_occupied
+        return np.stack([
+            ~occupied,
+            occ.occupancy_level * occupied,
+            occ.occupancy_level,
+            env.outdoor_temp,
+            np.ones(len(timestamps)),
+        ]).astype(np.float32)
+
 
 @dataclass
 class VectorizedSimulator:
     """
     Generates all timeseries trajectories using vectorized NumPy operations.
 
-    Instead of 70k × 10k Python function calls, this performs a single
-    vectorized loop over timesteps with all points computed in parallel.
+    Instead of 70k × 10k Python function calls, this runs a blocked scan of
+    the OU recursion over all points at once (see generate_all).
     """
 
     n_points: int
@@ -114,28 +250,24 @@ class VectorizedSimulator:
     # Point type indices for special handling
     point_types: np.ndarray = field(default=None)  # int codes
 
+    # Time-varying means (see ContextModel), gains shape (n_points, n_signals)
+    context: ContextModel = field(default=None)
+    context_gains: np.ndarray = field(default=None)
+
     # Type codes for special handling
     TYPE_CONTINUOUS: int = 0
     TYPE_METER: int = 1
     TYPE_STATUS: int = 2
     TYPE_ALARM: int = 3
 
-    def generate_all(self, seed: int, show_progress: bool = False) -> np.ndarray:
-        """
-        Generate ALL trajectories in a single vectorized pass.
+    @property
+    def segment_steps(self) -> int:
+        """Timesteps generated per segment (a whole number of blocks)."""
+        per_block = 4 * max(1, self.n_points) * SIM_BLOCK_STEPS
+        return SIM_BLOCK_STEPS * max(1, SIM_SEGMENT_BYTES // per_block)
 
-        Args:
-            seed: Random seed for reproducibility
-            show_progress: Whether to show progress bar
-
-        Returns:
-            trajectories: Array of shape (n_points, n_timesteps)
-        """
-        from tqdm import tqdm
-
-        rng = np.random.default_rng(seed)
-
-        # Pre-compute OU coefficients (constant for all timesteps)
+    def _ou_coefficients(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-point decay e^(-θdt) and exact noise scale, as float32."""
         decay = np.exp(-self.thetas * self.dt)
 
         # Exact variance of OU process
@@ -148,63 +280,185 @@ class VectorizedSimulator:
                 self.sigmas ** 2 * self.dt  # θ→0 limit
             )
         noise_scale = np.sqrt(np.maximum(variance, 0))
+        return decay.astype(np.float32), noise_scale.astype(np.float32)
+
+    def generate_all(self, seed: int, show_progress: bool = False) -> np.ndarray:
+        """
+        Generate ALL trajectories with a blocked scan of the OU recursion.
+
+        Time is processed in segments of segment_steps, each split into
+        blocks of SIM_BLOCK_STEPS. Within a segment, the recursion is run
+        from a zero state for all blocks at once (SIM_BLOCK_STEPS vectorized
+        steps), then the true state entering each block is carried across
+        blocks and added back through the closed form
+        X[k] = μ + d^(k+1) (X_in - μ) + w[k]. Physical bounds clip every
+        emitted value and the state carried between blocks. Random numbers
+        are drawn in float32, one segment at a time, so peak memory is the
+        float32 trajectories plus one segment of temporaries. Draws are
+        made in time order (timestep-major), so the values do not depend on
+        the segment size.
 
-        # Pre-generate ALL random values at once (much faster)
-        randoms = rng.standard_normal((self.n_points, self.n_timesteps))
+        Args:
+            seed: Random seed for reproducibility
+            show_progress: Whether to show progress bar
 
-        # Allocate trajectories array
-        trajectories = np.zeros((self.n_points, self.n_timesteps), dtype=np.float32)
+        Returns:
+            trajectories: Array of shape (n_points, n_timesteps)
+        """
+        for _, trajectories in self.iter_windows(seed, self.n_timesteps, show_progress):
+            return trajectories
+        return np.empty((self.n_points, 0), dtype=np.float32)
 
-        # Initialize with setpoints (means)
-        trajectories[:, 0] = self.means
+    def window_steps_for(self, max_bytes: float, bytes_per_value: int = 8) -> int:
+        """Largest window (a multiple of segment_steps) fitting in max_bytes."""
+        per_step = bytes_per_value * max(1, self.n_points)
+        seg = self.segment_steps
+        return max(seg, int(max_bytes // per_step) // seg * seg)
 
-        # Add some initial variation
-        trajectories[:, 0] += noise_scale * randoms[:, 0] * 2
-        trajectories[:, 0] = np.clip(trajectories[:, 0], self.min_values, self.max_values)
+    def iter_windows(
+        self,
+        seed: int,
+        window_steps: int = None,
+        show_progress: bool = False,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Generate the trajectories as consecutive time windows.
 
-        # Vectorized OU simulation (single loop over time, all points in parallel)
-        time_range = range(1, self.n_timesteps)
-        if show_progress:
-            time_range = tqdm(
-                time_range,
-                desc="  Simulating timesteps",
-                unit="steps",
-                leave=False,
-            )
+        The OU state and the meter totals are carried from one window to the
+        next, and windows are rounded up to whole segments so that random
+        numbers are drawn exactly as in a single pass: concatenating the
+        windows gives the generate_all() result for the same seed. Only one
+        window is held in memory at a time.
 
-        for t in time_range:
-            # OU step: X[t] = μ + (X[t-1] - μ) × decay + noise
-            trajectories[:, t] = (
-                self.means +
-                (trajectories[:, t-1] - self.means) * decay +
-                noise_scale * randoms[:, t]
-            )
+        With a context, each segment adds (1 - d) × gains · signals(t) to
+        the noise before the scan, so the OU mean follows occupancy and
+        weather instead of staying constant.
 
-            # Clamp to physical bounds
-            trajectories[:, t] = np.clip(
-                trajectories[:, t],
-                self.min_values,
-                self.max_values
-            )
+        Args:
+            seed: Random seed (int or numpy SeedSequence)
+            window_steps: Timesteps per window (default: all of them)
+            show_progress: Whether to show progress bar
 
-        # Handle special types
-        if self.point_types is not None:
-            self._handle_special_types(trajectories, rng)
+        Yields:
+            (t0, window) with window of shape (n_points, steps)
+        """
+        from tqdm import tqdm
 
-        return trajectories
+        # OU noise, meters and alarms on separate streams, each drawn
+        # timestep-major so segments consume them in time order
+        rng, meter_rng, alarm_rng = [np.random.default_rng(child) for child in _seed_children(seed, 3)]
+        decay, noise_scale = self._ou_coefficients()
+        means = self.means.astype(np.float32)
+        lo = self.min_values.astype(np.float32)
+        hi = self.max_values.astype(np.float32)
+
+        L = SIM_BLOCK_STEPS
+        steps = np.arange(1, L + 1, dtype=np.float32)
+        # d^(k+1) per block position and point, shape (L, n_points)
+        carry_gain = decay[np.newaxis, :] ** steps[:, np.newaxis]
+        block_gain = carry_gain[L - 1]
+
+        # State before t=0: setpoint plus some initial variation
+        state = np.clip(
+            means + noise_scale * rng.standard_normal(self.n_points, dtype=np.float32) * 2, lo, hi
+        )
+        meter_total = None
 
-    def _handle_special_types(self, trajectories: np.ndarray, rng: np.random.Generator):
-        """Apply special transformations for meter, status, alarm types."""
+        # Context signals run on their own weather state and generator
+        forced = (
+            self.context is not None and self.context_gains is not None and np.any(self.context_gains)
+        )
+        if forced:
+            # (1 - d) × gains, so the forcing is one matmul per segment
+            gains = ((1 - decay)[:, np.newaxis] * self.context_gains).astype(np.float32)
+            env = self.context.environment_for(self.dt)
+            env_rng = self.context.weather_rng()
+            start_ts = np.datetime64(self.context.start_time, 'us')
+            dt_us = np.int64(self.dt * 1_000_000)
+
+        seg_steps = self.segment_steps
+        window_steps = self.n_timesteps if window_steps is None else window_steps
+        window_steps = max(seg_steps, -(-window_steps // seg_steps) * seg_steps)
+
+        segments = range(0, self.n_timesteps, seg_steps)
+        if show_progress:
+            segments = tqdm(segments, desc="  Simulating segments", unit="seg", leave=False)
+
+        window = None
+        w0 = 0
+        for t0 in segments:
+            if t0 % window_steps == 0:
+                if window is not None:
+                    yield w0, window
+                w0 = t0
+                window = np.empty(
+                    (self.n_points, min(window_steps, self.n_timesteps - t0)), dtype=np.float32
+                )
+            n_steps = min(seg_steps, self.n_timesteps - t0)
+            n_blocks = -(-n_steps // L)
+
+            # Zero-start recursion inside every block: w[k] = d w[k-1] + noise[k]
+            # w has shape (n_blocks, L, n_points), i.e. timestep-major
+            w = rng.standard_normal((n_blocks, L, self.n_points), dtype=np.float32)
+            w *= noise_scale
+            if forced:
+                ts = start_ts + (t0 + np.arange(n_blocks * L, dtype=np.int64)) * dt_us
+                signals = self.context.signals(ts, env, env_rng)
+                # (steps, n_signals) @ (n_signals, n_points)
+                w += (signals.T @ gains.T).reshape(w.shape)
+            for k in range(1, L):
+                w[:, k] += decay * w[:, k - 1]
+
+            # State entering each block (sequential over blocks only)
+            entry = np.empty((n_blocks, self.n_points), dtype=np.float32)
+            for b in range(n_blocks):
+                entry[b] = state
+                state = np.clip(means + block_gain * (state - means) + w[b, L - 1], lo, hi)
+
+            w += carry_gain * (entry - means)[:, np.newaxis, :]
+            w += means
+            np.clip(w, lo, hi, out=w)
+
+            segment = window[:, t0 - w0:t0 - w0 + n_steps]
+            segment[:] = w.reshape(n_blocks * L, self.n_points)[:n_steps].T
+            del w, entry
+
+            # Handle special types
+            if self.point_types is not None:
+                meter_total = self._handle_special_types(segment, meter_rng, alarm_rng, meter_total)
+
+        if window is not None:
+            yield w0, window
+
+    def _handle_special_types(
+        self,
+        trajectories: np.ndarray,
+        meter_rng: np.random.Generator,
+        alarm_rng: np.random.Generator,
+        meter_total: np.ndarray = None,
+    ) -> np.ndarray:
+        """Apply special transformations for meter, status, alarm types.
+
+        trajectories may be a time segment; meter_total carries the meter
+        readings at the end of the previous segment. Returns the readings at
+        the end of this one.
+        """
+        n_steps = trajectories.shape[1]
 
         # Meter/Energy: cumulative sum of related power points
         meter_mask = self.point_types == self.TYPE_METER
         if np.any(meter_mask):
             # For meters, generate a base consumption rate and cumsum
-            base_rate = self.means[meter_mask] / (24 * 60)  # per minute
-            noise = rng.standard_normal((np.sum(meter_mask), self.n_timesteps)) * 0.1
+            base_rate = (self.means[meter_mask] / (24 * 60)).astype(np.float32)  # per minute
+            noise = meter_rng.standard_normal((n_steps, np.sum(meter_mask)), dtype=np.float32).T * np.float32(0.1)
             rates = base_rate[:, np.newaxis] * (1 + noise)
-            rates = np.maximum(rates, 0)
-            trajectories[meter_mask, :] = np.cumsum(rates, axis=1)
+            rates = np.maximum(rates, 0).astype(np.float64)
+            # Sum on from the previous total, so segments add up as one pass
+            if meter_total is not None:
+                rates[:, 0] += meter_total
+            readings = np.cumsum(rates, axis=1)
+            trajectories[meter_mask, :] = readings
+            meter_total = readings[:, -1]
 
         # Status: threshold to binary 0/1
         status_mask = self.point_types == self.TYPE_STATUS
@@ -218,65 +472,269 @@ class VectorizedSimulator:
             n_alarms = np.sum(alarm_mask)
             # Poisson process: ~0.5 events per day per point
             event_prob = 0.5 / (24 * 60)  # per minute
-            events = rng.random((n_alarms, self.n_timesteps)) < event_prob
+            events = alarm_rng.random((n_steps, n_alarms), dtype=np.float32).T < event_prob
             trajectories[alarm_mask, :] = events.astype(np.float32)
 
+        return meter_total
+
+    def deadband_mask(
+        self,
+        trajectories: np.ndarray,
+        last_transmitted: np.ndarray = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mark the samples a change-of-value (deadband) filter transmits.
+
+        A sample is transmitted when it differs from the last transmitted
+        value of its point by more than the deadband. The time axis is cut
+        into segments of DEADBAND_SEGMENT_STEPS that are filtered all at once
+        (vectorized over points × segments) as if each segment started with
+        a transmission. Segments are then corrected in order from the true
+        last transmitted value, step by step but only until the two runs hold
+        the same last value, after which they coincide. Points are processed
+        in row blocks to bound the temporaries.
+
+        Args:
+            trajectories: shape (n_points, n_timesteps)
+            last_transmitted: last values transmitted before this window,
+                shape (n_points,); None transmits the first timestep
+
+        Returns:
+            mask: bool array (n_points, n_timesteps), True where transmitted
+            last_tx: last transmitted value per point at the end of the window
+        """
+        n_points, n_timesteps = trajectories.shape
+        mask = np.zeros((n_points, n_timesteps), dtype=bool)
+        last_out = np.empty(n_points, dtype=trajectories.dtype)
+        if n_points == 0 or n_timesteps == 0:
+            if last_transmitted is not None:
+                last_out[:] = last_transmitted
+            return mask, last_out
+
+        seg = min(DEADBAND_SEGMENT_STEPS, n_timesteps)
+        n_seg = -(-n_timesteps // seg)
+        rows_per_block = max(1, DEADBAND_BLOCK_BYTES // (5 * seg * n_seg))
+        deadbands = np.asarray(self.deadbands, dtype=np.float64)
+
+        for r0 in range(0, n_points, rows_per_block):
+            rows = slice(r0, min(r0 + rows_per_block, n_points))
+            block = trajectories[rows]
+            n_rows = block.shape[0]
+            db = deadbands[rows]
+
+            # Pad to whole segments with the last value (never transmitted),
+            # laid out (step, point, segment) so each step is one contiguous slab
+            padded = np.pad(block, ((0, 0), (0, n_seg * seg - n_timesteps)), mode="edge")
+            x = np.ascontiguousarray(padded.reshape(n_rows, n_seg, seg).transpose(2, 0, 1))
+            del padded
+            tx = np.empty((seg, n_rows, n_seg), dtype=bool)
+
+            # Pass 1: every segment assumes a transmission at its first step
+            tx[0] = True
+            last = x[0].copy()
+            diff = np.empty_like(last)
+            db_col = db[:, np.newaxis]
+            for k in range(1, seg):
+                np.subtract(x[k], last, out=diff)
+                np.abs(diff, out=diff)
+                np.greater(diff, db_col, out=tx[k])
+                np.copyto(last, x[k], where=tx[k])
+            spec_end = last
+
+            # Pass 2: replay each segment from the true last value until synced
+            if last_transmitted is None:
+                true_last = spec_end[:, 0].copy()
+                first = 1
+            else:
+                true_last = np.asarray(last_transmitted, dtype=block.dtype)[rows].copy()
+                first = 0
+            for j in range(first, n_seg):
+                active = np.arange(n_rows)
+                cur_last = true_last
+                spec_last = x[0, :, j].copy()
+                for k in range(seg):
+                    cur = x[k, active, j]
+                    sent = np.abs(cur - cur_last) > db[active]
+                    spec_last = np.where(tx[k, active, j], cur, spec_last)
+                    cur_last = np.where(sent, cur, cur_last)
+                    tx[k, active, j] = sent
+                    keep = cur_last != spec_last
+                    active, cur_last, spec_last = active[keep], cur_last[keep], spec_last[keep]
+                    if active.size == 0:
+                        break
+                true_last = spec_end[:, j].copy()
+                true_last[active] = cur_last
+
+            mask[rows] = tx.transpose(1, 2, 0).reshape(n_rows, n_seg * seg)[:, :n_timesteps]
+            last_out[rows] = true_last
+            del x, tx
+
+        return mask, last_out
+
     def apply_deadband_vectorized(
         self,
         trajectories: np.ndarray,
         last_transmitted: np.ndarray = None,
+        order: str = "time",
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Apply deadband filtering using fully vectorized operations.
+        Apply deadband filtering (see deadband_mask) and return the samples.
 
         Returns three arrays that can be used to construct samples efficiently.
 
         Args:
             trajectories: shape (n_points, n_timesteps)
             last_transmitted: initial last transmitted values, shape (n_points,)
+            order: "time" (by timestep, then point) or "point" (by point,
+                then timestep)
 
         Returns:
             point_indices: array of point indices for transmitted samples
             time_indices: array of time indices for transmitted samples
             values: array of transmitted values
         """
-        n_points, n_timesteps = trajectories.shape
-
-        # Track last transmitted value per point
-        if last_transmitted is None:
-            last_tx = trajectories[:, 0].copy()
+        mask, _ = self.deadband_mask(trajectories, last_transmitted)
+        if order == "point":
+            point_indices, time_indices = np.nonzero(mask)
+            values = trajectories[mask]
         else:
-            last_tx = last_transmitted.copy()
+            time_indices, point_indices = np.nonzero(mask.T)
+            values = trajectories[point_indices, time_indices]
+        return point_indices, time_indices, values
 
-        # First timestep is always transmitted
-        all_point_indices = [np.arange(n_points)]
-        all_time_indices = [np.zeros(n_points, dtype=np.int64)]
-        all_values = [trajectories[:, 0]]
+    def iter_deadband_batches(
+        self,
+        trajectories: np.ndarray,
+        point_ids: List[str],
+        start_time: datetime,
+        last_transmitted: np.ndarray = None,
+        rows_per_batch: int = 1_000_000,
+    ):
+        """
+        Yield the deadband-filtered samples as Arrow record batches.
 
-        # For each subsequent timestep, check deadband
-        for t in range(1, n_timesteps):
-            current_values = trajectories[:, t]
+        Batches hold whole points (point_id, timestamp, value), in point
+        order then time order; only one batch of samples is materialized at
+        a time besides the transmission mask.
 
-            # Check which points exceed deadband
-            exceeds = np.abs(current_values - last_tx) > self.deadbands
+        Args:
+            trajectories: shape (n_points, n_timesteps)
+            point_ids: ID of each trajectory row
+            start_time: Timestamp of timestep 0
+            last_transmitted: initial last transmitted values, shape (n_points,)
+            rows_per_batch: Target samples per batch
 
-            if np.any(exceeds):
-                # Get indices of points that exceeded
-                point_idxs = np.where(exceeds)[0]
+        Yields:
+            pyarrow.RecordBatch
+        """
+        mask, _ = self.deadband_mask(trajectories, last_transmitted)
+        yield from _mask_batches(trajectories, mask, point_ids, start_time, self.dt, rows_per_batch)
 
-                all_point_indices.append(point_idxs)
-                all_time_indices.append(np.full(len(point_idxs), t, dtype=np.int64))
-                all_values.append(current_values[exceeds])
+    def iter_window_batches(
+        self,
+        seed: int,
+        point_ids: List[str],
+        start_time: datetime,
+        window_steps: int = None,
+        deadband: bool = True,
+        rows_per_batch: int = 1_000_000,
+        work_dir: str = None,
+    ):
+        """
+        Simulate window by window (see iter_windows) and yield Arrow batches.
 
-                # Update last transmitted for these points
-                last_tx[exceeds] = current_values[exceeds]
+        The last transmitted value of each point is carried into the next
+        window, so the samples are the ones a single pass would transmit.
+        Batches are in point order then time order, as with a single window:
+        when there are several, each window is spilled to an Arrow IPC file
+        in blocks of points, and the blocks of all windows are merged one at
+        a time, so memory stays bounded by one window or one block.
 
-        # Concatenate all results
-        return (
-            np.concatenate(all_point_indices),
-            np.concatenate(all_time_indices),
-            np.concatenate(all_values),
-        )
+        Args:
+            seed: Random seed (int or numpy SeedSequence)
+            point_ids: ID of each point
+            start_time: Timestamp of timestep 0
+            window_steps: Timesteps per window (default: all of them)
+            deadband: Apply the deadband filter (False keeps every sample)
+            rows_per_batch: Target samples per batch (and per merged block)
+            work_dir: Where to spill windows (default: system temp dir)
+
+        Yields:
+            pyarrow.RecordBatch
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import shutil
+        import tempfile
+        from pathlib import Path
+
+        windows = self.iter_windows(seed, window_steps)
+        last_tx = None
+
+        def window_mask(window):
+            nonlocal last_tx
+            if deadband:
+                mask, last_tx = self.deadband_mask(window, last_tx)
+                return mask
+            return np.ones(window.shape, dtype=bool)
+
+        first = next(windows, None)
+        if first is None:
+            return
+        if first[1].shape[1] >= self.n_timesteps:
+            yield from _mask_batches(first[1], window_mask(first[1]), point_ids, start_time, self.dt, rows_per_batch)
+            return
+
+        # Several windows: spill each one as blocks of whole points
+        block_points = max(1, rows_per_batch // max(1, self.n_timesteps))
+        spill_dir = Path(tempfile.mkdtemp(prefix="btb_windows_", dir=work_dir))
+        schema = pa.schema([("point_idx", pa.int32()), ("timestamp", pa.timestamp("us")), ("value", pa.float32())])
+        options = pa.ipc.IpcWriteOptions(compression="lz4")
+        start_ts = np.datetime64(start_time, 'us')
+        dt_us = np.int64(self.dt * 1_000_000)
+        try:
+            paths = []
+            for t0, window in itertools.chain([first], windows):
+                mask = window_mask(window)
+                path = spill_dir / f"window{len(paths):05d}.arrow"
+                with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+                    for p0 in range(0, self.n_points, block_points):
+                        point_idx, time_idx = np.nonzero(mask[p0:p0 + block_points])
+                        writer.write_batch(pa.RecordBatch.from_arrays(
+                            [
+                                pa.array((point_idx + p0).astype(np.int32)),
+                                pa.array(start_ts + (time_idx.astype(np.int64) + t0) * dt_us, type=pa.timestamp("us")),
+                                pa.array(window[p0:p0 + block_points][mask[p0:p0 + block_points]], type=pa.float32()),
+                            ],
+                            schema=schema,
+                        ))
+                paths.append(path)
+                del window, mask
+
+            # Merge: block b of every window, stably sorted by point
+            ids = pa.array(point_ids, type=pa.string())
+            sources = [pa.memory_map(str(path)) for path in paths]
+            try:
+                readers = [pa.ipc.open_file(source) for source in sources]
+                for b in range(readers[0].num_record_batches):
+                    block = pa.Table.from_batches([reader.get_batch(b) for reader in readers], schema=schema)
+                    if block.num_rows == 0:
+                        continue
+                    block = block.take(pc.sort_indices(block, [("point_idx", "ascending")]))
+                    yield pa.RecordBatch.from_arrays(
+                        [
+                            ids.take(block.column("point_idx").combine_chunks()),
+                            block.column("timestamp").combine_chunks(),
+                            block.column("value").combine_chunks(),
+                        ],
+                        names=["point_id", "timestamp", "value"],
+                    )
+                    del block
+            finally:
+                for source in sources:
+                    source.close()
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
 
     def apply_deadband(
         self,
@@ -297,11 +755,46 @@ class VectorizedSimulator:
             yield (int(p_idx), int(t_idx), float(val))
 
 
+def _mask_batches(
+    trajectories: np.ndarray,
+    mask: np.ndarray,
+    point_ids: List[str],
+    start_time: datetime,
+    dt: float,
+    rows_per_batch: int,
+):
+    """Yield the masked samples as (point_id, timestamp, value) record batches of whole points."""
+    import pyarrow as pa
+
+    counts = mask.sum(axis=1)
+    ids = pa.array(point_ids, type=pa.string())
+    start_ts = np.datetime64(start_time, 'us')
+    dt_us = np.int64(dt * 1_000_000)
+
+    p0 = 0
+    while p0 < len(counts):
+        # Whole points up to about rows_per_batch samples
+        cum = np.cumsum(counts[p0:])
+        p1 = p0 + max(1, int(np.searchsorted(cum, rows_per_batch, side="right")))
+        point_idx, time_idx = np.nonzero(mask[p0:p1])
+        if len(point_idx):
+            yield pa.RecordBatch.from_arrays(
+                [
+                    ids.take(pa.array(point_idx + p0)),
+                    pa.array(start_ts + time_idx.astype(np.int64) * dt_us, type=pa.timestamp("us")),
+                    pa.array(trajectories[p0:p1][mask[p0:p1]], type=pa.float32()),
+                ],
+                names=["point_id", "timestamp", "value"],
+            )
+        p0 = p1
+
+
 def create_simulator_from_points(
     points: List[Any],  # List of PointInfo objects
     n_timesteps: int,
     dt: float = 60.0,
     classify_func: callable = None,
+    context: ContextModel = None,
 ) -> VectorizedSimulator:
     """
     Create a VectorizedSimulator from a list of point objects.
@@ -311,6 +804,7 @@ def create_simulator_from_points(
         n_timesteps: Number of timesteps to simulate
         dt: Time step in seconds
         classify_func: Function to classify point type from PointInfo
+        context: Occupancy/weather model modulating the means (None = constant)
 
     Returns:
         Configured VectorizedSimulator
@@ -325,6 +819,9 @@ def create_simulator_from_points(
     min_values = np.zeros(n_points)
     max_values = np.zeros(n_points)
     point_types = np.zeros(n_points, dtype=np.int64)
+    context_gains = None
+    if context is not None:
+        context_gains = np.zeros((n_points, len(ContextModel.CONTEXT_SIGNALS)))
 
     for i, point in enumerate(points):
         # Get point type
@@ -358,6 +855,9 @@ def create_simulator_from_points(
         else:
             point_types[i] = VectorizedSimulator.TYPE_CONTINUOUS
 
+        if context is not None and point_types[i] == VectorizedSimulator.TYPE_CONTINUOUS:
+            context_gains[i] = context.gains(ptype, means[i])
+
     return VectorizedSimulator(
         n_points=n_points,
         n_timesteps=n_timesteps,
@@ -369,6 +869,8 @@ def create_simulator_from_points(
         min_values=min_values,
         max_values=max_values,
         point_types=point_types,
+        context=context,
+        context_gains=context_gains,
     )
 
 
@@ -410,6 +912,7 @@ def generate_timeseries_vectorized(
     dt: float = 60.0,
     show_progress: bool = True,
     classify_func: callable = None,
+    context: Optional[ContextModel] = None,
 ) -> Iterator[Tuple[str, datetime, float]]:
     """
     High-level function to generate timeseries using vectorized simulation.
@@ -424,6 +927,7 @@ def generate_timeseries_vectorized(
         dt: Time step in seconds (default 60)
         show_progress: Whether to show progress bar
         classify_func: Optional function to classify point types
+        context: Occupancy/weather model modulating the means (see ContextModel)
 
     Yields:
         (point_id, timestamp, value) tuples for each transmitted sample
@@ -442,11 +946,12 @@ def generate_timeseries_vectorized(
         n_timesteps=n_timesteps,
         dt=dt,
         classify_func=classify_func,
+        context=context,
     )
 
     # Generate all trajectories
     if show_progress:
-        mem_estimate_gb = (n_points * n_timesteps * 8) / (1024**3)
+        mem_estimate_gb = (n_points * n_timesteps * 4) / (1024**3)
         print(f"  Allocating {mem_estimate_gb:.2f} GB for trajectories...")
 
     trajectories = simulator.generate_all(seed, show_progress=show_progress)
@@ -501,6 +1006,7 @@ def export_timeseries_parquet_direct(
     show_progress: bool = True,
     classify_func=None,
     batch_size: int = 10_000_000,
+    context: Optional[ContextModel] = None,
 ) -> Dict[str, Any]:
     """
     Export timeseries directly to Parquet without Python iteration.
@@ -520,6 +1026,7 @@ def export_timeseries_parquet_direct(
         show_progress: Whether to show progress
         classify_func: Optional function to classify point types
         batch_size: Number of rows per Parquet batch (default 10M)
+        context: Occupancy/weather model modulating the means (see ContextModel)
 
     Returns:
         Dictionary with export statistics
@@ -541,11 +1048,12 @@ def export_timeseries_parquet_direct(
         n_timesteps=n_timesteps,
         dt=dt,
         classify_func=classify_func,
+        context=context,
     )
 
     # Generate trajectories
     if show_progress:
-        mem_estimate_gb = (n_points * n_timesteps * 8) / (1024**3)
+        mem_estimate_gb = (n_points * n_timesteps * 4) / (1024**3)
         print(f"  Allocating {mem_estimate_gb:.2f} GB for trajectories...")
 
     trajectories = simulator.generate_all(seed, show_progress=show_progress)
@@ -652,12 +1160,15 @@ def export_timeseries_parquet_chunked(
     show_progress: bool = True,
     classify_func: Optional[Callable[[str], str]] = None,
     max_ram_gb: float = 10.0,
+    context: Optional[ContextModel] = None,
 ) -> Dict[str, Any]:
     """
     Export timeseries to Parquet using CHUNKED processing to limit RAM usage.
     
-    Processes points in chunks to avoid OOM on large datasets.
-    Limits memory to approximately max_ram_gb.
+    All points are simulated together, in time windows sized so that one
+    window fits in approximately max_ram_gb (see iter_window_batches). The
+    samples equal those of a single pass with the same seed, grouped by
+    point then time.
     
     Args:
         points: List of PointInfo objects
@@ -669,6 +1180,7 @@ def export_timeseries_parquet_chunked(
         show_progress: Show progress
         classify_func: Point classification function
         max_ram_gb: Maximum RAM to use (default 10 GB)
+        context: Occupancy/weather model modulating the means (see ContextModel)
     
     Returns:
         Dict with statistics
@@ -681,18 +1193,22 @@ def export_timeseries_parquet_chunked(
     n_timesteps = int(duration_days * 24 * 60 * 60 / dt)
     n_points = len(points)
     
-    # Calculate chunk size based on max RAM
-    # Each trajectory: n_timesteps * 8 bytes (float64)
-    bytes_per_point = n_timesteps * 8
-    max_points_per_chunk = int((max_ram_gb * 1024**3) / bytes_per_point)
-    max_points_per_chunk = max(100, min(max_points_per_chunk, n_points))
+    simulator = create_simulator_from_points(
+        points=points,
+        n_timesteps=n_timesteps,
+        dt=dt,
+        classify_func=classify_func,
+        context=context,
+    )
     
-    n_chunks = (n_points + max_points_per_chunk - 1) // max_points_per_chunk
+    # Window length based on max RAM (float32 trajectories + deadband state)
+    window_steps = simulator.window_steps_for(max_ram_gb * 1024**3, WINDOW_BYTES_PER_VALUE)
+    n_windows = max(1, -(-n_timesteps // window_steps))
     
     if show_progress:
-        mem_per_chunk_gb = (max_points_per_chunk * n_timesteps * 8) / (1024**3)
+        mem_per_window_gb = (n_points * min(window_steps, n_timesteps) * WINDOW_BYTES_PER_VALUE) / (1024**3)
         print(f"  Chunked simulation: {n_points:,} points × {n_timesteps:,} timesteps")
-        print(f"  Processing in {n_chunks} chunks of {max_points_per_chunk:,} points (~{mem_per_chunk_gb:.1f} GB/chunk)")
+        print(f"  Processing in {n_windows} windows of {window_steps:,} timesteps (~{mem_per_window_gb:.1f} GB/window)")
     
     # Prepare Parquet writer
     schema = pa.schema([
@@ -707,64 +1223,18 @@ def export_timeseries_parquet_chunked(
     writer = pq.ParquetWriter(str(output_path), schema)
     
     total_samples = 0
-    rng = np.random.default_rng(seed)
     
-    # Process chunks
-    chunk_iter = range(n_chunks)
+    # Simulate window by window, carrying state, and apply deadband filtering;
+    # windows are spilled next to the output and merged back in point order
+    batches = simulator.iter_window_batches(
+        seed, [p.id for p in points], start_time, window_steps, work_dir=output_path.parent
+    )
     if show_progress:
-        chunk_iter = tqdm(chunk_iter, desc="  Processing chunks", unit="chunk")
+        batches = tqdm(batches, desc="  Writing batches", unit="batch")
     
-    for chunk_idx in chunk_iter:
-        start_pt = chunk_idx * max_points_per_chunk
-        end_pt = min(start_pt + max_points_per_chunk, n_points)
-        chunk_points = points[start_pt:end_pt]
-        chunk_seed = seed + chunk_idx  # Different seed per chunk for variety
-        
-        # Create simulator for this chunk
-        simulator = create_simulator_from_points(
-            points=chunk_points,
-            n_timesteps=n_timesteps,
-            dt=dt,
-            classify_func=classify_func,
-        )
-        
-        # Generate trajectories for this chunk
-        trajectories = simulator.generate_all(chunk_seed, show_progress=False)
-        
-        # Apply deadband filtering
-        point_indices, time_indices, values = simulator.apply_deadband_vectorized(trajectories)
-        
-        # Free trajectory memory
-        del trajectories
-        
-        n_samples = len(values)
-        if n_samples == 0:
-            continue
-        
-        # Build point IDs for this chunk
-        point_ids_list = [p.id for p in chunk_points]
-        point_ids_array = np.array(point_ids_list, dtype=object)
-        
-        # Compute timestamps
-        start_ts = np.datetime64(start_time, 'us')
-        dt_us = np.int64(dt * 1_000_000)
-        timestamps = start_ts + (time_indices.astype(np.int64) * dt_us)
-        
-        # Map point indices to IDs
-        point_id_column = point_ids_array[point_indices]
-        
-        # Write to Parquet
-        table = pa.table({
-            "point_id": pa.array(point_id_column, type=pa.string()),
-            "timestamp": pa.array(timestamps, type=pa.timestamp("us")),
-            "value": pa.array(values, type=pa.float32()),
-        })
-        
-        writer.write_table(table)
-        total_samples += n_samples
-        
-        # Free memory
-        del point_indices, time_indices, values, timestamps, point_id_column, table
+    for batch in batches:
+        writer.write_batch(batch)
+        total_samples += batch.num_rows
     
     writer.close()
     
@@ -778,7 +1248,7 @@ def export_timeseries_parquet_chunked(
         "n_samples": total_samples,
         "compression_pct": 100 * (1 - total_samples / (n_points * n_timesteps)) if n_points * n_timesteps > 0 else 0,
         "file_size_bytes": output_path.stat().st_size,
-        "n_chunks": n_chunks,
+        "n_chunks": n_windows,
     }
 
 
@@ -791,6 +1261,8 @@ def export_timeseries_parquet_by_frequency(
     show_progress: bool = True,
     classify_func: Optional[Callable[[str], str]] = None,
     max_ram_gb: float = 10.0,
+    workers: Optional[int] = None,
+    context: Optional[ContextModel] = None,
 ) -> Dict[str, Any]:
     """
     Export timeseries to Parquet using REALISTIC Digital Twin semantics.
@@ -809,7 +1281,13 @@ def export_timeseries_parquet_by_frequency(
         seed: Random seed
         show_progress: Show progress
         classify_func: Point classification function
-        max_ram_gb: Maximum RAM per frequency group
+        max_ram_gb: Maximum RAM per frequency group; groups that do not fit
+            are simulated in time windows (rows stay grouped by point)
+        workers: If set, simulate shards of SIM_SHARD_POINTS points on this
+            many processes (see parallel.iter_shard_batches). Shard seeds
+            are spawned from seed, so the file is the same for any worker
+            count, but differs from the single-pass output (workers=None)
+        context: Occupancy/weather model modulating the means (see ContextModel)
     
     Returns:
         Dict with statistics
@@ -924,10 +1402,48 @@ def export_timeseries_parquet_by_frequency(
     energy_samples = 0
     regular_samples = 0
     
+    # =========================================================================
+    # 0. Sharded mode: all groups as shards on a process pool, in group order
+    # =========================================================================
+    if workers:
+        from .parallel import iter_shard_batches, shard_tasks
+        
+        tasks = []
+        if energy_points:
+            n_timesteps_energy = int(duration_days * 24 * 3600 / 900)
+            tasks += shard_tasks(
+                [p for p, _ in energy_points], n_timesteps_energy, 900.0,
+                np.random.SeedSequence([seed, 0]), start_time,
+                deadband=False, classify_func=classify_func, context=context,
+            )
+            total_raw_samples += len(energy_points) * n_timesteps_energy
+        n_energy_tasks = len(tasks)
+        
+        for freq in sorted(regular_points_by_freq.keys()):
+            group_points = regular_points_by_freq[freq]
+            n_timesteps = int(duration_days * 24 * 3600 / freq)
+            tasks += shard_tasks(
+                group_points, n_timesteps, float(freq),
+                np.random.SeedSequence([seed, freq]), start_time,
+                classify_func=classify_func, context=context,
+            )
+            total_raw_samples += len(group_points) * n_timesteps
+        
+        if show_progress:
+            print(f"  Sharded simulation: {len(tasks)} shards on {workers} workers")
+        
+        for task_idx, batch in iter_shard_batches(tasks, workers, output_path.parent):
+            writer.write_batch(batch)
+            total_samples += batch.num_rows
+            if task_idx < n_energy_tasks:
+                energy_samples += batch.num_rows
+            else:
+                regular_samples += batch.num_rows
+    
     # =========================================================================
     # 1. Process ENERGY points: NO deadband, fixed 15-minute intervals
     # =========================================================================
-    if energy_points:
+    if energy_points and not workers:
         energy_dt = 900.0  # 15 minutes
         n_timesteps_energy = int(duration_days * 24 * 3600 / energy_dt)
         
@@ -937,72 +1453,30 @@ def export_timeseries_parquet_by_frequency(
         if show_progress:
             print(f"  Processing energy points: {len(energy_pts_only):,} × {n_timesteps_energy:,} timesteps (no deadband)")
         
-        # Process energy points in chunks if needed
-        mem_gb = (len(energy_pts_only) * n_timesteps_energy * 8) / (1024**3)
-        
-        if mem_gb > max_ram_gb:
-            max_pts = int((max_ram_gb * 1024**3) / (n_timesteps_energy * 8))
-            max_pts = max(100, max_pts)
-        else:
-            max_pts = len(energy_pts_only)
+        # Simulate in time windows if the full grid does not fit in max_ram_gb
+        simulator = create_simulator_from_points(
+            points=energy_pts_only,
+            n_timesteps=n_timesteps_energy,
+            dt=energy_dt,
+            classify_func=classify_func,
+            context=context,
+        )
+        window_steps = simulator.window_steps_for(max_ram_gb * 1024**3, WINDOW_BYTES_PER_VALUE)
         
-        for chunk_start in range(0, len(energy_pts_only), max_pts):
-            chunk_end = min(chunk_start + max_pts, len(energy_pts_only))
-            chunk_points = energy_pts_only[chunk_start:chunk_end]
-            chunk_seed = seed + chunk_start
-            
-            # Create simulator
-            simulator = create_simulator_from_points(
-                points=chunk_points,
-                n_timesteps=n_timesteps_energy,
-                dt=energy_dt,
-                classify_func=classify_func,
-            )
-            
-            # Generate trajectories
-            trajectories = simulator.generate_all(chunk_seed, show_progress=False)
-            
-            # NO deadband for energy - keep ALL values
-            n_pts_chunk = len(chunk_points)
-            n_samples_chunk = n_pts_chunk * n_timesteps_energy
-            
-            # Build arrays for all samples (no filtering)
-            point_ids_list = [p.id for p in chunk_points]
-            point_ids_array = np.array(point_ids_list, dtype=object)
-            
-            # Create full index arrays
-            point_indices = np.repeat(np.arange(n_pts_chunk), n_timesteps_energy)
-            time_indices = np.tile(np.arange(n_timesteps_energy), n_pts_chunk)
-            values = trajectories.flatten()
-            
-            # Compute timestamps
-            start_ts = np.datetime64(start_time, 'us')
-            dt_us = np.int64(energy_dt * 1_000_000)
-            timestamps = start_ts + (time_indices.astype(np.int64) * dt_us)
-            
-            # Map point indices to IDs
-            point_id_column = point_ids_array[point_indices]
-            
-            # Write to Parquet
-            table = pa.table({
-                "point_id": pa.array(point_id_column, type=pa.string()),
-                "timestamp": pa.array(timestamps, type=pa.timestamp("us")),
-                "value": pa.array(values, type=pa.float32()),
-            })
-            
-            writer.write_table(table)
-            
-            energy_samples += n_samples_chunk
-            total_samples += n_samples_chunk
-            total_raw_samples += n_samples_chunk
-            
-            # Free memory
-            del trajectories, point_indices, time_indices, values, timestamps, point_id_column, table
+        # NO deadband for energy - keep ALL values
+        for batch in simulator.iter_window_batches(
+            seed, [p.id for p in energy_pts_only], start_time, window_steps, deadband=False,
+            work_dir=output_path.parent,
+        ):
+            writer.write_batch(batch)
+            energy_samples += batch.num_rows
+            total_samples += batch.num_rows
+            total_raw_samples += batch.num_rows
     
     # =========================================================================
     # 2. Process REGULAR points: WITH deadband, grouped by storage frequency
     # =========================================================================
-    if regular_points_by_freq:
+    if regular_points_by_freq and not workers:
         if show_progress:
             print(f"  Regular points by storage frequency (with deadband):")
             for freq in sorted(regular_points_by_freq.keys()):
@@ -1024,71 +1498,29 @@ def export_timeseries_parquet_by_frequency(
             if n_timesteps == 0:
                 continue
             
-            # Check memory for this group
-            mem_gb = (n_points_group * n_timesteps * 8) / (1024**3)
+            # Create simulator
+            simulator = create_simulator_from_points(
+                points=group_points,
+                n_timesteps=n_timesteps,
+                dt=dt,
+                classify_func=classify_func,
+                context=context,
+            )
             
-            if mem_gb > max_ram_gb:
-                max_points_per_chunk = int((max_ram_gb * 1024**3) / (n_timesteps * 8))
-                max_points_per_chunk = max(100, max_points_per_chunk)
-                n_chunks = (n_points_group + max_points_per_chunk - 1) // max_points_per_chunk
-            else:
-                max_points_per_chunk = n_points_group
-                n_chunks = 1
+            # Simulate in time windows if the full grid does not fit in
+            # max_ram_gb; the last transmitted values carry over windows
+            window_steps = simulator.window_steps_for(max_ram_gb * 1024**3, WINDOW_BYTES_PER_VALUE)
             
-            for chunk_idx in range(n_chunks):
-                start_pt = chunk_idx * max_points_per_chunk
-                end_pt = min(start_pt + max_points_per_chunk, n_points_group)
-                chunk_points = group_points[start_pt:end_pt]
-                chunk_seed = seed + freq + chunk_idx
-                
-                # Create simulator
-                simulator = create_simulator_from_points(
-                    points=chunk_points,
-                    n_timesteps=n_timesteps,
-                    dt=dt,
-                    classify_func=classify_func,
-                )
-                
-                # Generate trajectories
-                trajectories = simulator.generate_all(chunk_seed, show_progress=False)
-                
-                # Apply DEADBAND filtering (this is the key difference)
-                point_indices, time_indices, values = simulator.apply_deadband_vectorized(trajectories)
-                
-                # Free memory
-                del trajectories
-                
-                n_samples = len(values)
-                if n_samples == 0:
-                    continue
-                
-                total_raw_samples += len(chunk_points) * n_timesteps
-                
-                # Build point IDs
-                point_ids_list = [p.id for p in chunk_points]
-                point_ids_array = np.array(point_ids_list, dtype=object)
-                
-                # Compute timestamps
-                start_ts = np.datetime64(start_time, 'us')
-                dt_us = np.int64(dt * 1_000_000)
-                timestamps = start_ts + (time_indices.astype(np.int64) * dt_us)
-                
-                # Map point indices to IDs
-                point_id_column = point_ids_array[point_indices]
-                
-                # Write to Parquet
-                table = pa.table({
-                    "point_id": pa.array(point_id_column, type=pa.string()),
-                    "timestamp": pa.array(timestamps, type=pa.timestamp("us")),
-                    "value": pa.array(values, type=pa.float32()),
-                })
-                
-                writer.write_table(table)
-                total_samples += n_samples
-                regular_samples += n_samples
-                
-                # Free memory
-                del point_indices, time_indices, values, timestamps, point_id_column, table
+            # Apply DEADBAND filtering (this is the key difference) and
+            # write the samples point by point, one Arrow batch at a time
+            total_raw_samples += n_points_group * n_timesteps
+            for batch in simulator.iter_window_batches(
+                seed + freq, [p.id for p in group_points], start_time, window_steps,
+                work_dir=output_path.parent,
+            ):
+                writer.write_batch(batch)
+                total_samples += batch.num_rows
+                regular_samples += batch.num_rows
     
     writer.close()
     
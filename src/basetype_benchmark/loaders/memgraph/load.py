@@ -9,14 +9,20 @@ puissance sans introduire de noeuds supplémentaires.
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
+import shutil
+import tempfile
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Callable
 
 from neo4j import GraphDatabase
-from neo4j.exceptions import ServiceUnavailable
+from neo4j.exceptions import ServiceUnavailable, TransientError
+
+from basetype_benchmark.runner.pool import close_bolt_driver, get_bolt_driver
 
 
 class LoadingTimeout(Exception):
@@ -218,7 +224,8 @@ def flush_edges(session, rel_type: str, batch: List[Dict[str, str]], timeout_sec
     )
 
     def execute():
-        session.run(query, batch=batch)
+        # consume() pulls the result, so errors surface for this batch
+        session.run(query, batch=batch).consume()
 
     run_with_timeout(execute, timeout_seconds, f"flush_edges({rel_type}, {len(batch)} edges)")
 
@@ -234,34 +241,125 @@ def flush_quantities(session, batch: List[Dict[str, str]], timeout_seconds: floa
             "MATCH (p:Node {id: row.src}) "
             "SET p.quantity = row.dst",
             batch=batch,
-        )
+        ).consume()
 
     run_with_timeout(execute, timeout_seconds, f"flush_quantities({len(batch)} items)")
 
 
+def _is_conflict(error: Exception) -> bool:
+    """True for Memgraph serialization conflicts, which succeed when retried."""
+    if isinstance(error, TransientError):
+        return True
+    message = str(error).lower()
+    return "conflicting transactions" in message or "serialization" in message
+
+
+def load_edge_type(
+    driver,
+    rel_type: str,
+    edges: Iterable[Dict[str, str]],
+    batch_size: int,
+    batch_timeout_seconds: float = 60.0,
+    target_batch_seconds: float = 1.0,
+    min_batch_size: int = 100,
+    max_batch_size: int = 20000,
+    max_conflict_retries: int = 8,
+    max_retries_on_stall: int = 3,
+) -> Dict[str, float]:
+    """Load all edges of one relationship type on a dedicated session.
+
+    edges may be any iterable (e.g. iter_json_lines over a spill file); it is
+    consumed one batch at a time.
+
+    The batch size adapts to observed latency: it grows while batches finish
+    well under target_batch_seconds and halves when they take more than twice
+    that. Batches rejected because another type's transaction touched the
+    same nodes (Memgraph's "conflicting transactions") are retried with
+    exponential backoff.
+
+    Returns:
+        Dict with edges, seconds, edges_per_s, retries, batch_size (final)
+
+    Raises:
+        LoadingTimeout: If a batch times out
+        LoadingStalled: If batches stay slow at the minimum batch size
+    """
+    current_batch_size = min(batch_size, max_batch_size)
+    stats = {"edges": 0, "seconds": 0.0, "edges_per_s": 0.0, "retries": 0, "batch_size": current_batch_size}
+    slow_at_min = 0
+    t0 = time.perf_counter()
+
+    edges = iter(edges)
+    with driver.session() as session:
+        while True:
+            batch = list(itertools.islice(edges, current_batch_size))
+            if not batch:
+                break
+            for attempt in range(max_conflict_retries + 1):
+                try:
+                    batch_start = time.perf_counter()
+                    flush_edges(session, rel_type, batch, batch_timeout_seconds)
+                    break
+                except LoadingTimeout:
+                    raise
+                except Exception as e:
+                    if not _is_conflict(e) or attempt == max_conflict_retries:
+                        raise
+                    stats["retries"] += 1
+                    time.sleep(min(2.0, 0.05 * 2 ** attempt))
+            batch_elapsed = time.perf_counter() - batch_start
+            stats["edges"] += len(batch)
+
+            # Adaptive batch size: aim for target_batch_seconds per batch
+            if batch_elapsed > 2 * target_batch_seconds:
+                if current_batch_size <= min_batch_size:
+                    slow_at_min += 1
+                    if slow_at_min >= max_retries_on_stall:
+                        rate_now = len(batch) / batch_elapsed if batch_elapsed > 0 else 0
+                        raise LoadingStalled(
+                            f"{rel_type}: batches of {current_batch_size} still take {batch_elapsed:.1f}s "
+                            f"({rate_now:.0f} edges/s). Likely severe memory pressure."
+                        )
+                current_batch_size = max(min_batch_size, current_batch_size // 2)
+            elif batch_elapsed < target_batch_seconds / 2:
+                current_batch_size = min(max_batch_size, int(current_batch_size * 1.5))
+                slow_at_min = 0
+
+    stats["seconds"] = time.perf_counter() - t0
+    stats["edges_per_s"] = stats["edges"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    stats["batch_size"] = current_batch_size
+    return stats
+
+
 def load_edges(
-    session,
+    driver,
     edges_path: Path,
     batch_size: int,
     batch_timeout_seconds: float = 60.0,
-    stall_threshold_multiplier: float = 5.0,
-    min_batches_for_stall_detection: int = 5,
-    adaptive_batch_size: bool = True,
+    workers: int = 4,
+    target_batch_seconds: float = 1.0,
     min_batch_size: int = 100,
-    max_retries_on_stall: int = 3
+    max_retries_on_stall: int = 3,
 ) -> Dict[str, int]:
-    """Load edges with timeout, stall detection, and adaptive batch sizing.
+    """Load edges with one concurrent session per relationship type.
+
+    Edges are first split into one spill file per relationship type (next
+    to edges_path), so that only one batch per type is held in memory;
+    independent types (CONTAINS, HAS_POINT, FEEDS, SERVES, ...) are then
+    loaded in parallel on a thread pool, largest first so that HAS_POINT
+    starts immediately. MEASURES edges become a `quantity` property and are
+    applied once every type is loaded (they would conflict with edge
+    creation on the points).
 
     Args:
-        session: Memgraph session
+        driver: Memgraph driver (one session is opened per type)
         edges_path: Path to edges.json
-        batch_size: Base batch size (will be capped at 1000 for edges)
+        batch_size: Initial batch size (adapted per type, see load_edge_type)
         batch_timeout_seconds: Timeout per batch (default 60s)
-        stall_threshold_multiplier: If batch takes > avg * this, consider stalled (default 5x)
-        min_batches_for_stall_detection: Min batches before stall detection kicks in
-        adaptive_batch_size: If True, reduce batch size on slowdown instead of failing
+        workers: Relationship types loaded concurrently
+        target_batch_seconds: Batch latency the adaptive sizing aims for
         min_batch_size: Minimum batch size before giving up
-        max_retries_on_stall: Max consecutive stalls before giving up
+        max_retries_on_stall: Slow batches at minimum size before giving up
 
     Returns:
         Dict with relationship and measurement counts
@@ -270,106 +368,99 @@ def load_edges(
         LoadingTimeout: If a batch times out
         LoadingStalled: If loading continues to stall despite adaptations
     """
-    # Use smaller batch for edges (double MATCH is expensive)
-    edge_batch_size = min(batch_size, 1000)
-    current_batch_size = edge_batch_size
-    consecutive_stalls = 0
-
-    batches: Dict[str, List[Dict[str, str]]] = {}
-    measure_batch: List[Dict[str, str]] = []
-    counters: Dict[str, int] = {"relationships": 0, "measurements": 0}
-    t0 = time.perf_counter()
-    total_edges = 0
-
-    # Stall detection: track batch times (only keep recent ones)
-    batch_times: List[float] = []
-    max_batch_history = 20
-
-    for edge in iter_json_lines(edges_path):
-        rel = edge["rel"]
-        if rel == "MEASURES":
-            measure_batch.append(edge)
-            if len(measure_batch) >= current_batch_size:
-                flush_quantities(session, measure_batch, batch_timeout_seconds)
-                counters["measurements"] += len(measure_batch)
-                measure_batch.clear()
-            continue
-
-        batch = batches.setdefault(rel, [])
-        batch.append(edge)
-        if len(batch) >= current_batch_size:
-            batch_start = time.perf_counter()
-
-            flush_edges(session, rel, batch, batch_timeout_seconds)
+    spill_dir = Path(tempfile.mkdtemp(prefix="mg_edges_", dir=edges_path.parent))
+    try:
+        return _load_edge_spills(
+            driver, edges_path, spill_dir, batch_size, batch_timeout_seconds,
+            workers, target_batch_seconds, min_batch_size, max_retries_on_stall,
+        )
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
 
-            batch_elapsed = time.perf_counter() - batch_start
-            batch_times.append(batch_elapsed)
-
-            # Keep only recent history for accurate average
-            if len(batch_times) > max_batch_history:
-                batch_times = batch_times[-max_batch_history:]
-
-            # Stall detection: check if this batch is anomalously slow
-            is_stalled = False
-            if len(batch_times) >= min_batches_for_stall_detection:
-                avg_time = sum(batch_times[:-1]) / len(batch_times[:-1])
-                if batch_elapsed > avg_time * stall_threshold_multiplier:
-                    is_stalled = True
-                    rate_now = current_batch_size / batch_elapsed if batch_elapsed > 0 else 0
-                    rate_avg = current_batch_size / avg_time if avg_time > 0 else 0
-
-                    if adaptive_batch_size and current_batch_size > min_batch_size:
-                        # Reduce batch size instead of failing
-                        new_batch_size = max(min_batch_size, current_batch_size // 2)
-                        print(f"\n  [!] Slowdown detected ({batch_elapsed:.1f}s vs avg {avg_time:.1f}s). "
-                              f"Reducing batch size: {current_batch_size} -> {new_batch_size}", flush=True)
-                        current_batch_size = new_batch_size
-                        consecutive_stalls += 1
-
-                        # Clear batch times to recalibrate with new batch size
-                        batch_times = []
-
-                        if consecutive_stalls >= max_retries_on_stall:
-                            raise LoadingStalled(
-                                f"Loading stalled despite {max_retries_on_stall} batch size reductions. "
-                                f"Current batch size: {current_batch_size}. "
-                                f"Rate: {rate_now:.0f} edges/s. Likely severe memory pressure."
-                            )
-                    else:
-                        raise LoadingStalled(
-                            f"Loading stalled: batch took {batch_elapsed:.1f}s "
-                            f"(avg: {avg_time:.1f}s, threshold: {avg_time * stall_threshold_multiplier:.1f}s). "
-                            f"Rate dropped from {rate_avg:.0f} edges/s to {rate_now:.0f} edges/s. "
-                            f"Likely memory pressure - consider increasing RAM."
-                        )
 
-            if not is_stalled:
-                consecutive_stalls = 0  # Reset on successful batch
+def _load_edge_spills(
+    driver,
+    edges_path: Path,
+    spill_dir: Path,
+    batch_size: int,
+    batch_timeout_seconds: float,
+    workers: int,
+    target_batch_seconds: float,
+    min_batch_size: int,
+    max_retries_on_stall: int,
+) -> Dict[str, int]:
+    """Body of load_edges, with spill files written under spill_dir."""
+    spill_paths: Dict[str, Path] = {}
+    spill_counts: Dict[str, int] = {}
+    handles = {}
+    try:
+        with edges_path.open("r", encoding="utf-8") as source:
+            for line in source:
+                line = line.strip()
+                if not line:
+                    continue
+                rel = json.loads(line)["rel"]
+                handle = handles.get(rel)
+                if handle is None:
+                    spill_paths[rel] = spill_dir / f"{len(spill_paths):03d}.jsonl"
+                    handle = handles[rel] = spill_paths[rel].open("w", encoding="utf-8")
+                    spill_counts[rel] = 0
+                handle.write(line + "\n")
+                spill_counts[rel] += 1
+    finally:
+        for handle in handles.values():
+            handle.close()
+    measures_path = spill_paths.pop("MEASURES", None)
+    spill_counts.pop("MEASURES", None)
 
-            counters["relationships"] += len(batch)
-            total_edges += len(batch)
+    counters: Dict[str, int] = {"relationships": 0, "measurements": 0}
+    t0 = time.perf_counter()
 
-            if total_edges % 10000 == 0:
-                elapsed_so_far = time.perf_counter() - t0
-                rate = total_edges / elapsed_so_far if elapsed_so_far > 0 else 0
-                batch_info = f" [batch={current_batch_size}]" if current_batch_size != edge_batch_size else ""
-                print(f"  ... {total_edges} edges loaded ({rate:.0f} edges/s){batch_info}", flush=True)
-            batch.clear()
+    ordered = sorted(spill_counts, key=spill_counts.get, reverse=True)
+    per_type: Dict[str, Dict[str, float]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="edges") as pool:
+        futures = {
+            pool.submit(
+                load_edge_type,
+                driver,
+                rel,
+                iter_json_lines(spill_paths[rel]),
+                min(batch_size, 1000),  # double MATCH is expensive: start small, grow if fast
+                batch_timeout_seconds,
+                target_batch_seconds,
+                min_batch_size,
+                max_retries_on_stall=max_retries_on_stall,
+            ): rel
+            for rel in ordered
+        }
+        for future in as_completed(futures):
+            rel = futures[future]
+            stats = future.result()
+            per_type[rel] = stats
+            counters["relationships"] += int(stats["edges"])
+            print(
+                f"  ... {rel}: {int(stats['edges'])} edges en {stats['seconds']:.2f}s "
+                f"({stats['edges_per_s']:.0f} edges/s, batch={stats['batch_size']}, "
+                f"retries={stats['retries']})",
+                flush=True,
+            )
 
-    for rel, batch in batches.items():
-        if batch:
-            flush_edges(session, rel, batch, batch_timeout_seconds)
-            counters["relationships"] += len(batch)
-    if measure_batch:
-        flush_quantities(session, measure_batch, batch_timeout_seconds)
-        counters["measurements"] += len(measure_batch)
+    if measures_path is not None:
+        measures = iter_json_lines(measures_path)
+        with driver.session() as session:
+            while True:
+                batch = list(itertools.islice(measures, batch_size))
+                if not batch:
+                    break
+                flush_quantities(session, batch, batch_timeout_seconds)
+                counters["measurements"] += len(batch)
 
     elapsed = time.perf_counter() - t0
-    rate = total_edges / elapsed if elapsed > 0 else 0
+    rate = counters["relationships"] / elapsed if elapsed > 0 else 0
     print(
         f"Relations créées: {counters['relationships']}, "
         f"propriétés MEASURES appliquées: {counters['measurements']} "
-        f"en {elapsed:.2f}s ({rate:.0f} edges/s)"
+        f"en {elapsed:.2f}s ({rate:.0f} edges/s, {len(per_type)} types x{workers})"
     )
     return counters
 
@@ -504,6 +595,12 @@ def parse_args() -> argparse.Namespace:
         help="Chemin vers timeseries_chunks.json généré",
     )
     parser.add_argument("--batch-size", type=int, default=1000, help="Taille des batchs d'insertion")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Types de relations chargés en parallèle (une session chacun)",
+    )
     parser.add_argument("--skip-chunks", action="store_true", help="Skip loading timeseries chunks (structure only)")
     return parser.parse_args()
 
@@ -514,11 +611,11 @@ def main() -> None:
     if args.user is not None and args.password is not None:
         auth = (args.user, args.password)
 
-    driver = get_driver(args.uri, auth=auth)
+    driver = get_bolt_driver(args.uri, auth=auth, factory=lambda: get_driver(args.uri, auth=auth))
     with driver.session() as session:
         load_constraints(session)
         load_nodes(session, args.nodes_file, args.batch_size)
-        load_edges(session, args.edges_file, args.batch_size)
+        load_edges(driver, args.edges_file, args.batch_size, workers=args.workers)
 
         if not args.skip_chunks and args.chunks_file.exists():
             print(f"\nLoading timeseries chunks from {args.chunks_file}")
@@ -528,7 +625,7 @@ def main() -> None:
         else:
             print(f"\nChunks file not found: {args.chunks_file}")
 
-    driver.close()
+    close_bolt_driver(args.uri, auth=auth)
 
 
 if __name__ == "__main__":
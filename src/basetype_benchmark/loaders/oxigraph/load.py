@@ -2,7 +2,10 @@
 
 Le script applique un nettoyage optionnel du graphe par défaut, charge le
 fichier JSON-LD généré par `dataset_gen`, mesure le temps d'ingestion et
-vérifie le nombre total de triplets insérés. Aucune inférence n'est activée
+vérifie le nombre total de triplets insérés. Avec --nt-file, un export
+N-Triples est chargé à la place, en une requête (post), en POST parallèles
+découpés sur les fins de ligne (parallel) ou via le chargeur hors ligne
+`oxigraph load` pendant l'arrêt du serveur (bulk). Aucune inférence n'est activée
 et seules les relations explicites présentes dans le fichier sont chargées.
 """
 from __future__ import annotations
@@ -13,6 +16,9 @@ from pathlib import Path
 
 import requests
 
+from basetype_benchmark.runner import ntriples_load
+from basetype_benchmark.runner.pool import get_http_session
+
 
 def wait_for_oxigraph(
     endpoint: str = "http://localhost:7878",
@@ -31,7 +37,7 @@ def wait_for_oxigraph(
     """
     for attempt in range(max_retries):
         try:
-            response = requests.get(
+            response = get_http_session(endpoint).get(
                 f"{endpoint}/query",
                 params={"query": "SELECT * WHERE { ?s ?p ?o } LIMIT 1"},
                 timeout=10
@@ -53,7 +59,7 @@ def wait_for_oxigraph(
 
 
 def clear_store(endpoint: str) -> None:
-    response = requests.delete(f"{endpoint}/store", timeout=30)
+    response = get_http_session(endpoint).delete(f"{endpoint}/store", timeout=30)
     # Accept both 200 and 204 as success
     if response.status_code not in [200, 204]:
         response.raise_for_status()
@@ -63,7 +69,7 @@ def load_jsonld(endpoint: str, jsonld_path: Path) -> float:
     """Load JSON-LD file into Oxigraph default graph."""
     payload = jsonld_path.read_bytes()
     t0 = time.perf_counter()
-    response = requests.post(
+    response = get_http_session(endpoint).post(
         f"{endpoint}/store?default", headers={"Content-Type": "application/ld+json"}, data=payload, timeout=300
     )
     # Accept 200, 201, 204 as success (201 = Created is valid for POST)
@@ -91,7 +97,7 @@ def load_ntriples(endpoint: str, nt_path: Path, timeout: int = 600) -> float:
     """
     payload = nt_path.read_bytes()
     t0 = time.perf_counter()
-    response = requests.post(
+    response = get_http_session(endpoint).post(
         f"{endpoint}/store?default",
         headers={"Content-Type": "application/n-triples"},
         data=payload,
@@ -143,7 +149,7 @@ def load_ntriples_streaming(endpoint: str, nt_path: Path, chunk_size: int = 10 *
             to_send = buffer[:last_newline + 1]
             buffer = buffer[last_newline + 1:]
 
-            response = requests.post(
+            response = get_http_session(endpoint).post(
                 f"{endpoint}/store?default",
                 headers={"Content-Type": "application/n-triples"},
                 data=to_send,
@@ -160,7 +166,7 @@ def load_ntriples_streaming(endpoint: str, nt_path: Path, chunk_size: int = 10 *
 
         # Send remaining buffer
         if buffer:
-            response = requests.post(
+            response = get_http_session(endpoint).post(
                 f"{endpoint}/store?default",
                 headers={"Content-Type": "application/n-triples"},
                 data=buffer,
@@ -176,13 +182,44 @@ def load_ntriples_streaming(endpoint: str, nt_path: Path, chunk_size: int = 10 *
     return elapsed
 
 
+def load_ntriples_parallel(endpoint: str, nt_path: Path, workers: int = ntriples_load.POST_WORKERS) -> float:
+    """Load an N-Triples file with concurrent POSTs of line-aligned chunks.
+
+    Returns:
+        Elapsed time in seconds
+    """
+    stats = ntriples_load.post_ntriples_parallel(endpoint, nt_path, workers=workers)
+    print(
+        f"Ingestion Oxigraph: {stats['bytes'] / (1024*1024):.1f} MB N-Triples chargés en "
+        f"{stats['duration_s']:.2f}s ({stats['chunks']} blocs, {workers} workers)"
+    )
+    return stats["duration_s"]
+
+
+def load_ntriples_bulk(endpoint: str, nt_path: Path, container: str, parts: int = ntriples_load.BULK_PARTS) -> float:
+    """Load an N-Triples file with `oxigraph load` while the server is stopped.
+
+    Returns:
+        Elapsed time in seconds (server restart included)
+    """
+    t0 = time.perf_counter()
+    stats = ntriples_load.bulk_load_offline([nt_path], container, parts=parts)
+    wait_for_oxigraph(endpoint)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"Ingestion Oxigraph: {stats['bytes'] / (1024*1024):.1f} MB N-Triples chargés en "
+        f"{elapsed:.2f}s (bulk hors ligne, {stats['parts']} fichiers)"
+    )
+    return elapsed
+
+
 def count_triples(endpoint: str) -> int:
     """Count total triples in the store.
 
     Note: Oxigraph uses /query endpoint for SPARQL queries (not /sparql).
     """
     query = "SELECT (COUNT(*) AS ?count) WHERE { ?s ?p ?o }"
-    response = requests.get(
+    response = get_http_session(endpoint).get(
         f"{endpoint}/query",
         params={"query": query},
         headers={"Accept": "application/sparql-results+json"},
@@ -209,6 +246,29 @@ def parse_args() -> argparse.Namespace:
         default=Path("dataset_gen/out/graph.jsonld"),
         help="Chemin vers le fichier JSON-LD généré",
     )
+    parser.add_argument(
+        "--nt-file",
+        type=Path,
+        default=None,
+        help="Charger ce fichier N-Triples au lieu du JSON-LD",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["post", "parallel", "bulk"],
+        default="post",
+        help="Mode de chargement N-Triples (par défaut post)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=ntriples_load.POST_WORKERS,
+        help="POST simultanés (mode parallel) ou fichiers parsés en parallèle (mode bulk)",
+    )
+    parser.add_argument(
+        "--container",
+        default="btb_oxigraph",
+        help="Conteneur du serveur Oxigraph (mode bulk)",
+    )
     parser.add_argument(
         "--skip-clear",
         action="store_true",
@@ -219,8 +279,9 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    if not args.jsonld_file.exists():
-        raise FileNotFoundError(f"Fichier JSON-LD introuvable: {args.jsonld_file}")
+    source = args.nt_file or args.jsonld_file
+    if not source.exists():
+        raise FileNotFoundError(f"Fichier introuvable: {source}")
 
     # Wait for Oxigraph to be ready
     wait_for_oxigraph(args.endpoint)
@@ -229,10 +290,18 @@ def main() -> None:
         clear_store(args.endpoint)
         print("Graphe par défaut vidé avant chargement")
 
-    elapsed = load_jsonld(args.endpoint, args.jsonld_file)
+    if args.nt_file is None:
+        elapsed = load_jsonld(args.endpoint, args.jsonld_file)
+    elif args.mode == "parallel":
+        elapsed = load_ntriples_parallel(args.endpoint, args.nt_file, workers=args.workers)
+    elif args.mode == "bulk":
+        elapsed = load_ntriples_bulk(args.endpoint, args.nt_file, args.container, parts=args.workers)
+    else:
+        elapsed = load_ntriples(args.endpoint, args.nt_file)
     triples = count_triples(args.endpoint)
 
-    print(f"Résumé: {triples} triplets chargés en {elapsed:.2f}s sans inférence")
+    rate = triples / elapsed if elapsed > 0 else 0.0
+    print(f"Résumé: {triples} triplets chargés en {elapsed:.2f}s sans inférence ({rate:,.0f} triplets/s)")
 
 
 if __name__ == "__main__":
@@ -18,6 +18,8 @@ from typing import Dict, Iterable, List, Optional
 import psycopg2
 from psycopg2.extras import execute_batch
 
+from basetype_benchmark.runner.pool import acquire_pg_connection, release_pg_connection
+
 
 def _read_env_file(path: Path) -> Dict[str, str]:
     """Read a simple KEY=VALUE env file (no interpolation)."""
@@ -679,12 +681,15 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
 
-    conn = get_connection(
-        host=args.host,
-        port=args.port,
-        user=args.user,
-        password=args.password,
-        database=args.database
+    conn = acquire_pg_connection(
+        (args.host, args.port, args.user, args.database),
+        lambda: get_connection(
+            host=args.host,
+            port=args.port,
+            user=args.user,
+            password=args.password,
+            database=args.database
+        ),
     )
 
     try:
@@ -707,7 +712,7 @@ def main() -> None:
         print(f"  Timeseries samples: {results['timeseries']}")
 
     finally:
-        conn.close()
+        release_pg_connection(conn)
 
 
 if __name__ == "__main__":
@@ -9,7 +9,9 @@ import argparse
 import sys
 from pathlib import Path
 
+from .ingest import DEFAULT_STREAM_READERS
 from .scenario import run_scenario
+from .workload import DEFAULT_OPEN_LOOP_CLIENTS, parse_levels, parse_rates
 
 
 SCENARIOS = ["P1", "P2", "M1", "M2", "O1", "O2"]
@@ -155,6 +157,12 @@ def parse_args() -> argparse.Namespace:
 Examples:
   %(prog)s P1 --ram 8 --export ./exports/small-1m_seed42
   %(prog)s ALL --ram 16 --export ./exports/medium-7d_seed42
+  %(prog)s M2 --ram 16 --concurrency 1,4,16,32 --duration 60
+  %(prog)s P1 --ram 8 --arrival-rates 10,50,100,200
+  %(prog)s O1 --ram 8 --fetch stream
+  %(prog)s P2 --ram 8 --explain
+  %(prog)s P1 --ram 8 --export ./exports/small-2d_seed42 --append ./exports/small-2d_next
+  %(prog)s M2 --ram 16 --stream-ingest 1000 --readers 8 --duration 60
   %(prog)s  # Interactive mode (auto-discovers datasets)
         """,
     )
@@ -182,8 +190,85 @@ Examples:
         default=Path("benchmark_results"),
         help="Output directory for results (default: benchmark_results)",
     )
+    parser.add_argument(
+        "--prepared",
+        action="store_true",
+        help="Use server-side prepared statements with bind parameters (P1/P2)",
+    )
+    parser.add_argument(
+        "--pipelined-hybrid",
+        action="store_true",
+        help="M2/O2: stream graph results and fetch timeseries in concurrent point-id batches",
+    )
+    parser.add_argument(
+        "--fetch",
+        choices=["full", "stream"],
+        default="full",
+        help="full: materialize result rows; stream: count rows off the wire and record time to first row",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Also capture server-side timings, buffer stats and plans (EXPLAIN ANALYZE / PROFILE)",
+    )
+    parser.add_argument(
+        "--append",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="After the queries, ingest the new days of this export into the loaded data and measure ingest rate",
+    )
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="With --append: replace rows already present instead of only appending newer ones",
+    )
+    parser.add_argument(
+        "--stream-ingest",
+        type=float,
+        default=None,
+        metavar="SPEEDUP",
+        help="Replay samples as live ingest at this real-time multiple (e.g. 1000) while readers run Q6/Q7/Q13",
+    )
+    parser.add_argument(
+        "--readers",
+        type=int,
+        default=DEFAULT_STREAM_READERS,
+        help=f"Reader clients for --stream-ingest (default: {DEFAULT_STREAM_READERS})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=parse_levels,
+        default=None,
+        help="Closed-loop multi-client workload, comma-separated client counts (e.g. 1,4,16,32)",
+    )
+    parser.add_argument(
+        "--arrival-rates",
+        type=parse_rates,
+        default=None,
+        help="Open-loop Poisson workload, comma-separated arrival rates in req/s (e.g. 10,50,100)",
+    )
+    parser.add_argument(
+        "--open-loop-clients",
+        type=int,
+        default=DEFAULT_OPEN_LOOP_CLIENTS,
+        help=f"Sender pool size for the open-loop workload (default: {DEFAULT_OPEN_LOOP_CLIENTS})",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30.0,
+        help="Workload duration per concurrency level or arrival rate in seconds (default: 30)",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    # Prepared statements fetch in full and record their own plan/exec split
+    if args.prepared and (args.fetch != "full" or args.explain):
+        parser.error("--prepared cannot be combined with --fetch stream or --explain")
+    # Pipelined M2/O2 merges per-batch rows, which stream mode never builds
+    if args.pipelined_hybrid and args.fetch == "stream":
+        parser.error("--pipelined-hybrid cannot be combined with --fetch stream")
+    return args
 
 
 def main():
@@ -198,6 +283,18 @@ def main():
         ram_gb = params["ram_gb"]
         export_dir = params["export_dir"]
         output_dir = Path("benchmark_results")
+        prepared = False
+        pipelined_hybrid = False
+        fetch = "full"
+        explain = False
+        append_dir = None
+        upsert = False
+        stream_speedup = None
+        stream_readers = DEFAULT_STREAM_READERS
+        concurrency = None
+        arrival_rates = None
+        workload_duration_s = 30.0
+        open_loop_clients = DEFAULT_OPEN_LOOP_CLIENTS
     else:
         # CLI mode
         if args.scenario == "ALL":
@@ -207,6 +304,18 @@ def main():
 
         ram_gb = args.ram
         output_dir = args.output
+        prepared = args.prepared
+        pipelined_hybrid = args.pipelined_hybrid
+        fetch = args.fetch
+        explain = args.explain
+        append_dir = args.append.expanduser().resolve() if args.append else None
+        upsert = args.upsert
+        stream_speedup = args.stream_ingest
+        stream_readers = args.readers
+        concurrency = args.concurrency
+        arrival_rates = args.arrival_rates
+        workload_duration_s = args.duration
+        open_loop_clients = args.open_loop_clients
 
         # Find export directory
         if args.export:
@@ -252,6 +361,18 @@ def main():
             profile=profile,
             ram_gb=ram_gb,
             output_dir=output_dir,
+            prepared=prepared,
+            pipelined_hybrid=pipelined_hybrid,
+            fetch=fetch,
+            explain=explain,
+            append_dir=append_dir,
+            upsert=upsert,
+            stream_speedup=stream_speedup,
+            stream_readers=stream_readers,
+            concurrency=concurrency,
+            arrival_rates=arrival_rates,
+            workload_duration_s=workload_duration_s,
+            open_loop_clients=open_loop_clients,
         )
         results.append(result)
 
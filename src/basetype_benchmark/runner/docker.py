@@ -6,6 +6,8 @@ import time
 from pathlib import Path
 from typing import List, Optional
 
+from . import pool
+
 
 def _find_docker_dir() -> Path:
     """Find docker directory relative to repo root."""
@@ -79,6 +81,8 @@ DOCKER_COMPOSE = _get_docker_compose_cmd()
 
 def stop_all() -> None:
     """Stop all benchmark containers."""
+    # Pooled connections/drivers point at the containers about to go away
+    pool.close_all()
     subprocess.run(
         f"{DOCKER_COMPOSE} down",
         shell=True,
@@ -189,3 +193,69 @@ def run_in_container(
         check=check,
         timeout=timeout_s,
     )
+
+
+def copy_to_container(container_name: str, src: Path, dest: str) -> bool:
+    """Copy a host file into a running container via `docker cp`.
+
+    Args:
+        container_name: Docker container name (e.g., btb_memgraph)
+        src: Host file
+        dest: Absolute path inside the container (parent is created)
+
+    Returns:
+        True if the file was copied
+    """
+    parent = dest.rsplit("/", 1)[0] or "/"
+    mkdir = run_in_container(container_name, ["mkdir", "-p", parent])
+    if mkdir.returncode != 0:
+        return False
+    result = subprocess.run(
+        ["docker", "cp", str(src), f"{container_name}:{dest}"],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode == 0
+
+
+def container_mount_source(container_name: str, destination: str) -> Optional[str]:
+    """Volume name (or host path) mounted at destination in a container."""
+    result = subprocess.run(
+        [
+            "docker", "inspect", "-f",
+            f'{{{{range .Mounts}}}}{{{{if eq .Destination "{destination}"}}}}'
+            f'{{{{if .Name}}}}{{{{.Name}}}}{{{{else}}}}{{{{.Source}}}}{{{{end}}}}{{{{end}}}}{{{{end}}}}',
+            container_name,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    source = result.stdout.strip()
+    return source if result.returncode == 0 and source else None
+
+
+def container_image(container_name: str) -> Optional[str]:
+    """Image a container was created from."""
+    result = subprocess.run(
+        ["docker", "inspect", "-f", "{{.Config.Image}}", container_name],
+        capture_output=True,
+        text=True,
+    )
+    image = result.stdout.strip()
+    return image if result.returncode == 0 and image else None
+
+
+def stop_container(container_name: str, timeout_s: int = 30) -> bool:
+    """Stop one container (keeps it and its volumes)."""
+    result = subprocess.run(
+        ["docker", "stop", "-t", str(timeout_s), container_name],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode == 0
+
+
+def start_container(container_name: str) -> bool:
+    """Start a stopped container."""
+    result = subprocess.run(["docker", "start", container_name], capture_output=True, text=True)
+    return result.returncode == 0
@@ -0,0 +1,506 @@
+"""Parquet -> PostgreSQL COPY BINARY loader for the timeseries table.
+
+Streams Arrow record batches out of timeseries.parquet, attaches building_id
+from nodes.parquet in memory and encodes each batch straight into the
+PostgreSQL binary COPY format with numpy. Row groups are spread over several
+connections that COPY in parallel; nothing is written to disk.
+
+Row layout (COPY ... FROM STDIN (FORMAT binary), columns time, point_id,
+building_id, value):
+
+    int16 field count | int32 8, int64 time (us since 2000-01-01 UTC)
+    | int32 len, point_id | int32 len, building_id | int32 4, float4 value
+
+point_id and building_id only depend on the point, so their encoded bytes
+are built once per distinct point and gathered per row.
+
+Slices are assigned by row group, or by time range ("time" split: row
+groups sorted by their timestamp statistics and cut into contiguous runs),
+so that each connection writes its own hypertable chunks.
+"""
+
+import io
+import json
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+# Parallel COPY connections and rows encoded per Arrow batch
+COPY_WORKERS = int(os.getenv("BTB_PG_BINARY_COPY_WORKERS", str(min(8, os.cpu_count() or 1))))
+COPY_BATCH_ROWS = int(os.getenv("BTB_PG_BINARY_COPY_BATCH_ROWS", "250000"))
+
+# Bytes handed to libpq per read of the COPY stream
+COPY_READ_SIZE = 1 << 20
+
+PG_EPOCH_US = 946_684_800 * 1_000_000  # 2000-01-01 in unix microseconds
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+NULL_FIELD = np.frombuffer(struct.pack(">i", -1), dtype=np.uint8)
+
+# Fixed-size parts of a row (unaligned big-endian structs)
+_PREFIX = np.dtype([("fields", ">i2"), ("time_len", ">i4"), ("time", ">i8")])
+_SUFFIX = np.dtype([("value_len", ">i4"), ("value", ">f4")])
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Unix microseconds of a datetime (naive values are taken as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(round(value.timestamp() * 1_000_000))
+
+
+def load_building_map(nodes_parquet: Path) -> Dict[str, str]:
+    """Return point/node id -> building_id from nodes.parquet.
+
+    Uses a building_id column when present, otherwise the building_id key of
+    the JSON properties column (same as the former DuckDB enrichment).
+    """
+    columns = pq.read_schema(nodes_parquet).names
+    if "building_id" in columns:
+        table = pq.read_table(nodes_parquet, columns=["id", "building_id"])
+        return {
+            nid: bid
+            for nid, bid in zip(table.column("id").to_pylist(), table.column("building_id").to_pylist())
+            if bid
+        }
+
+    table = pq.read_table(nodes_parquet, columns=["id", "properties"])
+    building_map: Dict[str, str] = {}
+    for nid, raw in zip(table.column("id").to_pylist(), table.column("properties").to_pylist()):
+        if not raw or "building_id" not in raw:
+            continue
+        try:
+            props = json.loads(raw) if isinstance(raw, str) else raw
+        except ValueError:
+            continue
+        bid = props.get("building_id") if isinstance(props, dict) else None
+        if bid:
+            building_map[nid] = str(bid)
+    return building_map
+
+
+def _encode_ids(point_id: str, building_id: str) -> bytes:
+    pid = point_id.encode("utf-8")
+    bid = building_id.encode("utf-8")
+    return struct.pack(">i", len(pid)) + pid + struct.pack(">i", len(bid)) + bid
+
+
+def encode_batch(batch: pa.RecordBatch, building_map: Dict[str, str], id_cache: Dict[str, bytes]) -> np.ndarray:
+    """Encode one (timestamp, point_id, value) batch as binary COPY rows.
+
+    Args:
+        batch: Arrow batch with timestamp, point_id and value columns
+        building_map: point_id -> building_id ('' when unknown)
+        id_cache: Encoded id bytes per point, shared across batches
+
+    Returns:
+        uint8 array holding the encoded rows (no header/trailer)
+    """
+    n = batch.num_rows
+    if n == 0:
+        return np.empty(0, dtype=np.uint8)
+
+    # Distinct points of the batch -> encoded (point_id, building_id) fields
+    pid_col = batch.column("point_id")
+    encoded = pid_col if pa.types.is_dictionary(pid_col.type) else pc.dictionary_encode(pid_col)
+    idx = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    id_bytes = []
+    for pid in encoded.dictionary.to_pylist():
+        blob = id_cache.get(pid)
+        if blob is None:
+            blob = _encode_ids(pid, building_map.get(pid, ""))
+            id_cache[pid] = blob
+        id_bytes.append(blob)
+    pool_len = np.fromiter((len(b) for b in id_bytes), dtype=np.int64, count=len(id_bytes))
+    pool = np.frombuffer(b"".join(id_bytes), dtype=np.uint8)
+    pool_start = np.cumsum(pool_len) - pool_len
+
+    times = pc.cast(batch.column("timestamp"), pa.timestamp("us"), safe=False)
+    time_us = pc.cast(times, pa.int64()).to_numpy(zero_copy_only=False)
+    value_col = batch.column("value")
+    valid = ~value_col.is_null().to_numpy(zero_copy_only=False)
+    values = pc.cast(value_col, pa.float32()).fill_null(0).to_numpy(zero_copy_only=False)
+
+    # Row offsets: 14-byte prefix + id fields + 8-byte value (4 bytes if NULL)
+    mid_len = pool_len[idx]
+    row_len = 14 + mid_len + np.where(valid, 8, 4)
+    row_end = np.cumsum(row_len)
+    row_start = row_end - row_len
+    buf = np.empty(int(row_end[-1]), dtype=np.uint8)
+
+    prefix = np.empty(n, dtype=_PREFIX)
+    prefix["fields"] = 4
+    prefix["time_len"] = 8
+    prefix["time"] = time_us - PG_EPOCH_US
+    buf[row_start[:, None] + np.arange(14)] = prefix.view(np.uint8).reshape(n, 14)
+
+    # Gather the variable-length id fields
+    mid_start = row_start + 14
+    total_mid = int(mid_len.sum())
+    within = np.arange(total_mid) - np.repeat(np.cumsum(mid_len) - mid_len, mid_len)
+    buf[np.repeat(mid_start, mid_len) + within] = pool[np.repeat(pool_start[idx], mid_len) + within]
+
+    value_start = mid_start + mid_len
+    suffix = np.empty(int(valid.sum()), dtype=_SUFFIX)
+    suffix["value_len"] = 4
+    suffix["value"] = values[valid]
+    buf[value_start[valid][:, None] + np.arange(8)] = suffix.view(np.uint8).reshape(-1, 8)
+    if not valid.all():
+        buf[value_start[~valid][:, None] + np.arange(4)] = NULL_FIELD
+    return buf
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks (for copy_expert)."""
+
+    def __init__(self, chunks: Iterator):
+        self._chunks = iter(chunks)
+        self._buf = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not len(self._buf):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buf = memoryview(chunk).cast("B")
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def row_group_time_ranges(parquet_file: Path) -> List[Tuple[int, int, object, object]]:
+    """Return (row_group, num_rows, min_time, max_time) for each row group.
+
+    Uses the Parquet column statistics; row groups without statistics get
+    their timestamp column read to compute them.
+    """
+    pf = pq.ParquetFile(parquet_file)
+    ts_index = pf.schema_arrow.get_field_index("timestamp")
+    ranges = []
+    for rg in range(pf.num_row_groups):
+        meta = pf.metadata.row_group(rg)
+        stats = meta.column(ts_index).statistics
+        if stats is not None and stats.has_min_max:
+            t_min, t_max = stats.min, stats.max
+        else:
+            col = pf.read_row_group(rg, columns=["timestamp"]).column(0)
+            bounds = pc.min_max(col)
+            t_min, t_max = bounds["min"].as_py(), bounds["max"].as_py()
+        ranges.append((rg, meta.num_rows, t_min, t_max))
+    return ranges
+
+
+def split_row_groups(parquet_file: Path, workers: int, split: str = "row_group") -> List[List[int]]:
+    """Assign row groups to workers.
+
+    row_group: round-robin. time: sorted by min timestamp and cut into
+    contiguous runs of roughly equal row counts (one time range per worker).
+    """
+    pf = pq.ParquetFile(parquet_file)
+    n_groups = pf.num_row_groups
+    workers = max(1, min(workers, n_groups))
+    if split == "row_group":
+        return [list(range(w, n_groups, workers)) for w in range(workers)]
+    if split != "time":
+        raise ValueError(f"Unknown split: {split}")
+
+    ranges = sorted(row_group_time_ranges(parquet_file), key=lambda r: r[2])
+    total_rows = sum(r[1] for r in ranges)
+    target = total_rows / workers
+    assignments: List[List[int]] = [[] for _ in range(workers)]
+    acc = 0
+    for rg, num_rows, _, _ in ranges:
+        w = min(int(acc / target) if target else 0, workers - 1)
+        assignments[w].append(rg)
+        acc += num_rows
+    return [a for a in assignments if a]
+
+
+def precreate_chunks(conn, parquet_file: Path, table: str = "timeseries", interval: str = "1 day") -> int:
+    """Create the hypertable chunks covering the Parquet time range up front.
+
+    One placeholder row per chunk interval is inserted and deleted again;
+    TimescaleDB keeps the (empty) chunks, so parallel COPY workers never
+    race to create the same chunk.
+
+    Returns:
+        Number of chunks of the table afterwards
+    """
+    ranges = row_group_time_ranges(parquet_file)
+    if not ranges:
+        return 0
+    t_min = min(r[2] for r in ranges)
+    t_max = max(r[3] for r in ranges)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                INSERT INTO {table} (time, point_id, building_id, value)
+                SELECT t, '', '', NULL
+                FROM (
+                    SELECT generate_series(%s::timestamptz, %s::timestamptz, %s::interval) AS t
+                    UNION SELECT %s::timestamptz
+                ) AS bounds
+                """,
+                (t_min, t_max, interval, t_max),
+            )
+            cur.execute(f"DELETE FROM {table} WHERE point_id = '' AND time BETWEEN %s AND %s", (t_min, t_max))
+            cur.execute("SELECT count(*) FROM show_chunks(%s::regclass)", (table,))
+            n_chunks = cur.fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return n_chunks
+
+
+def is_hypertable(conn, table: str = "timeseries") -> bool:
+    """Tell whether table is a TimescaleDB hypertable (CSV loaders may leave a plain table)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM timescaledb_information.hypertables WHERE hypertable_name = %s)",
+            (table,),
+        )
+        found = cur.fetchone()[0]
+    conn.commit()
+    return found
+
+
+def _copy_worker(
+    parquet_file: Path,
+    row_groups: List[int],
+    building_map: Dict[str, str],
+    connect: Callable[[], object],
+    release: Callable[[object], None],
+    table: str,
+    batch_rows: int,
+    since_us: Optional[int] = None,
+) -> Tuple[int, float]:
+    """COPY the given row groups over one connection, return (rows, seconds).
+
+    With since_us, only rows strictly newer than that instant are sent.
+    """
+    t0 = time.time()
+    pf = pq.ParquetFile(parquet_file)
+    rows = 0
+
+    def chunks():
+        nonlocal rows
+        yield COPY_HEADER
+        id_cache: Dict[str, bytes] = {}
+        for batch in pf.iter_batches(
+            batch_size=batch_rows, row_groups=row_groups, columns=["timestamp", "point_id", "value"]
+        ):
+            if since_us is not None:
+                ts_us = pc.cast(pc.cast(batch.column("timestamp"), pa.timestamp("us"), safe=False), pa.int64())
+                batch = batch.filter(pc.greater(ts_us, since_us))
+                if batch.num_rows == 0:
+                    continue
+            rows += batch.num_rows
+            yield encode_batch(batch, building_map, id_cache)
+        yield COPY_TRAILER
+
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(
+                f"COPY {table} (time, point_id, building_id, value) FROM STDIN (FORMAT binary)",
+                _ChunkReader(chunks()),
+                size=COPY_READ_SIZE,
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release(conn)
+    return rows, time.time() - t0
+
+
+def copy_parquet_binary(
+    parquet_file: Path,
+    nodes_parquet: Path,
+    connect: Callable[[], object],
+    release: Callable[[object], None],
+    table: str = "timeseries",
+    workers: int = COPY_WORKERS,
+    batch_rows: int = COPY_BATCH_ROWS,
+    split: str = "row_group",
+    since: Optional[datetime] = None,
+) -> int:
+    """Load timeseries.parquet into table with parallel binary COPY.
+
+    Args:
+        parquet_file: timeseries.parquet (timestamp, point_id, value)
+        nodes_parquet: nodes.parquet used for the building_id join
+        connect: Returns a psycopg2 connection for one worker
+        release: Gives a worker connection back (or closes it)
+        table: Target table with (time, point_id, building_id, value)
+        workers: Parallel COPY connections (capped by the row group count)
+        batch_rows: Rows per encoded Arrow batch
+        split: How row groups are assigned to workers ("row_group" or "time",
+            see split_row_groups)
+        since: Only load rows newer than this instant (append mode); row
+            groups whose statistics end before it are skipped entirely
+
+    Returns:
+        Total rows loaded
+    """
+    n_groups = pq.ParquetFile(parquet_file).num_row_groups
+    assignments = split_row_groups(parquet_file, workers, split)
+    since_us = to_epoch_us(since) if since is not None else None
+    if since_us is not None:
+        newer = {rg for rg, _, _, t_max in row_group_time_ranges(parquet_file) if to_epoch_us(t_max) > since_us}
+        assignments = [a for a in ([rg for rg in groups if rg in newer] for groups in assignments) if a]
+        if not assignments:
+            print(f"  [LOAD] Timeseries: nothing newer than {since} in {parquet_file.name}")
+            return 0
+    workers = len(assignments)
+    building_map = load_building_map(nodes_parquet) if nodes_parquet.exists() else {}
+
+    print(
+        f"  [LOAD] Timeseries: binary COPY from Parquet "
+        f"({n_groups} row groups, {workers} connections, split={split})..."
+    )
+    t0 = time.time()
+    lock = threading.Lock()
+    done = [0]
+
+    def run(row_groups: List[int]) -> Tuple[int, float]:
+        rows, elapsed = _copy_worker(
+            parquet_file, row_groups, building_map, connect, release, table, batch_rows, since_us
+        )
+        with lock:
+            done[0] += rows
+            total_elapsed = time.time() - t0
+            print(f"  [LOAD] ... {done[0]:,} rows ({done[0] / max(total_elapsed, 1e-9):,.0f}/s)", end="\r")
+        return rows, elapsed
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, assignments))
+
+    total = sum(rows for rows, _ in results)
+    elapsed = time.time() - t0
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"\r  [LOAD] Binary COPY done: {total:,} rows in {elapsed:.1f}s ({rate:,.0f}/s)          ")
+    for w, ((rows, w_elapsed), row_groups) in enumerate(zip(results, assignments)):
+        w_rate = rows / w_elapsed if w_elapsed > 0 else 0
+        print(f"  [LOAD]   worker {w}: {rows:,} rows in {w_elapsed:.1f}s ({w_rate:,.0f}/s), {len(row_groups)} row groups")
+    return total
+
+
+def append_parquet_timeseries(
+    conn,
+    parquet_file: Path,
+    connect: Callable[[], object],
+    release: Callable[[object], None],
+    since: Optional[datetime] = None,
+    upsert: bool = False,
+    workers: int = COPY_WORKERS,
+    table: str = "timeseries",
+) -> Dict:
+    """Ingest a new time range of timeseries.parquet into an existing hypertable.
+
+    Append (default): rows newer than `since` (default: current max(time))
+    are COPYed straight into the hypertable, whose chunks for the new range
+    are created up front. Upsert: rows are COPYed into an unlogged stage
+    table, then replace any (point_id, time) already present; the DELETE is
+    bounded to the staged time range so only the affected chunks are touched.
+    Either way only the chunks of the ingested range are ANALYZEd afterwards.
+
+    Returns:
+        Dict with mode, rows, duration_s, rows_per_s, since, chunks_analyzed
+    """
+    t0 = time.time()
+    hypertable = is_hypertable(conn, table)
+    with conn.cursor() as cur:
+        if since is None and not upsert:
+            cur.execute(f"SELECT max(time) FROM {table}")
+            since = cur.fetchone()[0]
+    conn.commit()
+
+    nodes_parquet = parquet_file.parent / "nodes.parquet"
+    if upsert:
+        stage = f"{table}_stage"
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {stage}")
+            cur.execute(f"CREATE UNLOGGED TABLE {stage} (LIKE {table} INCLUDING DEFAULTS)")
+        conn.commit()
+        rows = copy_parquet_binary(
+            parquet_file, nodes_parquet, connect, release, table=stage, workers=workers, split="time", since=since
+        )
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT min(time), max(time) FROM {stage}")
+                t_min, t_max = cur.fetchone()
+                if t_min is not None:
+                    cur.execute(
+                        f"""
+                        DELETE FROM {table} t USING {stage} s
+                        WHERE t.time BETWEEN %s AND %s
+                          AND t.point_id = s.point_id AND t.time = s.time
+                        """,
+                        (t_min, t_max),
+                    )
+                    cur.execute(
+                        f"INSERT INTO {table} (time, point_id, building_id, value) "
+                        f"SELECT time, point_id, building_id, value FROM {stage}"
+                    )
+                cur.execute(f"DROP TABLE {stage}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        first_new = t_min
+    else:
+        if hypertable:
+            precreate_chunks(conn, parquet_file, table=table)
+        rows = copy_parquet_binary(
+            parquet_file, nodes_parquet, connect, release, table=table, workers=workers, split="time", since=since
+        )
+        first_new = since
+
+    # Chunk-aware maintenance: refresh statistics of the ingested range only
+    chunks_analyzed = 0
+    chunks = [table]
+    if hypertable:
+        with conn.cursor() as cur:
+            if first_new is not None:
+                cur.execute("SELECT show_chunks(%s::regclass, newer_than => %s::timestamptz)", (table, first_new))
+            else:
+                cur.execute("SELECT show_chunks(%s::regclass)", (table,))
+            chunks = [r[0] for r in cur.fetchall()]
+        conn.commit()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for chunk in chunks:
+                cur.execute(f"ANALYZE {chunk}")
+                chunks_analyzed += 1
+    finally:
+        conn.autocommit = False
+
+    duration_s = time.time() - t0
+    return {
+        "mode": "upsert" if upsert else "append",
+        "rows": rows,
+        "duration_s": duration_s,
+        "rows_per_s": rows / duration_s if duration_s > 0 else 0.0,
+        "since": since.isoformat() if since is not None else None,
+        "chunks_analyzed": chunks_analyzed,
+    }
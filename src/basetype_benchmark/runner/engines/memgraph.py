@@ -1,11 +1,32 @@
 """Memgraph engine for M1 (standalone) and M2 (hybrid) scenarios."""
 
 import csv
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, List, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-from neo4j import GraphDatabase
+from ..pool import get_bolt_driver
+
+
+# Bulk path: LOAD CSV from files visible in the container (set to 0 for UNWIND batches only)
+LOAD_CSV_ENABLED = os.getenv("BTB_MEMGRAPH_LOAD_CSV", "1") == "1"
+
+# Relationship types loaded concurrently by the bulk path
+LOAD_CSV_WORKERS = int(os.getenv("BTB_MEMGRAPH_LOAD_WORKERS", "4"))
+
+# Where the host data directory is mounted in the container, and where
+# files outside it are copied to
+CONTAINER_DATA_DIR = "/data"
+CONTAINER_IMPORT_DIR = "/tmp/btb_import"
+
+# JSON array column of mg_chunks.csv ("[1, 2, 3]") -> Cypher list
+_CSV_LIST = (
+    "CASE WHEN size(row.{col}) > 2 "
+    "THEN [x IN split(substring(row.{col}, 1, size(row.{col}) - 2), ',') | {conv}(trim(x))] "
+    "ELSE [] END"
+)
 
 
 class MemgraphEngine:
@@ -19,16 +40,24 @@ class MemgraphEngine:
         """
         self.scenario = scenario.upper()
         self.driver = None
+        self._session = None  # query session reused across execute_* calls
 
     def connect(self, uri: str = "bolt://localhost:7688") -> None:
-        """Establish database connection."""
-        self.driver = GraphDatabase.driver(uri, auth=None)
+        """Attach to the shared driver for uri (one per process, see runner.pool)."""
+        self.driver = get_bolt_driver(uri)
 
     def close(self) -> None:
-        """Close database connection."""
-        if self.driver:
-            self.driver.close()
-            self.driver = None
+        """Close the query session; the shared driver stays open for reuse."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        self.driver = None
+
+    def _query_session(self):
+        """Long-lived session for measured queries (no session setup per query)."""
+        if self._session is None:
+            self._session = self.driver.session()
+        return self._session
 
     def clear(self) -> None:
         """Clear all data."""
@@ -44,6 +73,164 @@ class MemgraphEngine:
             except:
                 pass
 
+    # ------------------------------------------------------------------
+    # Bulk path (LOAD CSV)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _container_path(host_file: Path, data_dir: Optional[Path], container: str) -> Optional[str]:
+        """Path of host_file inside the Memgraph container, copying it in if needed.
+
+        Files under data_dir are read through the /data mount; anything else
+        is copied with docker cp. Returns None when neither works.
+        """
+        host_file = Path(host_file).resolve()
+        if data_dir is not None:
+            try:
+                rel = host_file.relative_to(Path(data_dir).resolve())
+                return f"{CONTAINER_DATA_DIR}/{rel.as_posix()}"
+            except ValueError:
+                pass
+        from .. import docker
+
+        dest = f"{CONTAINER_IMPORT_DIR}/{host_file.name}"
+        return dest if docker.copy_to_container(container, host_file, dest) else None
+
+    @staticmethod
+    def _split_edges_by_type(edges_file: Path) -> Dict[str, Tuple[Path, int]]:
+        """Write one src_id,dst_id CSV per rel_type next to edges_file.
+
+        Returns:
+            rel_type -> (csv path, edge count)
+        """
+        out_dir = edges_file.parent / f"{edges_file.stem}_by_type"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        writers: Dict[str, tuple] = {}
+        counts: Dict[str, int] = {}
+        try:
+            with open(edges_file, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    rel_type = row["rel_type"]
+                    entry = writers.get(rel_type)
+                    if entry is None:
+                        fh = open(out_dir / f"{rel_type}.csv", "w", encoding="utf-8", newline="")
+                        writer = csv.writer(fh)
+                        writer.writerow(["src_id", "dst_id"])
+                        entry = (fh, writer)
+                        writers[rel_type] = entry
+                        counts[rel_type] = 0
+                    entry[1].writerow([row["src_id"], row["dst_id"]])
+                    counts[rel_type] += 1
+        finally:
+            for fh, _ in writers.values():
+                fh.close()
+        return {rel_type: (out_dir / f"{rel_type}.csv", n) for rel_type, n in counts.items()}
+
+    def load_bulk(
+        self,
+        nodes_file: Path,
+        edges_file: Path,
+        chunks_file: Optional[Path] = None,
+        data_dir: Optional[Path] = None,
+        container: str = "btb_memgraph",
+        workers: int = LOAD_CSV_WORKERS,
+    ) -> Optional[Tuple[int, int, int]]:
+        """Load nodes, edges and (M1) chunks with LOAD CSV in analytical mode.
+
+        Memgraph parses the exported mg_*.csv files itself, so rows never go
+        through Python or Bolt. Order: Node indexes, nodes, edges (one
+        concurrent LOAD CSV per relationship type), then ArchiveDay chunks.
+        The analytical storage mode skips MVCC bookkeeping during the load and
+        lets the per-type edge loads run without transaction conflicts; the
+        transactional mode is restored afterwards.
+
+        Args:
+            nodes_file, edges_file, chunks_file: Exported CSVs on the host
+            data_dir: Host directory mounted as /data in the container
+            container: Memgraph container name (for docker cp)
+            workers: Relationship types loaded concurrently
+
+        Returns:
+            (nodes, edges, chunks), or None if a file is not reachable from
+            the container (the caller falls back to the UNWIND loaders)
+        """
+        edge_files = self._split_edges_by_type(edges_file)
+        paths = {"nodes": self._container_path(nodes_file, data_dir, container)}
+        for rel_type, (path, _) in edge_files.items():
+            paths[rel_type] = self._container_path(path, data_dir, container)
+        if chunks_file is not None:
+            paths["chunks"] = self._container_path(chunks_file, data_dir, container)
+        unreachable = [name for name, path in paths.items() if path is None]
+        if unreachable:
+            print(f"  [LOAD] LOAD CSV unavailable ({', '.join(unreachable)} not reachable from {container})")
+            return None
+
+        t0 = time.time()
+        with self.driver.session() as session:
+            session.run("STORAGE MODE IN_MEMORY_ANALYTICAL").consume()
+            try:
+                # Indexes FIRST: every edge row looks up both endpoints by id
+                session.run("CREATE INDEX ON :Node(id)").consume()
+                session.run("CREATE INDEX ON :Node(building_id)").consume()
+
+                session.run(
+                    "LOAD CSV FROM $path WITH HEADER AS row "
+                    "CREATE (n:Node {id: row.id, type: row.type, "
+                    "name: row.name, equipment_type: row.equipment_type, "
+                    "building_id: row.building_id, quantity: row.quantity})",
+                    path=paths["nodes"],
+                ).consume()
+                nodes = session.run("MATCH (n:Node) RETURN count(n) AS n").single()["n"]
+                print(f"  [LOAD] Nodes: {nodes:,} in {time.time() - t0:.1f}s [LOAD CSV]")
+
+                t_edges = time.time()
+
+                def load_type(rel_type: str) -> Tuple[str, float]:
+                    t_type = time.time()
+                    with self.driver.session() as type_session:
+                        type_session.run(
+                            f"LOAD CSV FROM $path WITH HEADER AS row "
+                            f"MATCH (s:Node {{id: row.src_id}}) "
+                            f"MATCH (d:Node {{id: row.dst_id}}) "
+                            f"CREATE (s)-[:{rel_type}]->(d)",
+                            path=paths[rel_type],
+                        ).consume()
+                    return rel_type, time.time() - t_type
+
+                # Largest types first so the pool does not end on a long tail
+                ordered = sorted(edge_files, key=lambda t: edge_files[t][1], reverse=True)
+                with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                    for rel_type, elapsed in pool.map(load_type, ordered):
+                        n = edge_files[rel_type][1]
+                        rate = n / elapsed if elapsed > 0 else 0
+                        print(f"  [LOAD]   {rel_type}: {n:,} in {elapsed:.1f}s ({rate:,.0f}/s)")
+                edges = sum(n for _, n in edge_files.values())
+                print(f"  [LOAD] Edges: {edges:,} in {time.time() - t_edges:.1f}s [LOAD CSV x{workers}]")
+
+                chunks = 0
+                if chunks_file is not None:
+                    t_chunks = time.time()
+                    timestamps = _CSV_LIST.format(col="timestamps", conv="toInteger")
+                    values = _CSV_LIST.format(col="values", conv="toFloat")
+                    session.run(
+                        f"LOAD CSV FROM $path WITH HEADER AS row "
+                        f"MATCH (p:Node {{id: row.point_id}}) "
+                        f"CREATE (a:ArchiveDay {{point_id: row.point_id, day: row.date_day, "
+                        f"timestamps: {timestamps}, values: {values}}}) "
+                        f"CREATE (p)-[:HAS_TIMESERIES]->(a)",
+                        path=paths["chunks"],
+                    ).consume()
+                    chunks = session.run("MATCH (a:ArchiveDay) RETURN count(a) AS n").single()["n"]
+                    print(f"  [LOAD] Chunks: {chunks:,} in {time.time() - t_chunks:.1f}s [LOAD CSV]")
+            finally:
+                session.run("STORAGE MODE IN_MEMORY_TRANSACTIONAL").consume()
+
+        return nodes, edges, chunks
+
+    # ------------------------------------------------------------------
+    # UNWIND batch path
+    # ------------------------------------------------------------------
+
     def load_nodes(self, nodes_file: Path, batch_size: int = 1000) -> int:
         """Load nodes from CSV."""
         total = 0
@@ -130,15 +317,9 @@ class MemgraphEngine:
         print(f"  [LOAD] Edges: {total:,} in {time.time() - t0:.1f}s")
         return total
 
-    def load_chunks(self, chunks_file: Path, batch_size: int = 500) -> int:
-        """Load timeseries chunks for M1 scenario.
-
-        Expected CSV format:
-            point_id,date_day,timestamps,values
-            point_123,2024-01-01,"[1704067200,...]","[1.2,1.3,...]"
-
-        Creates ArchiveDay nodes linked to Point nodes via HAS_TIMESERIES.
-        """
+    @staticmethod
+    def _iter_chunk_batches(chunks_file: Path, batch_size: int) -> Iterator[List[Dict]]:
+        """Yield parsed chunks.csv rows in batches of batch_size."""
         try:
             import orjson as json  # type: ignore
             _loads = json.loads
@@ -146,13 +327,6 @@ class MemgraphEngine:
             import json
             _loads = json.loads
 
-        import os
-
-        batch_size = int(os.getenv("BTB_MEMGRAPH_CHUNKS_BATCH_SIZE", str(batch_size)))
-
-        total = 0
-        t0 = time.time()
-
         with open(chunks_file, "r", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             batch = []
@@ -176,51 +350,185 @@ class MemgraphEngine:
                 })
 
                 if len(batch) >= batch_size:
-                    with self.driver.session() as session:
-                        session.run(
-                            "UNWIND $batch AS row "
-                            "MATCH (p:Node {id: row.point_id}) "
-                            "CREATE (a:ArchiveDay {point_id: row.point_id, day: row.day, timestamps: row.timestamps, values: row.values}) "
-                            "CREATE (p)-[:HAS_TIMESERIES]->(a)",
-                            batch=batch
-                        )
-                    total += len(batch)
-                    batch.clear()
-                    elapsed = time.time() - t0
-                    print(f"\r  [LOAD] Chunks: {total:,} ({total/elapsed:.0f}/s)", end="", flush=True)
+                    yield batch
+                    batch = []
 
             if batch:
-                with self.driver.session() as session:
-                    session.run(
-                        "UNWIND $batch AS row "
-                        "MATCH (p:Node {id: row.point_id}) "
-                        "CREATE (a:ArchiveDay {point_id: row.point_id, day: row.day, timestamps: row.timestamps, values: row.values}) "
-                        "CREATE (p)-[:HAS_TIMESERIES]->(a)",
-                        batch=batch
-                    )
-                total += len(batch)
+                yield batch
+
+    def load_chunks(self, chunks_file: Path, batch_size: int = 500) -> int:
+        """Load timeseries chunks for M1 scenario.
+
+        Expected CSV format:
+            point_id,date_day,timestamps,values
+            point_123,2024-01-01,"[1704067200,...]","[1.2,1.3,...]"
+
+        Creates ArchiveDay nodes linked to Point nodes via HAS_TIMESERIES.
+        """
+        import os
+
+        batch_size = int(os.getenv("BTB_MEMGRAPH_CHUNKS_BATCH_SIZE", str(batch_size)))
+
+        total = 0
+        t0 = time.time()
+
+        for batch in self._iter_chunk_batches(chunks_file, batch_size):
+            with self.driver.session() as session:
+                session.run(
+                    "UNWIND $batch AS row "
+                    "MATCH (p:Node {id: row.point_id}) "
+                    "CREATE (a:ArchiveDay {point_id: row.point_id, day: row.day, timestamps: row.timestamps, values: row.values}) "
+                    "CREATE (p)-[:HAS_TIMESERIES]->(a)",
+                    batch=batch
+                )
+            total += len(batch)
+            elapsed = time.time() - t0
+            print(f"\r  [LOAD] Chunks: {total:,} ({total/elapsed:.0f}/s)", end="", flush=True)
 
         print(f"\r  [LOAD] Chunks: {total:,} in {time.time() - t0:.1f}s          ")
         return total
 
+    def append_chunks(
+        self,
+        chunks_file: Path,
+        since_day: Optional[str] = None,
+        upsert: bool = False,
+        batch_size: int = 500,
+    ) -> Dict:
+        """Ingest new days into the existing ArchiveDay graph (no clear).
+
+        Append mode only creates ArchiveDay nodes for days after `since_day`
+        (default: the latest day already loaded). Upsert mode MERGEs on
+        (point_id, day) and overwrites the arrays of days already present,
+        which relies on the ArchiveDay(point_id) index created here.
+
+        Returns:
+            Ingest stats (mode, rows, duration_s, rows_per_s, since)
+        """
+        import os
+
+        batch_size = int(os.getenv("BTB_MEMGRAPH_CHUNKS_BATCH_SIZE", str(batch_size)))
+
+        with self.driver.session() as session:
+            try:
+                session.run("CREATE INDEX ON :ArchiveDay(point_id)")
+            except Exception:
+                pass
+            if since_day is None and not upsert:
+                record = session.run("MATCH (a:ArchiveDay) RETURN max(a.day) AS day").single()
+                since_day = record["day"] if record else None
+
+        if upsert:
+            query = (
+                "UNWIND $batch AS row "
+                "MATCH (p:Node {id: row.point_id}) "
+                "MERGE (a:ArchiveDay {point_id: row.point_id, day: row.day}) "
+                "SET a.timestamps = row.timestamps, a.values = row.values "
+                "MERGE (p)-[:HAS_TIMESERIES]->(a)"
+            )
+        else:
+            query = (
+                "UNWIND $batch AS row "
+                "MATCH (p:Node {id: row.point_id}) "
+                "CREATE (a:ArchiveDay {point_id: row.point_id, day: row.day, timestamps: row.timestamps, values: row.values}) "
+                "CREATE (p)-[:HAS_TIMESERIES]->(a)"
+            )
+
+        total = 0
+        t0 = time.time()
+        for batch in self._iter_chunk_batches(chunks_file, batch_size):
+            if since_day is not None and not upsert:
+                batch = [row for row in batch if row["day"] > since_day]
+                if not batch:
+                    continue
+            with self.driver.session() as session:
+                session.run(query, batch=batch)
+            total += len(batch)
+
+        duration_s = time.time() - t0
+        stats = {
+            "mode": "upsert" if upsert else "append",
+            "rows": total,
+            "duration_s": duration_s,
+            "rows_per_s": total / duration_s if duration_s > 0 else 0.0,
+            "since": since_day,
+        }
+        print(f"  [LOAD] Chunks {stats['mode']}: {total:,} in {duration_s:.1f}s ({stats['rows_per_s']:,.0f}/s)")
+        return stats
+
     def execute_query(self, query: str) -> Tuple[int, float]:
         """Execute a Cypher query and return (row_count, latency_ms)."""
+        session = self._query_session()
         t0 = time.perf_counter()
-        with self.driver.session() as session:
-            result = list(session.run(query))
-            latency_ms = (time.perf_counter() - t0) * 1000
-            return len(result), latency_ms
+        result = list(session.run(query))
+        latency_ms = (time.perf_counter() - t0) * 1000
+        return len(result), latency_ms
 
     def execute_query_with_results(self, query: str) -> Tuple[list, float]:
         """Execute a Cypher query and return (rows, latency_ms) for validation."""
+        session = self._query_session()
         t0 = time.perf_counter()
-        with self.driver.session() as session:
-            result = list(session.run(query))
-            latency_ms = (time.perf_counter() - t0) * 1000
-            # Convert neo4j Records to dicts
-            rows_data = [dict(r) for r in result]
-            return rows_data, latency_ms
-
-    def get_executor(self) -> Callable[[str], Tuple[int, float]]:
-        """Return query executor function."""
+        result = list(session.run(query))
+        latency_ms = (time.perf_counter() - t0) * 1000
+        # Convert neo4j Records to dicts
+        rows_data = [dict(r) for r in result]
+        return rows_data, latency_ms
+
+    def execute_query_streaming(self, query: str) -> Tuple[int, float, float]:
+        """Execute a Cypher query counting records only.
+
+        Records are counted off the Bolt stream and dropped (no list, no
+        dicts); result.consume() then finishes the stream.
+
+        Returns:
+            Tuple of (row_count, latency_ms, first_row_ms)
+        """
+        session = self._query_session()
+        t0 = time.perf_counter()
+        first_row_ms = None
+        row_count = 0
+        result = session.run(query)
+        for _ in result:
+            if first_row_ms is None:
+                first_row_ms = (time.perf_counter() - t0) * 1000
+            row_count += 1
+        result.consume()
+        latency_ms = (time.perf_counter() - t0) * 1000
+        return row_count, latency_ms, first_row_ms if first_row_ms is not None else latency_ms
+
+    def explain_query(self, query: str) -> Dict:
+        """Run a Cypher query under PROFILE.
+
+        Server timings come from the Bolt summary metadata Memgraph sends
+        (parsing_time / planning_time / plan_execution_time, in seconds);
+        the PROFILE rows (per-operator hits and times) are kept as the plan.
+        Memgraph has no buffer statistics.
+
+        Returns:
+            Dict with server_ms, planning_ms, execution_ms, buffers and plan
+        """
+        result = self._query_session().run(f"PROFILE {query}")
+        plan = [dict(r) for r in result]
+        summary = result.consume()
+        metadata = getattr(summary, "metadata", None) or {}
+
+        planning_ms = (float(metadata.get("parsing_time", 0.0)) + float(metadata.get("planning_time", 0.0))) * 1000
+        execution_ms = float(metadata.get("plan_execution_time", 0.0)) * 1000
+        return {
+            "server_ms": planning_ms + execution_ms,
+            "planning_ms": planning_ms,
+            "execution_ms": execution_ms,
+            "buffers": {},
+            "plan": plan,
+        }
+
+    def stream_query(self, query: str) -> Iterator[Dict]:
+        """Yield result records as dicts while Memgraph is still streaming them."""
+        for record in self._query_session().run(query):
+            yield dict(record)
+
+    def get_executor(self, fetch: str = "full") -> Callable[[str], Tuple]:
+        """Return query executor function ("full" or "stream" fetch mode)."""
+        if fetch == "stream":
+            return self.execute_query_streaming
         return self.execute_query
@@ -1,23 +1,104 @@
 """Oxigraph engine for O1 (standalone) and O2 (hybrid) scenarios."""
 
+import os
 import time
+import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Callable, Tuple
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
 
 import requests
 
+from .. import ntriples_load
+from ..pool import get_http_session
+
+
+# Queries longer than this (characters) are sent as POST bodies instead of
+# URL parameters (generated queries such as the Q1 UNION exceed URL limits)
+POST_QUERY_THRESHOLD = int(os.getenv("BTB_SPARQL_POST_THRESHOLD", "2000"))
+
+# Result format for execute_query_with_results: json, tsv or xml
+RESULT_FORMAT = os.getenv("BTB_SPARQL_RESULT_FORMAT", "json")
+
+RESULT_MEDIA_TYPES = {
+    "json": "application/sparql-results+json",
+    "tsv": "text/tab-separated-values",
+    "xml": "application/sparql-results+xml",
+}
+
+# N-Triples load path: post, parallel or bulk (see runner.ntriples_load)
+LOAD_MODE = os.getenv("BTB_OXIGRAPH_LOAD_MODE", "post")
+LOAD_MODES = ("post", "parallel", "bulk")
+
+_XML_NS = "{http://www.w3.org/2005/sparql-results#}"
+
+
+def _parse_tsv_term(term: str) -> Optional[str]:
+    """Return the lexical value of an RDF term from SPARQL TSV results."""
+    if term == "":
+        return None  # unbound
+    if term.startswith('"'):
+        end = term.rfind('"')
+        value = term[1:end]
+        if "\\" in value:
+            value = (
+                value.replace("\\t", "\t").replace("\\n", "\n").replace("\\r", "\r")
+                .replace('\\"', '"').replace("\\\\", "\\")
+            )
+        return value
+    if term.startswith("<") and term.endswith(">"):
+        return term[1:-1]
+    return term  # numbers/booleans in abbreviated form, blank nodes
+
+
+def _iter_tsv_rows(resp) -> Iterator[Dict]:
+    """Parse a streamed SPARQL TSV response line by line."""
+    resp.encoding = "utf-8"
+    lines = resp.iter_lines(decode_unicode=True)
+    header = next(lines, None)
+    if not header:
+        return
+    variables = [v.lstrip("?") for v in header.split("\t")]
+    for line in lines:
+        if line:
+            yield {var: _parse_tsv_term(t) for var, t in zip(variables, line.split("\t"))}
+
+
+def _iter_xml_rows(resp) -> Iterator[Dict]:
+    """Parse a streamed SPARQL XML response one <result> element at a time."""
+    resp.raw.decode_content = True
+    for _, elem in ET.iterparse(resp.raw, events=("end",)):
+        if elem.tag != f"{_XML_NS}result":
+            continue
+        row = {}
+        for binding in elem:
+            term = binding[0] if len(binding) else None
+            row[binding.get("name")] = term.text if term is not None else None
+        elem.clear()
+        yield row
+
 
 class OxigraphEngine:
     """Oxigraph engine for O1/O2 benchmarks."""
 
-    def __init__(self, scenario: str = "O1"):
+    def __init__(self, scenario: str = "O1", result_format: str = RESULT_FORMAT):
         """Initialize engine.
 
         Args:
             scenario: O1 (standalone) or O2 (hybrid with TimescaleDB)
+            result_format: SPARQL results format for execute_query_with_results
+                (json, tsv or xml; tsv/xml are parsed while streaming)
         """
+        if result_format not in RESULT_MEDIA_TYPES:
+            raise ValueError(f"Unknown SPARQL result format: {result_format}")
         self.scenario = scenario.upper()
         self.base_url = "http://localhost:7878"
+        self.container = "btb_oxigraph"
+        self.result_format = result_format
+
+    @property
+    def http(self):
+        """Keep-alive session of the calling thread (see runner.pool)."""
+        return get_http_session(self.base_url)
 
     def connect(self) -> None:
         """Verify Oxigraph is reachable."""
@@ -26,7 +107,7 @@ class OxigraphEngine:
             try:
                 # NOTE: Recent oxigraph/oxigraph images reset the connection if /query
                 # is called without a query parameter. Use a minimal ASK query instead.
-                resp = requests.get(
+                resp = self.http.get(
                     f"{self.base_url}/query",
                     params={"query": "ASK { ?s ?p ?o }"},
                     headers={"Accept": "application/sparql-results+json"},
@@ -41,41 +122,72 @@ class OxigraphEngine:
         raise ConnectionError("Could not connect to Oxigraph")
 
     def close(self) -> None:
-        """No persistent connection to close."""
+        """Nothing to close: keep-alive connections are shared (see runner.pool)."""
         pass
 
     def clear(self) -> None:
         """Clear all data."""
-        requests.post(
+        self.http.post(
             f"{self.base_url}/update",
             data="DROP ALL",
             headers={"Content-Type": "application/sparql-update"},
             timeout=30,
         )
 
-    def load_ntriples(self, nt_file: Path) -> int:
-        """Load N-Triples file into Oxigraph."""
+    def load_ntriples(self, nt_file: Path, mode: Optional[str] = None) -> int:
+        """Load an N-Triples file into Oxigraph and return the store's triple count.
+
+        Args:
+            nt_file: N-Triples file
+            mode: post (single request), parallel (concurrent line-aligned
+                POSTs) or bulk (offline `oxigraph load`, server restarted);
+                default BTB_OXIGRAPH_LOAD_MODE
+        """
+        return self.load_ntriples_files([nt_file], mode)
+
+    def load_ntriples_files(self, nt_files: Sequence[Path], mode: Optional[str] = None) -> int:
+        """Load several N-Triples files (one offline run in bulk mode)."""
+        mode = (mode or LOAD_MODE).lower()
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown Oxigraph load mode: {mode}")
+        before = self.count_triples()
         t0 = time.time()
-        total_bytes = nt_file.stat().st_size
-
-        with open(nt_file, "rb") as f:
-            resp = requests.post(
-                f"{self.base_url}/store?default",  # Use default graph
-                data=f,
-                headers={"Content-Type": "application/n-triples"},
-                timeout=600,
-            )
+        total_bytes = sum(p.stat().st_size for p in nt_files)
 
-        if resp.status_code not in (200, 201, 204):
-            raise RuntimeError(f"Failed to load N-Triples: HTTP {resp.status_code} - {resp.text}")
+        if mode == "bulk":
+            stats = ntriples_load.bulk_load_offline(nt_files, self.container)
+            self.connect()  # server was restarted
+            detail = f"{stats['parts']} parts"
+        elif mode == "parallel":
+            chunks = 0
+            for nt_file in nt_files:
+                chunks += ntriples_load.post_ntriples_parallel(self.base_url, nt_file)["chunks"]
+            detail = f"{chunks} chunks x {ntriples_load.POST_WORKERS} workers"
+        else:
+            for nt_file in nt_files:
+                with open(nt_file, "rb") as f:
+                    resp = self.http.post(
+                        f"{self.base_url}/store?default",  # Use default graph
+                        data=f,
+                        headers={"Content-Type": "application/n-triples"},
+                        timeout=600,
+                    )
+                if resp.status_code not in (200, 201, 204):
+                    raise RuntimeError(f"Failed to load N-Triples: HTTP {resp.status_code} - {resp.text}")
+            detail = "single request"
 
         elapsed = time.time() - t0
+        count = self.count_triples()
+        rate = max(0, count - before) / elapsed if elapsed > 0 else 0.0
         mb = total_bytes / (1024 * 1024)
-        print(f"  [LOAD] N-Triples: {mb:.0f} MB in {elapsed:.1f}s")
+        print(f"  [LOAD] N-Triples ({mode}, {detail}): {mb:.0f} MB in {elapsed:.1f}s, "
+              f"store {count:,} triples ({rate:,.0f} triples/s)")
+        return count
 
-        # Count triples
+    def count_triples(self) -> int:
+        """Count triples in the store (0 if the query fails)."""
         count_query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
-        resp = requests.get(
+        resp = self.http.get(
             f"{self.base_url}/query",
             params={"query": count_query},
             headers={"Accept": "application/sparql-results+json"},
@@ -83,25 +195,52 @@ class OxigraphEngine:
         )
         if resp.status_code == 200:
             data = resp.json()
-            count = int(data["results"]["bindings"][0]["count"]["value"])
-            return count
-
+            return int(data["results"]["bindings"][0]["count"]["value"])
         return 0
 
+    def _send_query(self, query: str, accept: str, stream: bool = False, timeout: int = 120):
+        """Submit a SPARQL query, as GET for short queries and POST for long ones."""
+        headers = {"Accept": accept}
+        if len(query) > POST_QUERY_THRESHOLD:
+            headers["Content-Type"] = "application/sparql-query"
+            return self.http.post(
+                f"{self.base_url}/query",
+                data=query.encode("utf-8"),
+                headers=headers,
+                stream=stream,
+                timeout=timeout,
+            )
+        return self.http.get(
+            f"{self.base_url}/query",
+            params={"query": query},
+            headers=headers,
+            stream=stream,
+            timeout=timeout,
+        )
+
     def execute_query(self, query: str) -> Tuple[int, float]:
         """Execute a SPARQL query and return (row_count, latency_ms)."""
         rows, latency_ms = self.execute_query_with_results(query)
         return len(rows), latency_ms
 
     def execute_query_with_results(self, query: str) -> Tuple[list, float]:
-        """Execute a SPARQL query and return (rows, latency_ms) for validation."""
+        """Execute a SPARQL query and return (rows, latency_ms) for validation.
+
+        With the json format, latency covers the full response download and
+        the JSON is decoded afterwards. With tsv/xml, rows are parsed while
+        the response streams in, so latency includes parsing.
+        """
+        if self.result_format != "json":
+            t0 = time.perf_counter()
+            with self._send_query(query, RESULT_MEDIA_TYPES[self.result_format], stream=True) as resp:
+                if resp.status_code != 200:
+                    return [], (time.perf_counter() - t0) * 1000
+                parse = _iter_tsv_rows if self.result_format == "tsv" else _iter_xml_rows
+                rows_data = list(parse(resp))
+            return rows_data, (time.perf_counter() - t0) * 1000
+
         t0 = time.perf_counter()
-        resp = requests.get(
-            f"{self.base_url}/query",
-            params={"query": query},
-            headers={"Accept": "application/sparql-results+json"},
-            timeout=120,
-        )
+        resp = self._send_query(query, RESULT_MEDIA_TYPES["json"])
         latency_ms = (time.perf_counter() - t0) * 1000
 
         if resp.status_code == 200:
@@ -113,6 +252,49 @@ class OxigraphEngine:
 
         return [], latency_ms
 
-    def get_executor(self) -> Callable[[str], Tuple[int, float]]:
-        """Return query executor function."""
+    def execute_query_streaming(self, query: str) -> Tuple[int, float, float]:
+        """Execute a SPARQL query counting result rows only.
+
+        Asks for TSV results (one row per line, newlines inside literals
+        are escaped) and counts line breaks on the raw byte stream, so no
+        JSON is parsed and no per-binding dicts are built.
+
+        Returns:
+            Tuple of (row_count, latency_ms, first_row_ms)
+        """
+        t0 = time.perf_counter()
+        first_row_ms = None
+        newlines = 0
+        last_byte = b"\n"
+        with self._send_query(query, RESULT_MEDIA_TYPES["tsv"], stream=True) as resp:
+            if resp.status_code != 200:
+                raise RuntimeError(f"SPARQL query failed: HTTP {resp.status_code} - {resp.text[:200]}")
+            for chunk in resp.iter_content(chunk_size=64 * 1024):
+                if not chunk:
+                    continue
+                newlines += chunk.count(b"\n")
+                last_byte = chunk[-1:]
+                # First row complete once the header line and one row are in
+                if first_row_ms is None and newlines >= 2:
+                    first_row_ms = (time.perf_counter() - t0) * 1000
+        latency_ms = (time.perf_counter() - t0) * 1000
+
+        lines = newlines + (0 if last_byte == b"\n" else 1)
+        row_count = max(lines - 1, 0)  # minus header
+        return row_count, latency_ms, first_row_ms if first_row_ms is not None else latency_ms
+
+    def stream_query(self, query: str) -> Iterator[Dict]:
+        """Yield SPARQL result rows as dicts while the response is streaming.
+
+        Uses the TSV results format, which can be parsed line by line.
+        """
+        with self._send_query(query, RESULT_MEDIA_TYPES["tsv"], stream=True) as resp:
+            if resp.status_code != 200:
+                raise RuntimeError(f"SPARQL query failed: HTTP {resp.status_code} - {resp.text[:200]}")
+            yield from _iter_tsv_rows(resp)
+
+    def get_executor(self, fetch: str = "full") -> Callable[[str], Tuple]:
+        """Return query executor function ("full" or "stream" fetch mode)."""
+        if fetch == "stream":
+            return self.execute_query_streaming
         return self.execute_query
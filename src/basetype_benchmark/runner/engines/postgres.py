@@ -1,14 +1,18 @@
 """PostgreSQL engine for P1 (relational) and P2 (JSONB) scenarios."""
 
 import csv
+import json
 import os
 import time
+from datetime import datetime
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple
 
 import psycopg2
 from psycopg2.extras import execute_batch
 
+from ..pool import acquire_pg_connection, release_pg_connection
+
 
 def _read_env_file(path: Path) -> Dict[str, str]:
     """Read a simple KEY=VALUE env file."""
@@ -99,6 +103,213 @@ def get_connection(
     raise last_error
 
 
+def acquire_connection(
+    host: str = "localhost",
+    port: int = 5432,
+    user: str = "benchmark",
+    password: str = "benchmark",
+    database: str = "benchmark",
+):
+    """Borrow a warm connection from the shared pool (opened with get_connection).
+
+    Give it back with release_connection(); it is reset (DISCARD ALL) before
+    the next user gets it.
+    """
+    cfg = _resolve_pg_config_defaults(host, port, user, password, database)
+    key = (cfg["host"], cfg["port"], cfg["user"], cfg["database"])
+    return acquire_pg_connection(key, lambda: get_connection(host, port, user, password, database))
+
+
+def release_connection(conn, discard: bool = False) -> None:
+    """Return a connection from acquire_connection() to the pool."""
+    release_pg_connection(conn, discard=discard)
+
+
+# Rows per round trip for server-side cursors in streaming fetch mode
+STREAM_ITERSIZE = int(os.getenv("BTB_PG_STREAM_ITERSIZE", "2000"))
+
+
+def stream_count(conn, query: str, args=None, itersize: int = STREAM_ITERSIZE) -> Tuple[int, float, float]:
+    """Run a SELECT through a server-side cursor and only count the rows.
+
+    Rows arrive in itersize batches and are dropped right away, so no
+    result list or per-row dicts are built inside the timed region.
+
+    Returns:
+        Tuple of (row_count, latency_ms, first_row_ms) - latency_ms is the
+        time to the last row
+    """
+    t0 = time.perf_counter()
+    first_row_ms = None
+    row_count = 0
+    try:
+        with conn.cursor(name="btb_stream") as cur:
+            cur.itersize = itersize
+            cur.execute(query, args)
+            while True:
+                batch = cur.fetchmany(itersize)
+                if first_row_ms is None:
+                    first_row_ms = (time.perf_counter() - t0) * 1000
+                if not batch:
+                    break
+                row_count += len(batch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    latency_ms = (time.perf_counter() - t0) * 1000
+    return row_count, latency_ms, first_row_ms
+
+
+# Buffer counters reported by EXPLAIN (BUFFERS) on the top plan node (cumulative)
+EXPLAIN_BUFFER_KEYS = {
+    "Shared Hit Blocks": "shared_hit",
+    "Shared Read Blocks": "shared_read",
+    "Shared Dirtied Blocks": "shared_dirtied",
+    "Temp Read Blocks": "temp_read",
+    "Temp Written Blocks": "temp_written",
+}
+
+
+def explain_analyze(conn, query: str, args=None) -> Dict:
+    """Run a query under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+
+    Returns:
+        Dict with server_ms (planning + execution), planning_ms,
+        execution_ms, buffers (block counters + hit_ratio) and the JSON plan
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", args)
+            raw = cur.fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    top = plan[0] if isinstance(plan, list) else plan
+    root = top.get("Plan", {})
+
+    buffers = {key: int(root.get(name, 0)) for name, key in EXPLAIN_BUFFER_KEYS.items()}
+    touched = buffers["shared_hit"] + buffers["shared_read"]
+    buffers["hit_ratio"] = round(buffers["shared_hit"] / touched, 4) if touched else 1.0
+
+    planning_ms = float(top.get("Planning Time", 0.0))
+    execution_ms = float(top.get("Execution Time", 0.0))
+    return {
+        "server_ms": planning_ms + execution_ms,
+        "planning_ms": planning_ms,
+        "execution_ms": execution_ms,
+        "buffers": buffers,
+        "plan": root,
+    }
+
+
+class PreparedStatements:
+    """Server-side prepared statements bound to one connection.
+
+    Each statement is PREPAREd once (parse/analyze paid once) and then run
+    with EXECUTE, so PostgreSQL can reuse its plan across parameter variants.
+    Values are passed as bind parameters: lists (e.g. $POINT_IDS) become
+    text[] arrays instead of literal IN-lists.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._statements: Dict[str, List[str]] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._statements
+
+    def prepare(self, name: str, query_template: str, params: Dict) -> float:
+        """PREPARE a $PARAM query template under `name`.
+
+        Args:
+            name: Statement name (unique per connection, e.g. p1_q6)
+            query_template: SQL with $PARAM placeholders
+            params: Example parameter dict (defines which placeholders are bound)
+
+        Returns:
+            Time spent in PREPARE (ms)
+        """
+        from basetype_benchmark.runner.params import to_bind_params
+
+        sql, keys = to_bind_params(query_template, params)
+        sql = sql.strip().rstrip(";")
+
+        t0 = time.perf_counter()
+        try:
+            with self.conn.cursor() as cur:
+                if name in self._statements:
+                    cur.execute(f"DEALLOCATE {name}")
+                cur.execute(f"PREPARE {name} AS {sql}")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self._statements[name] = keys
+        return (time.perf_counter() - t0) * 1000
+
+    def _execute_sql(self, name: str, params: Dict) -> Tuple[str, list]:
+        keys = self._statements[name]
+        values = [params[k] for k in keys]
+        if not values:
+            return f"EXECUTE {name}", values
+        placeholders = ", ".join(["%s"] * len(values))
+        return f"EXECUTE {name}({placeholders})", values
+
+    def execute(self, name: str, params: Dict) -> Tuple[int, float, list]:
+        """EXECUTE a prepared statement, return (row_count, latency_ms, rows)."""
+        sql, values = self._execute_sql(name, params)
+        t0 = time.perf_counter()
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(sql, values)
+                rows = cur.fetchall()
+                self.conn.commit()
+                latency_ms = (time.perf_counter() - t0) * 1000
+                if cur.description:
+                    cols = [d[0] for d in cur.description]
+                    rows_data = [dict(zip(cols, row)) for row in rows]
+                else:
+                    rows_data = []
+                return len(rows), latency_ms, rows_data
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def explain(self, name: str, params: Dict) -> Dict[str, float]:
+        """Split server time of one EXECUTE into planning and execution (ms).
+
+        Uses EXPLAIN (ANALYZE, TIMING OFF) to keep instrumentation overhead low.
+        Planning time drops to ~0 once PostgreSQL switches to the cached
+        generic plan, which is exactly the gap with ad-hoc literal SQL.
+        """
+        sql, values = self._execute_sql(name, params)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(f"EXPLAIN (ANALYZE, TIMING OFF, SUMMARY ON, FORMAT JSON) {sql}", values)
+                raw = cur.fetchone()[0]
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        top = plan[0] if isinstance(plan, list) else plan
+        return {
+            "planning_ms": float(top.get("Planning Time", 0.0)),
+            "execution_ms": float(top.get("Execution Time", 0.0)),
+        }
+
+    def deallocate_all(self) -> None:
+        """Drop all prepared statements of this connection."""
+        if self._statements:
+            with self.conn.cursor() as cur:
+                cur.execute("DEALLOCATE ALL")
+            self.conn.commit()
+        self._statements.clear()
+
+
 class PostgresEngine:
     """PostgreSQL engine for P1/P2 benchmarks."""
 
@@ -110,16 +321,19 @@ class PostgresEngine:
         """
         self.scenario = scenario.upper()
         self.conn = None
+        self.prepared: Optional[PreparedStatements] = None
 
     def connect(self) -> None:
-        """Establish database connection."""
-        self.conn = get_connection()
+        """Take a database connection from the shared pool."""
+        self.conn = acquire_connection()
+        self.prepared = PreparedStatements(self.conn)
 
     def close(self) -> None:
-        """Close database connection."""
+        """Return the database connection to the pool."""
         if self.conn:
-            self.conn.close()
+            release_connection(self.conn)
             self.conn = None
+            self.prepared = None
 
     def clear(self) -> None:
         """Clear all tables."""
@@ -513,6 +727,114 @@ class PostgresEngine:
         print(f"  [LOAD] Timeseries: {total:,} rows in {elapsed:.1f}s ({rate:,.0f}/s) [parallel-copy]")
         return total
 
+    def load_timeseries_parquet_parallel(
+        self,
+        parquet_file: Path,
+        workers: Optional[int] = None,
+        split: Optional[str] = None,
+    ) -> int:
+        """Load timeseries from the host with parallel binary COPY into a hypertable.
+
+        Native replacement for timescaledb-parallel-copy that needs no CSV
+        mounted in the container: the hypertable and its chunks are created
+        first, each worker COPYs its slice of timeseries.parquet (by row group
+        or time range) on its own connection, and indexes are only built once
+        every worker is done.
+
+        Args:
+            parquet_file: Path to timeseries.parquet (nodes.parquet alongside)
+            workers: Parallel connections (default: env BTB_PG_BINARY_COPY_WORKERS)
+            split: "time" or "row_group" (default: env BTB_PG_BINARY_COPY_SPLIT or time)
+
+        Returns:
+            Total rows loaded
+        """
+        from .copy_binary import COPY_WORKERS, copy_parquet_binary, precreate_chunks
+
+        t0 = time.time()
+        split = split or os.getenv("BTB_PG_BINARY_COPY_SPLIT", "time")
+
+        with self.conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS timeseries CASCADE")
+            cur.execute("""
+                CREATE TABLE timeseries (
+                    time TIMESTAMPTZ NOT NULL,
+                    point_id TEXT NOT NULL,
+                    building_id TEXT NOT NULL,
+                    value REAL
+                )
+            """)
+            cur.execute("""
+                SELECT create_hypertable(
+                    'timeseries', 'time',
+                    chunk_time_interval => INTERVAL '1 day',
+                    create_default_indexes => FALSE
+                )
+            """)
+        self.conn.commit()
+
+        n_chunks = precreate_chunks(self.conn, parquet_file)
+        print(f"  [LOAD] Hypertable ready with {n_chunks} chunks")
+
+        total = copy_parquet_binary(
+            parquet_file,
+            parquet_file.parent / "nodes.parquet",
+            connect=acquire_connection,
+            release=release_connection,
+            workers=workers or COPY_WORKERS,
+            split=split,
+        )
+
+        print("  [LOAD] Creating indexes...")
+        t_idx = time.time()
+        self._create_ts_index()
+        print(f"  [LOAD] Indexes created in {time.time() - t_idx:.1f}s")
+
+        elapsed = time.time() - t0
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f"  [LOAD] Timeseries: {total:,} rows in {elapsed:.1f}s ({rate:,.0f}/s) [python parallel COPY]")
+        return total
+
+    def append_timeseries_from_parquet(
+        self,
+        parquet_file: Path,
+        since: Optional[datetime] = None,
+        upsert: bool = False,
+        workers: Optional[int] = None,
+    ) -> Dict:
+        """Ingest a new time range into the existing hypertable (no reload).
+
+        Append mode COPYs only rows newer than `since` (default: the current
+        max(time)); upsert mode replaces rows already present for the same
+        (point_id, time). Indexes stay in place and only the chunks of the
+        ingested range are re-analyzed.
+
+        Args:
+            parquet_file: timeseries.parquet covering the new days
+            since: Lower bound (exclusive) of the range to ingest
+            upsert: Replace existing (point_id, time) rows instead of skipping them
+            workers: Parallel connections (default: env BTB_PG_BINARY_COPY_WORKERS)
+
+        Returns:
+            Ingest stats (mode, rows, duration_s, rows_per_s, since, chunks_analyzed)
+        """
+        from .copy_binary import COPY_WORKERS, append_parquet_timeseries
+
+        stats = append_parquet_timeseries(
+            self.conn,
+            parquet_file,
+            connect=acquire_connection,
+            release=release_connection,
+            since=since,
+            upsert=upsert,
+            workers=workers or COPY_WORKERS,
+        )
+        print(
+            f"  [LOAD] Timeseries {stats['mode']}: {stats['rows']:,} rows in {stats['duration_s']:.1f}s "
+            f"({stats['rows_per_s']:,.0f}/s, {stats['chunks_analyzed']} chunks analyzed)"
+        )
+        return stats
+
     # Legacy methods kept for compatibility
     def _reset_stage_table(self) -> None:
         """Recreate unlogged staging table (DEPRECATED - use direct COPY instead)."""
@@ -661,36 +983,29 @@ class PostgresEngine:
         """
         return self.load_timeseries_server_direct(container_path)
 
-    def load_timeseries_from_parquet(self, parquet_file: Path, batch_size: int = 5_000_000) -> int:
-        """Load timeseries from pre-enriched CSV (with building_id).
-        
-        Expects timeseries_enriched.csv in same directory as parquet file.
-        This CSV is generated once during dataset export using DuckDB.
+    def load_timeseries_from_parquet(
+        self,
+        parquet_file: Path,
+        workers: Optional[int] = None,
+        batch_rows: Optional[int] = None,
+    ) -> int:
+        """Load timeseries straight from Parquet with parallel binary COPY.
+
+        Arrow batches from timeseries.parquet get building_id from
+        nodes.parquet (joined in memory) and are encoded into COPY BINARY
+        over several connections - no intermediate CSV is written.
+
+        Args:
+            parquet_file: Path to timeseries.parquet (nodes.parquet alongside)
+            workers: Parallel COPY connections (default: env BTB_PG_BINARY_COPY_WORKERS)
+            batch_rows: Rows per Arrow batch (default: env BTB_PG_BINARY_COPY_BATCH_ROWS)
+
+        Returns:
+            Total rows loaded
         """
-        try:
-            import duckdb  # type: ignore
-        except Exception as e:
-            raise RuntimeError(
-                "DuckDB is required for Parquet->CSV enrichment. "
-                "Either install duckdb or load from timeseries.csv instead. "
-                f"Original error: {e}"
-            )
-        
+        from .copy_binary import COPY_BATCH_ROWS, COPY_WORKERS, copy_parquet_binary
+
         t0 = time.time()
-        
-        # Check for pre-enriched CSV (generated during export)
-        enriched_csv = parquet_file.parent / "timeseries_enriched.csv"
-        
-        if not enriched_csv.exists():
-            print(f"  [LOAD] Generating enriched CSV with DuckDB (one-time)...")
-            self._generate_enriched_csv(parquet_file, enriched_csv)
-        
-        # Get row count
-        con = duckdb.connect()
-        total_rows = con.execute(f"SELECT COUNT(*) FROM read_csv('{enriched_csv}', header=true, sample_size=-1)").fetchone()[0]
-        con.close()
-        
-        print(f"  [LOAD] Timeseries: {total_rows:,} rows via COPY FROM CSV...")
 
         # Drop and recreate table
         with self.conn.cursor() as cur:
@@ -705,25 +1020,14 @@ class PostgresEngine:
             """)
         self.conn.commit()
 
-        # Prefer in-container parallel-copy if the file is mounted at /data/parquet/
-        try:
-            ts_rows = self.load_timeseries_parallel_copy(
-                "/data/parquet/timeseries_enriched.csv",
-                csv_columns="time,point_id,building_id,value",
-            )
-        except Exception as e:
-            print(f"  [WARN] parallel-copy failed ({e}); falling back to client-side COPY...")
-            print(f"  [LOAD] COPY FROM file...")
-            t_load = time.time()
-            with self.conn.cursor() as cur:
-                with open(enriched_csv, "rb") as f:
-                    cur.copy_expert(
-                        "COPY timeseries (time, point_id, building_id, value) FROM STDIN WITH CSV HEADER",
-                        f,
-                    )
-            self.conn.commit()
-            load_time = time.time() - t_load
-            print(f"  [LOAD] COPY done: {total_rows:,} rows in {load_time:.1f}s ({total_rows/load_time:,.0f}/s)")
+        total_rows = copy_parquet_binary(
+            parquet_file,
+            parquet_file.parent / "nodes.parquet",
+            connect=acquire_connection,
+            release=release_connection,
+            workers=workers or COPY_WORKERS,
+            batch_rows=batch_rows or COPY_BATCH_ROWS,
+        )
 
         # Convert to LOGGED table
         print(f"  [LOAD] Converting to logged table...")
@@ -762,29 +1066,6 @@ class PostgresEngine:
 
         return total_rows
 
-    def _generate_enriched_csv(self, parquet_file: Path, output_csv: Path) -> None:
-        """Generate timeseries CSV with building_id using DuckDB."""
-        import duckdb  # type: ignore
-        
-        parquet_dir = parquet_file.parent
-        con = duckdb.connect()
-        
-        con.execute(f"""
-            COPY (
-                SELECT 
-                    ts.timestamp as time,
-                    ts.point_id,
-                    COALESCE(json_extract_string(n.properties, '$.building_id'), '') as building_id,
-                    ts.value
-                FROM read_parquet('{parquet_file}') ts
-                LEFT JOIN read_parquet('{parquet_dir}/nodes.parquet') n ON ts.point_id = n.id
-            ) TO '{output_csv}' (HEADER, DELIMITER ',')
-        """)
-        con.close()
-
-        # Do not create indexes here: this function only generates the CSV.
-        # Index creation belongs to the actual load step.
-
     def execute_query(self, query: str) -> Tuple[int, float]:
         """Execute a query and return (row_count, latency_ms)."""
         row_count, latency_ms, _ = self._execute(query)
@@ -795,6 +1076,14 @@ class PostgresEngine:
         _, latency_ms, rows = self._execute(query)
         return rows, latency_ms
 
+    def execute_query_streaming(self, query: str) -> Tuple[int, float, float]:
+        """Execute a query counting rows only, return (row_count, latency_ms, first_row_ms)."""
+        return stream_count(self.conn, query)
+
+    def explain_query(self, query: str) -> Dict:
+        """Run a query under EXPLAIN ANALYZE, return server timings, buffers and plan."""
+        return explain_analyze(self.conn, query)
+
     def _execute(self, query: str) -> Tuple[int, float, list]:
         """Execute query, return (row_count, latency_ms, rows)."""
         t0 = time.perf_counter()
@@ -815,6 +1104,26 @@ class PostgresEngine:
             self.conn.rollback()
             raise e
 
-    def get_executor(self) -> Callable[[str], Tuple[int, float]]:
-        """Return query executor function."""
+    def prepare(self, name: str, query_template: str, params: Dict) -> float:
+        """PREPARE a $PARAM query template once for this connection (returns ms)."""
+        return self.prepared.prepare(name, query_template, params)
+
+    def execute_prepared(self, name: str, params: Dict) -> Tuple[int, float]:
+        """EXECUTE a prepared statement and return (row_count, latency_ms)."""
+        row_count, latency_ms, _ = self.prepared.execute(name, params)
+        return row_count, latency_ms
+
+    def explain_prepared(self, name: str, params: Dict) -> Dict[str, float]:
+        """Return planning/execution time (ms) of a prepared statement run."""
+        return self.prepared.explain(name, params)
+
+    def get_executor(self, fetch: str = "full") -> Callable[[str], Tuple]:
+        """Return query executor function.
+
+        Args:
+            fetch: "full" (fetch all rows) or "stream" (server-side cursor,
+                count only; the executor also returns time to first row)
+        """
+        if fetch == "stream":
+            return self.execute_query_streaming
         return self.execute_query
@@ -4,13 +4,26 @@ This module provides timeseries functionality for hybrid architectures
 where the graph is in Memgraph/Oxigraph and timeseries in TimescaleDB.
 """
 
+import io
+import os
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import Callable, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import psycopg2
 
-from .postgres import get_connection
+from ..params import strip_sql_comments
+from .postgres import (
+    PreparedStatements,
+    acquire_connection,
+    explain_analyze,
+    release_connection,
+    stream_count,
+)
+
+# Session-local table receiving large point-id sets from the graph side
+POINT_IDS_TEMP_TABLE = "hybrid_point_ids"
 
 
 class TimescaleEngine:
@@ -21,16 +34,19 @@ class TimescaleEngine:
 
     def __init__(self):
         self.conn = None
+        self.prepared: Optional[PreparedStatements] = None
 
     def connect(self) -> None:
-        """Establish database connection."""
-        self.conn = get_connection()
+        """Take a database connection from the shared pool."""
+        self.conn = acquire_connection()
+        self.prepared = PreparedStatements(self.conn)
 
     def close(self) -> None:
-        """Close database connection."""
+        """Return the database connection to the pool."""
         if self.conn:
-            self.conn.close()
+            release_connection(self.conn)
             self.conn = None
+            self.prepared = None
 
     def create_timeseries_schema(self) -> None:
         """Create only the timeseries table (no nodes/edges).
@@ -200,6 +216,114 @@ class TimescaleEngine:
         print(f"  [LOAD] Timeseries (TS): {total:,} rows in {elapsed:.1f}s ({rate:,.0f}/s) [parallel-copy]")
         return total
 
+    def load_timeseries_parquet_parallel(
+        self,
+        parquet_file: Path,
+        workers: Optional[int] = None,
+        split: Optional[str] = None,
+    ) -> int:
+        """Load timeseries from the host with parallel binary COPY into a hypertable.
+
+        Native replacement for timescaledb-parallel-copy that needs no CSV
+        mounted in the container: the hypertable and its chunks are created
+        first, each worker COPYs its slice of timeseries.parquet (by row group
+        or time range) on its own connection, and indexes are only built once
+        every worker is done.
+
+        Args:
+            parquet_file: Path to timeseries.parquet (nodes.parquet alongside)
+            workers: Parallel connections (default: env BTB_PG_BINARY_COPY_WORKERS)
+            split: "time" or "row_group" (default: env BTB_PG_BINARY_COPY_SPLIT or time)
+
+        Returns:
+            Total rows loaded
+        """
+        from .copy_binary import COPY_WORKERS, copy_parquet_binary, precreate_chunks
+
+        t0 = time.time()
+        split = split or os.getenv("BTB_PG_BINARY_COPY_SPLIT", "time")
+
+        with self.conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS timeseries CASCADE")
+            cur.execute("""
+                CREATE TABLE timeseries (
+                    time TIMESTAMPTZ NOT NULL,
+                    point_id TEXT NOT NULL,
+                    building_id TEXT,
+                    value REAL
+                )
+            """)
+            cur.execute("""
+                SELECT create_hypertable(
+                    'timeseries', 'time',
+                    chunk_time_interval => INTERVAL '1 day',
+                    create_default_indexes => FALSE
+                )
+            """)
+        self.conn.commit()
+
+        n_chunks = precreate_chunks(self.conn, parquet_file)
+        print(f"  [LOAD] Hypertable ready with {n_chunks} chunks")
+
+        total = copy_parquet_binary(
+            parquet_file,
+            parquet_file.parent / "nodes.parquet",
+            connect=acquire_connection,
+            release=release_connection,
+            workers=workers or COPY_WORKERS,
+            split=split,
+        )
+
+        print("  [LOAD] Creating indexes...")
+        t_idx = time.time()
+        self._create_ts_index()
+        print(f"  [LOAD] Indexes created in {time.time() - t_idx:.1f}s")
+
+        elapsed = time.time() - t0
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f"  [LOAD] Timeseries: {total:,} rows in {elapsed:.1f}s ({rate:,.0f}/s) [python parallel COPY]")
+        return total
+
+    def append_timeseries_from_parquet(
+        self,
+        parquet_file: Path,
+        since: Optional[datetime] = None,
+        upsert: bool = False,
+        workers: Optional[int] = None,
+    ) -> Dict:
+        """Ingest a new time range into the existing hypertable (no reload).
+
+        Append mode COPYs only rows newer than `since` (default: the current
+        max(time)); upsert mode replaces rows already present for the same
+        (point_id, time). Indexes stay in place and only the chunks of the
+        ingested range are re-analyzed.
+
+        Args:
+            parquet_file: timeseries.parquet covering the new days
+            since: Lower bound (exclusive) of the range to ingest
+            upsert: Replace existing (point_id, time) rows instead of skipping them
+            workers: Parallel connections (default: env BTB_PG_BINARY_COPY_WORKERS)
+
+        Returns:
+            Ingest stats (mode, rows, duration_s, rows_per_s, since, chunks_analyzed)
+        """
+        from .copy_binary import COPY_WORKERS, append_parquet_timeseries
+
+        stats = append_parquet_timeseries(
+            self.conn,
+            parquet_file,
+            connect=acquire_connection,
+            release=release_connection,
+            since=since,
+            upsert=upsert,
+            workers=workers or COPY_WORKERS,
+        )
+        print(
+            f"  [LOAD] Timeseries (TS) {stats['mode']}: {stats['rows']:,} rows in {stats['duration_s']:.1f}s "
+            f"({stats['rows_per_s']:,.0f}/s, {stats['chunks_analyzed']} chunks analyzed)"
+        )
+        return stats
+
     def execute_timeseries_query(self, query: str, point_ids: List[str] = None) -> Tuple[int, float]:
         """Execute a timeseries SQL query.
 
@@ -210,10 +334,11 @@ class TimescaleEngine:
         Returns:
             Tuple of (row_count, latency_ms)
         """
-        # Replace $POINT_IDS placeholder if point_ids provided
-        if point_ids and "$POINT_IDS" in query:
-            ids_str = ",".join(f"'{pid}'" for pid in point_ids)
-            query = query.replace("$POINT_IDS", ids_str)
+        # Replace $POINT_IDS placeholder with an ARRAY literal (for = ANY(...))
+        if point_ids is not None and "$POINT_IDS" in query:
+            with self.conn.cursor() as cur:
+                ids_array = cur.mogrify("%s::text[]", (list(point_ids),)).decode()
+            query = query.replace("$POINT_IDS", ids_array)
 
         t0 = time.perf_counter()
         try:
@@ -227,6 +352,136 @@ class TimescaleEngine:
             self.conn.rollback()
             raise e
 
-    def get_executor(self) -> Callable[[str], Tuple[int, float]]:
-        """Return query executor function."""
+    def _bind_point_ids(
+        self, cur, query: str, point_ids: Optional[List[str]], use_temp_table: bool
+    ) -> Tuple[str, Optional[tuple]]:
+        """Return (sql, args) for $POINT_IDS, loading the temp table if used."""
+        sql = strip_sql_comments(query)
+        args = None
+        if point_ids is not None and "$POINT_IDS" in sql:
+            if use_temp_table:
+                sql = sql.replace("= ANY($POINT_IDS)", f"IN (SELECT point_id FROM {POINT_IDS_TEMP_TABLE})")
+            else:
+                sql = sql.replace("%", "%%").replace("$POINT_IDS", "%s::text[]")
+                args = (list(point_ids),)
+        if use_temp_table and point_ids is not None:
+            cur.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {POINT_IDS_TEMP_TABLE} (point_id TEXT PRIMARY KEY)"
+            )
+            cur.execute(f"TRUNCATE {POINT_IDS_TEMP_TABLE}")
+            buf = io.StringIO("".join(f"{pid}\n" for pid in dict.fromkeys(point_ids)))
+            cur.copy_expert(f"COPY {POINT_IDS_TEMP_TABLE} (point_id) FROM STDIN", buf)
+            cur.execute(f"ANALYZE {POINT_IDS_TEMP_TABLE}")
+        return sql, args
+
+    def execute_point_ids_query(
+        self,
+        query: str,
+        point_ids: Optional[List[str]] = None,
+        use_temp_table: bool = False,
+    ) -> Tuple[list, float]:
+        """Execute a timeseries query fed with point ids from the graph side.
+
+        Small id sets are bound as a text[] parameter for `= ANY($POINT_IDS)`.
+        Large sets are COPYed into a session temp table and joined instead,
+        which keeps the statement small and gives the planner real row counts.
+        The temp-table load is part of the measured latency.
+
+        Args:
+            query: SQL with other $PARAMs already substituted
+            point_ids: Point ids for $POINT_IDS (None if the query has none)
+            use_temp_table: Ship ids through a temp table instead of an array
+
+        Returns:
+            Tuple of (rows as dicts, latency_ms)
+        """
+        t0 = time.perf_counter()
+        try:
+            with self.conn.cursor() as cur:
+                sql, args = self._bind_point_ids(cur, query, point_ids, use_temp_table)
+                cur.execute(sql, args)
+                rows = cur.fetchall()
+                self.conn.commit()
+                latency_ms = (time.perf_counter() - t0) * 1000
+                columns = [d[0] for d in cur.description] if cur.description else []
+            return [dict(zip(columns, row)) for row in rows], latency_ms
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+
+    def stream_point_ids_query(
+        self,
+        query: str,
+        point_ids: Optional[List[str]] = None,
+        use_temp_table: bool = False,
+    ) -> Tuple[int, float, float]:
+        """execute_point_ids_query in stream fetch mode (rows only counted).
+
+        Returns:
+            Tuple of (row_count, latency_ms, first_row_ms), both including
+            the temp-table load
+        """
+        t0 = time.perf_counter()
+        try:
+            with self.conn.cursor() as cur:
+                sql, args = self._bind_point_ids(cur, query, point_ids, use_temp_table)
+        except Exception:
+            self.conn.rollback()
+            raise
+        setup_ms = (time.perf_counter() - t0) * 1000
+        # Same transaction: the server-side cursor sees the temp table
+        row_count, _, first_row_ms = stream_count(self.conn, sql, args)
+        latency_ms = (time.perf_counter() - t0) * 1000
+        return row_count, latency_ms, setup_ms + first_row_ms
+
+    def prepare(self, name: str, query_template: str, params: Dict) -> float:
+        """PREPARE a $PARAM timeseries template once for this connection (returns ms)."""
+        return self.prepared.prepare(name, query_template, params)
+
+    def execute_prepared(self, name: str, params: Dict, point_ids: List[str] = None) -> Tuple[int, float]:
+        """EXECUTE a prepared timeseries statement.
+
+        Args:
+            name: Statement name given to prepare()
+            params: Parameter values
+            point_ids: Optional point id list bound as a text[] for $POINT_IDS
+
+        Returns:
+            Tuple of (row_count, latency_ms)
+        """
+        if point_ids is not None:
+            params = dict(params, point_ids=list(point_ids))
+        row_count, latency_ms, _ = self.prepared.execute(name, params)
+        return row_count, latency_ms
+
+    def explain_prepared(self, name: str, params: Dict, point_ids: List[str] = None) -> Dict[str, float]:
+        """Return planning/execution time (ms) of a prepared statement run."""
+        if point_ids is not None:
+            params = dict(params, point_ids=list(point_ids))
+        return self.prepared.explain(name, params)
+
+    def execute_query_streaming(self, query: str) -> Tuple[int, float, float]:
+        """Execute a query counting rows only, return (row_count, latency_ms, first_row_ms)."""
+        return stream_count(self.conn, query)
+
+    def explain_query(self, query: str, point_ids: Optional[List[str]] = None) -> Dict:
+        """Run a timeseries query under EXPLAIN ANALYZE.
+
+        point_ids are bound as a text[] for $POINT_IDS (the temp-table path
+        of execute_point_ids_query is not reproduced here).
+
+        Returns:
+            Dict with server_ms, planning_ms, execution_ms, buffers and plan
+        """
+        sql = strip_sql_comments(query)
+        args = None
+        if point_ids is not None and "$POINT_IDS" in sql:
+            sql = sql.replace("%", "%%").replace("$POINT_IDS", "%s::text[]")
+            args = (list(point_ids),)
+        return explain_analyze(self.conn, sql, args)
+
+    def get_executor(self, fetch: str = "full") -> Callable[[str], Tuple]:
+        """Return query executor function ("full" or "stream" fetch mode)."""
+        if fetch == "stream":
+            return self.execute_query_streaming
         return lambda q: self.execute_timeseries_query(q)
@@ -0,0 +1,531 @@
+"""Hybrid query execution for M2/O2 (graph selection -> TimescaleDB).
+
+In the hybrid architectures the graph engine (Memgraph or Oxigraph) resolves
+which points a question is about and TimescaleDB aggregates their series.
+HybridExecutor runs both halves for real and times each stage, so the
+measured latency is the end-to-end cost of the architecture rather than the
+graph half alone.
+
+Selection queries are read from queries/{m2,o2}/select/ when present (point
+id lists for Q7, Q10-Q13), otherwise from queries/{m2,o2}/graph/ (Q8/Q9
+already return point ids). The timeseries half comes from queries/{m2,o2}/ts/.
+
+In stream fetch mode (as --fetch stream for the other scenarios) graph rows
+are consumed off the stream instead of being materialized, the final stage
+only counts its rows, and the time to the first final row is recorded.
+
+Pipelined mode overlaps the two halves: graph rows are consumed as they
+stream in, point-id batches are sent to TimescaleDB on separate connections
+while the graph query is still running, and the per-batch partial results
+are merged at the end (see MERGE_SPECS).
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .params import substitute_params
+from .protocol import QUERY_TYPE
+
+
+# Scenario -> (query subdirectory, graph query extension)
+HYBRID_LAYOUT = {
+    "M2": ("m2", ".cypher"),
+    "O2": ("o2", ".sparql"),
+}
+
+# Above this many point ids, ship them through a temp table instead of an array
+TEMP_TABLE_THRESHOLD = int(os.getenv("BTB_HYBRID_TEMP_TABLE_THRESHOLD", "5000"))
+
+# Pipelined mode: on by default if BTB_HYBRID_PIPELINED=1
+PIPELINED = os.getenv("BTB_HYBRID_PIPELINED", "0") == "1"
+PIPELINE_BATCH_SIZE = int(os.getenv("BTB_HYBRID_PIPELINE_BATCH_SIZE", "1000"))
+PIPELINE_WORKERS = int(os.getenv("BTB_HYBRID_PIPELINE_WORKERS", "2"))
+
+# How to combine per-batch TimescaleDB results when point ids are split
+# across batches. Groups keyed by point_id never span batches and are simply
+# concatenated; other groups are merged column by column (sum, min, max, or
+# avg weighted by 'weight'). order_by/limit re-apply the query's ORDER BY/LIMIT.
+MERGE_SPECS = {
+    "Q7": {"group": ["point_id"], "order_by": ("coefficient_of_variation", True), "limit": 20},
+    "Q8": {
+        "group": [],
+        "sum": ["total_energy", "point_count", "sample_count"],
+        "avg": ["avg_power"],
+        "weight": "sample_count",
+    },
+    "Q9": {"group": ["point_id"]},
+    "Q10": {"group": ["point_id"], "order_by": ("event_count", True)},
+    "Q11": {"group": ["point_id"]},
+    "Q12": {
+        "group": ["day"],
+        "sum": ["active_points", "total_value", "sample_count"],
+        "avg": ["avg_value"],
+        "weight": "sample_count",
+        "order_by": ("day", True),
+    },
+    "Q13": {"group": ["office_hour", "point_id"], "order_by": ("point_id", False)},
+}
+
+
+@dataclass
+class HybridTiming:
+    """Stage timings of one hybrid query execution."""
+    total_ms: float = 0.0
+    graph_ms: float = 0.0
+    extract_ms: float = 0.0
+    ts_ms: float = 0.0  # pipelined: summed over batches (overlaps graph_ms)
+    n_point_ids: int = 0
+    rows: int = 0
+    ts_mode: str = "none"  # none, array, temp_table or pipelined
+    rows_data: Optional[list] = None  # final-stage rows (for validation; None when streamed)
+    first_row_ms: Optional[float] = None  # stream fetch: first final-stage row
+    # Pipelined mode: TimescaleDB wait after the graph stream ended, batch count
+    ts_tail_ms: float = 0.0
+    n_batches: int = 0
+
+    def stages(self) -> Dict[str, float]:
+        stages = {
+            "graph_ms": self.graph_ms,
+            "extract_ms": self.extract_ms,
+            "ts_ms": self.ts_ms,
+        }
+        if self.ts_mode == "pipelined":
+            stages["ts_tail_ms"] = self.ts_tail_ms
+        return stages
+
+
+def extract_point_ids(rows: List[Dict]) -> List[str]:
+    """Collect point ids from graph result rows (order kept, duplicates dropped).
+
+    Any column whose name contains 'point_id' is used: Cypher returns either
+    one id per row or a collected list, SPARQL GROUP_CONCAT returns a
+    comma-separated string.
+    """
+    ids: Dict[str, None] = {}
+    for row in rows:
+        for key, value in row.items():
+            if "point_id" not in key or value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                for v in value:
+                    if v is not None:
+                        ids[str(v)] = None
+            elif isinstance(value, str) and "," in value:
+                for v in value.split(","):
+                    if v.strip():
+                        ids[v.strip()] = None
+            elif value != "":
+                ids[str(value)] = None
+    return list(ids)
+
+
+def to_timeseries_params(params: Dict) -> Dict:
+    """Convert graph-side date params (Unix timestamps) to ISO for SQL."""
+    ts_params = dict(params)
+    for key in ("date_start", "date_end"):
+        value = ts_params.get(key)
+        if isinstance(value, (int, float)):
+            ts_params[key] = datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+    return ts_params
+
+
+def _merge_value(values: list, how: str, weights: Optional[list] = None):
+    present = [(v, w) for v, w in zip(values, weights or [1] * len(values)) if v is not None]
+    if not present:
+        return None
+    if how == "sum":
+        return sum(v for v, _ in present)
+    if how == "min":
+        return min(v for v, _ in present)
+    if how == "max":
+        return max(v for v, _ in present)
+    # Weighted average
+    total_w = sum(w or 0 for _, w in present)
+    if not total_w:
+        return None
+    return sum(v * (w or 0) for v, w in present) / total_w
+
+
+def merge_partial_results(query_id: str, partials: List[List[Dict]]) -> List[Dict]:
+    """Merge per-batch TimescaleDB results into the result of a single query.
+
+    Args:
+        query_id: Q7-Q13 (see MERGE_SPECS)
+        partials: One row list (dicts) per point-id batch
+
+    Returns:
+        Merged rows
+    """
+    spec = MERGE_SPECS.get(query_id, {"group": ["point_id"]})
+    group_cols = spec["group"]
+    rows: List[Dict] = []
+
+    if "point_id" in group_cols:
+        for part in partials:
+            rows.extend(part)
+    else:
+        groups: Dict[tuple, List[Dict]] = {}
+        for part in partials:
+            for row in part:
+                groups.setdefault(tuple(row.get(c) for c in group_cols), []).append(row)
+
+        weight_col = spec.get("weight")
+        for key, members in groups.items():
+            merged = dict(members[0])
+            weights = [m.get(weight_col) for m in members] if weight_col else None
+            for how in ("sum", "min", "max"):
+                for col in spec.get(how, []):
+                    merged[col] = _merge_value([m.get(col) for m in members], how)
+            for col in spec.get("avg", []):
+                merged[col] = _merge_value([m.get(col) for m in members], "avg", weights)
+            rows.append(merged)
+
+    order_by = spec.get("order_by")
+    if order_by:
+        col, descending = order_by
+        # PostgreSQL default: NULLs sort as larger than any value
+        non_null = sorted((r for r in rows if r.get(col) is not None), key=lambda r: r[col], reverse=descending)
+        nulls = [r for r in rows if r.get(col) is None]
+        rows = nulls + non_null if descending else non_null + nulls
+    if spec.get("limit"):
+        rows = rows[:spec["limit"]]
+    return rows
+
+
+def _default_queries_dir() -> Path:
+    # runner/hybrid.py -> parents: runner(0), basetype_benchmark(1), src(2), repo_root(3)
+    return Path(__file__).resolve().parents[3] / "queries"
+
+
+class HybridExecutor:
+    """Runs M2/O2 queries across the graph engine and TimescaleDB.
+
+    Usage:
+        hybrid = HybridExecutor("M2", graph_engine, ts_engine)
+        timing = hybrid.execute("Q8", params)
+    """
+
+    def __init__(
+        self,
+        scenario: str,
+        graph_engine,
+        ts_engine,
+        queries_dir: Optional[Path] = None,
+        temp_table_threshold: int = TEMP_TABLE_THRESHOLD,
+        pipelined: bool = PIPELINED,
+        batch_size: int = PIPELINE_BATCH_SIZE,
+        pipeline_workers: int = PIPELINE_WORKERS,
+        ts_engine_factory: Optional[Callable[[], object]] = None,
+        fetch: str = "full",
+    ):
+        """Initialize executor with already connected engines.
+
+        Args:
+            scenario: M2 or O2
+            graph_engine: MemgraphEngine or OxigraphEngine
+            ts_engine: TimescaleEngine
+            queries_dir: Root of query files (default: repo queries/)
+            temp_table_threshold: Point-id count above which a temp table is used
+            pipelined: Overlap graph streaming with batched TimescaleDB fetches
+            batch_size: Point ids per TimescaleDB batch (pipelined mode)
+            pipeline_workers: TimescaleDB connections used for batches
+            ts_engine_factory: Creates batch connections (default: TimescaleEngine)
+            fetch: "full" materializes rows, "stream" only counts them and
+                records the time to first row (not with pipelined)
+        """
+        self.scenario = scenario.upper()
+        if self.scenario not in HYBRID_LAYOUT:
+            raise ValueError(f"Not a hybrid scenario: {scenario}")
+        if pipelined and fetch == "stream":
+            raise ValueError("Pipelined hybrid mode merges batch rows and cannot run with fetch='stream'")
+
+        self.graph_engine = graph_engine
+        self.ts_engine = ts_engine
+        self.queries_dir = Path(queries_dir) if queries_dir else _default_queries_dir()
+        self.temp_table_threshold = temp_table_threshold
+        self.pipelined = pipelined
+        self.batch_size = batch_size
+        self.pipeline_workers = pipeline_workers
+        self.ts_engine_factory = ts_engine_factory
+        self.fetch = fetch
+        self._templates: Dict[tuple, Optional[str]] = {}
+
+        # Pipelined mode: thread pool with one TimescaleDB connection per thread
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._batch_engines: List = []
+        self._batch_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the TimescaleDB connection(s) owned by the executor."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        for engine in self._batch_engines:
+            engine.close()
+        self._batch_engines = []
+        self.ts_engine.close()
+
+    def _find_template(self, subdir: str, query_id: str, ext: str) -> Optional[str]:
+        key = (subdir, query_id)
+        if key not in self._templates:
+            base, _ = HYBRID_LAYOUT[self.scenario]
+            matches = sorted((self.queries_dir / base / subdir).glob(f"{query_id}_*{ext}"))
+            self._templates[key] = matches[0].read_text(encoding="utf-8") if matches else None
+        return self._templates[key]
+
+    def graph_template(self, query_id: str) -> Optional[str]:
+        """Point-selection query (select/ first, then graph/)."""
+        _, ext = HYBRID_LAYOUT[self.scenario]
+        return self._find_template("select", query_id, ext) or self._find_template("graph", query_id, ext)
+
+    def ts_template(self, query_id: str) -> Optional[str]:
+        """Timeseries half of the query (None for graph-only queries)."""
+        return self._find_template("ts", query_id, ".sql")
+
+    def query_type(self, query_id: str) -> str:
+        qtype = QUERY_TYPE.get(query_id, "graph_only")
+        if qtype != "graph_only" and self.ts_template(query_id) is None:
+            return "graph_only"
+        return qtype
+
+    def execute(self, query_id: str, params: Dict, fetch: Optional[str] = None) -> HybridTiming:
+        """Execute one query end-to-end.
+
+        graph_only: graph query only. ts_direct: TimescaleDB only (the point
+        id is a parameter). hybrid: graph selection -> point ids -> TimescaleDB,
+        serially or pipelined. fetch overrides the executor's fetch mode.
+        """
+        fetch = fetch or self.fetch
+        timing = HybridTiming()
+        qtype = self.query_type(query_id)
+        if fetch == "stream":
+            if qtype == "hybrid" and self.pipelined:
+                raise ValueError("Pipelined hybrid mode merges batch rows and cannot run with fetch='stream'")
+            return self._execute_streaming(query_id, params, qtype)
+        if qtype == "hybrid" and self.pipelined:
+            return self._execute_pipelined(query_id, params)
+        t0 = time.perf_counter()
+
+        if qtype == "graph_only":
+            rows, timing.graph_ms = self.graph_engine.execute_query_with_results(
+                substitute_params(self.graph_template(query_id), params)
+            )
+
+        elif qtype == "ts_direct":
+            ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+            rows, timing.ts_ms = self.ts_engine.execute_point_ids_query(ts_query)
+
+        else:
+            graph_rows, timing.graph_ms = self.graph_engine.execute_query_with_results(
+                substitute_params(self.graph_template(query_id), params)
+            )
+
+            t_extract = time.perf_counter()
+            point_ids = extract_point_ids(graph_rows)
+            timing.extract_ms = (time.perf_counter() - t_extract) * 1000
+            timing.n_point_ids = len(point_ids)
+
+            use_temp_table = len(point_ids) > self.temp_table_threshold
+            timing.ts_mode = "temp_table" if use_temp_table else "array"
+            ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+            rows, timing.ts_ms = self.ts_engine.execute_point_ids_query(
+                ts_query, point_ids, use_temp_table=use_temp_table
+            )
+
+        timing.rows = len(rows)
+        timing.rows_data = rows
+        timing.total_ms = (time.perf_counter() - t0) * 1000
+        return timing
+
+    def _execute_streaming(self, query_id: str, params: Dict, qtype: str) -> HybridTiming:
+        """execute() in stream fetch mode: rows are counted, not materialized."""
+        timing = HybridTiming()
+        t0 = time.perf_counter()
+
+        if qtype == "graph_only":
+            timing.rows, timing.graph_ms, timing.first_row_ms = self.graph_engine.execute_query_streaming(
+                substitute_params(self.graph_template(query_id), params)
+            )
+
+        elif qtype == "ts_direct":
+            ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+            timing.rows, timing.ts_ms, timing.first_row_ms = self.ts_engine.stream_point_ids_query(ts_query)
+
+        else:
+            # Point ids are taken off the graph stream row by row
+            graph_query = substitute_params(self.graph_template(query_id), params)
+            seen: Dict[str, None] = {}
+            extract_s = 0.0
+            for row in self.graph_engine.stream_query(graph_query):
+                t_extract = time.perf_counter()
+                for pid in extract_point_ids([row]):
+                    seen[pid] = None
+                extract_s += time.perf_counter() - t_extract
+            t_ts = time.perf_counter()
+            timing.graph_ms = (t_ts - t0 - extract_s) * 1000
+            timing.extract_ms = extract_s * 1000
+            point_ids = list(seen)
+            timing.n_point_ids = len(point_ids)
+
+            use_temp_table = len(point_ids) > self.temp_table_threshold
+            timing.ts_mode = "temp_table" if use_temp_table else "array"
+            ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+            timing.rows, timing.ts_ms, ts_first_ms = self.ts_engine.stream_point_ids_query(
+                ts_query, point_ids, use_temp_table=use_temp_table
+            )
+            timing.first_row_ms = (t_ts - t0) * 1000 + ts_first_ms
+
+        timing.total_ms = (time.perf_counter() - t0) * 1000
+        return timing
+
+    def explain(self, query_id: str, params: Dict) -> Dict[str, Dict]:
+        """Server-side timings of one query, per engine.
+
+        Returns a dict keyed by "graph" and/or "ts" holding each engine's
+        explain_query() output. Engines without an explain_query() (Oxigraph)
+        are left out; for hybrid queries the graph half is still executed to
+        obtain the point ids fed to the TimescaleDB EXPLAIN.
+        """
+        qtype = self.query_type(query_id)
+        profiles: Dict[str, Dict] = {}
+        graph_explain = getattr(self.graph_engine, "explain_query", None)
+
+        if qtype in ("graph_only", "hybrid"):
+            graph_query = substitute_params(self.graph_template(query_id), params)
+            if graph_explain is not None:
+                profiles["graph"] = graph_explain(graph_query)
+
+        if qtype == "ts_direct":
+            ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+            profiles["ts"] = self.ts_engine.explain_query(ts_query)
+        elif qtype == "hybrid":
+            graph_rows, _ = self.graph_engine.execute_query_with_results(graph_query)
+            ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+            profiles["ts"] = self.ts_engine.explain_query(ts_query, extract_point_ids(graph_rows))
+
+        return profiles
+
+    # ------------------------------------------------------------------
+    # Pipelined execution
+    # ------------------------------------------------------------------
+
+    def _batch_engine(self):
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            if self.ts_engine_factory is not None:
+                engine = self.ts_engine_factory()
+            else:
+                from .engines.timescale import TimescaleEngine
+                engine = TimescaleEngine()
+            engine.connect()
+            self._local.engine = engine
+            with self._batch_lock:
+                self._batch_engines.append(engine)
+        return engine
+
+    def _run_batch(self, ts_query: str, point_ids: List[str]) -> tuple:
+        use_temp_table = len(point_ids) > self.temp_table_threshold
+        return self._batch_engine().execute_point_ids_query(ts_query, point_ids, use_temp_table=use_temp_table)
+
+    def _execute_pipelined(self, query_id: str, params: Dict) -> HybridTiming:
+        """Stream graph rows and fetch timeseries per point-id batch concurrently."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.pipeline_workers, thread_name_prefix="hybrid-ts")
+
+        timing = HybridTiming(ts_mode="pipelined")
+        ts_query = substitute_params(self.ts_template(query_id), to_timeseries_params(params))
+        graph_query = substitute_params(self.graph_template(query_id), params)
+
+        t0 = time.perf_counter()
+        futures = []
+        seen: Dict[str, None] = {}
+        batch: List[str] = []
+        extract_s = 0.0
+
+        for row in self.graph_engine.stream_query(graph_query):
+            t_extract = time.perf_counter()
+            for pid in extract_point_ids([row]):
+                if pid not in seen:
+                    seen[pid] = None
+                    batch.append(pid)
+            extract_s += time.perf_counter() - t_extract
+            if len(batch) >= self.batch_size:
+                futures.append(self._pool.submit(self._run_batch, ts_query, batch))
+                batch = []
+
+        # Last (or only) batch; an empty id set still runs once so that
+        # global aggregates (Q8) keep their single-row shape
+        if batch or not futures:
+            futures.append(self._pool.submit(self._run_batch, ts_query, batch))
+        t_graph_end = time.perf_counter()
+
+        partials = []
+        for future in futures:
+            rows, batch_ms = future.result()
+            partials.append(rows)
+            timing.ts_ms += batch_ms
+        t_ts_end = time.perf_counter()
+
+        rows = merge_partial_results(query_id, partials)
+        timing.total_ms = (time.perf_counter() - t0) * 1000
+        timing.graph_ms = (t_graph_end - t0 - extract_s) * 1000
+        timing.extract_ms = extract_s * 1000
+        timing.ts_tail_ms = (t_ts_end - t_graph_end) * 1000
+        timing.n_batches = len(futures)
+        timing.n_point_ids = len(seen)
+        timing.rows = len(rows)
+        timing.rows_data = rows
+        return timing
+
+
+class HybridClient:
+    """Engine-like wrapper so workload clients run M2/O2 queries end-to-end.
+
+    Each client owns its graph and TimescaleDB connections. Executor inputs
+    are (query_id, params) pairs instead of query texts.
+    """
+
+    def __init__(self, scenario: str, graph_engine_factory: Callable[[], object], queries_dir: Optional[Path] = None):
+        self.scenario = scenario.upper()
+        self.graph_engine_factory = graph_engine_factory
+        self.queries_dir = queries_dir
+        self.graph_engine = None
+        self.hybrid: Optional[HybridExecutor] = None
+
+    def connect(self) -> None:
+        from .engines.timescale import TimescaleEngine
+
+        self.graph_engine = self.graph_engine_factory()
+        self.graph_engine.connect()
+        ts_engine = TimescaleEngine()
+        try:
+            ts_engine.connect()
+        except Exception:
+            self.graph_engine.close()
+            raise
+        self.hybrid = HybridExecutor(self.scenario, self.graph_engine, ts_engine, queries_dir=self.queries_dir)
+
+    def close(self) -> None:
+        if self.hybrid is not None:
+            self.hybrid.close()
+            self.hybrid = None
+        if self.graph_engine is not None:
+            self.graph_engine.close()
+            self.graph_engine = None
+
+    def get_executor(self, fetch: str = "full") -> Callable[[tuple], tuple]:
+        """Executor of (query_id, params); stream mode also returns first_row_ms."""
+        def run(query: tuple) -> tuple:
+            timing = self.hybrid.execute(*query, fetch=fetch)
+            if fetch == "stream":
+                return timing.rows, timing.total_ms, timing.first_row_ms
+            return timing.rows, timing.total_ms
+
+        return run
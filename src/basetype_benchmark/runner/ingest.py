@@ -0,0 +1,344 @@
+"""Streaming ingest with concurrent readers.
+
+All other runs query a frozen store. Here a writer replays BMS samples from
+timeseries.parquet as if they were arriving live, speeded up by a real-time
+multiple (1000x = one simulated hour every 3.6 s), while reader clients run
+the dashboard timeseries queries (Q6/Q7/Q13). The same readers are first
+measured against the idle store, so lock, chunk-creation and compaction
+interference shows up as read latency degradation.
+
+Replayed samples are shifted to the days following the latest data already
+loaded, the way a production twin keeps appending to its history:
+
+- TimescaleDB (P1/P2/M2/O2): one binary COPY per flush into the hypertable
+- Memgraph (M1): samples appended to the ArchiveDay arrays of their day
+"""
+
+import io
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .engines.copy_binary import (
+    COPY_HEADER,
+    COPY_TRAILER,
+    encode_batch,
+    load_building_map,
+    row_group_time_ranges,
+)
+from .results import StreamingIngestResult
+from .workload import MAX_ERROR_SAMPLES, run_closed_loop
+
+
+# Default real-time multiple of the replay and number of reader clients
+DEFAULT_SPEEDUP = 1000.0
+DEFAULT_STREAM_READERS = 4
+
+# Wall-clock interval between two writes (everything due is sent at once)
+FLUSH_INTERVAL_S = float(os.getenv("BTB_INGEST_FLUSH_S", "1.0"))
+
+# Reader mix: recent point series and aggregates, what live dashboards poll
+STREAM_READ_WEIGHTS = {"Q6": 2.0, "Q7": 2.0, "Q13": 1.0}
+
+_US_PER_DAY = 86_400_000_000
+
+
+def _utc_date(value) -> date:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date()
+    return value
+
+
+def load_replay_samples(parquet_file: Path, sim_seconds: float, start_day: Optional[date] = None) -> pa.Table:
+    """Read the first sim_seconds of samples, sorted by time, for replay.
+
+    Args:
+        parquet_file: timeseries.parquet of the loaded dataset
+        sim_seconds: Simulated time span to replay
+        start_day: First day to replay into (default: day after the dataset);
+            samples keep their time of day and are shifted by whole days
+
+    Returns:
+        Table (timestamp[us], point_id, value) in time order
+    """
+    ranges = row_group_time_ranges(parquet_file)
+    if not ranges:
+        return pa.table({"timestamp": pa.array([], pa.timestamp("us")), "point_id": [], "value": []})
+    t_min = min(r[2] for r in ranges)
+    t_end = t_min + timedelta(seconds=sim_seconds)
+
+    row_groups = [rg for rg, _, rg_min, _ in ranges if rg_min < t_end]
+    table = pq.ParquetFile(parquet_file).read_row_groups(row_groups, columns=["timestamp", "point_id", "value"])
+    ts_us = pc.cast(pc.cast(table.column("timestamp"), pa.timestamp("us"), safe=False), pa.int64())
+    t_min_us = pc.min(ts_us).as_py()
+    keep = pc.less(ts_us, t_min_us + int(sim_seconds * 1_000_000))
+    table = table.filter(keep)
+    ts_us = ts_us.filter(keep)
+
+    order = pc.sort_indices(ts_us)
+    table = table.take(order)
+    ts_us = ts_us.take(order).to_numpy()
+
+    if start_day is None:
+        start_day = _utc_date(max(r[3] for r in ranges)) + timedelta(days=1)
+    shift_days = start_day.toordinal() - _utc_date(t_min).toordinal()
+    shifted = pa.array(ts_us + shift_days * _US_PER_DAY, pa.int64()).cast(pa.timestamp("us"))
+    return pa.table({
+        "timestamp": shifted,
+        "point_id": table.column("point_id"),
+        "value": table.column("value"),
+    })
+
+
+class TimescaleWriter:
+    """Appends replayed samples to the timeseries hypertable with binary COPY."""
+
+    target = "timescaledb"
+
+    def __init__(self, nodes_parquet: Optional[Path] = None, table: str = "timeseries"):
+        self.nodes_parquet = nodes_parquet
+        self.table = table
+        self.conn = None
+        self._building_map: Dict[str, str] = {}
+        self._id_cache: Dict[str, bytes] = {}
+
+    def connect(self) -> None:
+        from .engines.postgres import acquire_connection
+
+        self.conn = acquire_connection()
+        if self.nodes_parquet is not None and self.nodes_parquet.exists():
+            self._building_map = load_building_map(self.nodes_parquet)
+
+    def close(self) -> None:
+        from .engines.postgres import release_connection
+
+        if self.conn is not None:
+            release_connection(self.conn)
+            self.conn = None
+
+    def latest_day(self) -> Optional[date]:
+        """Day of the newest stored sample."""
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT max(time) FROM {self.table}")
+            latest = cur.fetchone()[0]
+        self.conn.commit()
+        return _utc_date(latest) if latest is not None else None
+
+    def write(self, batch: pa.Table) -> None:
+        rows = encode_batch(batch.combine_chunks().to_batches()[0], self._building_map, self._id_cache)
+        payload = io.BytesIO(COPY_HEADER + rows.tobytes() + COPY_TRAILER)
+        try:
+            with self.conn.cursor() as cur:
+                cur.copy_expert(
+                    f"COPY {self.table} (time, point_id, building_id, value) FROM STDIN (FORMAT binary)", payload
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+
+class ArchiveDayWriter:
+    """Appends replayed samples to the M1 ArchiveDay arrays of their day."""
+
+    target = "memgraph"
+
+    APPEND_QUERY = (
+        "UNWIND $batch AS row "
+        "MATCH (p:Node {id: row.point_id}) "
+        "MERGE (a:ArchiveDay {point_id: row.point_id, day: row.day}) "
+        "ON CREATE SET a.timestamps = [], a.values = [] "
+        "SET a.timestamps = a.timestamps + row.timestamps, a.values = a.values + row.values "
+        "MERGE (p)-[:HAS_TIMESERIES]->(a)"
+    )
+
+    def __init__(self, uri: str = "bolt://localhost:7688"):
+        self.uri = uri
+        self.driver = None
+        self._session = None
+
+    def connect(self) -> None:
+        from .pool import get_bolt_driver
+
+        self.driver = get_bolt_driver(self.uri)
+        self._session = self.driver.session()
+        try:
+            self._session.run("CREATE INDEX ON :ArchiveDay(point_id)").consume()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        self.driver = None
+
+    def latest_day(self) -> Optional[date]:
+        record = self._session.run("MATCH (a:ArchiveDay) RETURN max(a.day) AS day").single()
+        day = record["day"] if record else None
+        return date.fromisoformat(day) if day else None
+
+    def write(self, batch: pa.Table) -> None:
+        ts_s = pc.cast(batch.column("timestamp"), pa.int64()).to_numpy() // 1_000_000
+        day_idx = ts_s // 86_400
+        values = batch.column("value").to_numpy(zero_copy_only=False)
+        point_ids = batch.column("point_id").to_pylist()
+
+        rows: Dict[tuple, Dict] = {}
+        day_names: Dict[int, str] = {}
+        for pid, day, t, v in zip(point_ids, day_idx.tolist(), ts_s.tolist(), values.tolist()):
+            name = day_names.get(day)
+            if name is None:
+                name = (date(1970, 1, 1) + timedelta(days=day)).isoformat()
+                day_names[day] = name
+            row = rows.get((pid, name))
+            if row is None:
+                row = {"point_id": pid, "day": name, "timestamps": [], "values": []}
+                rows[(pid, name)] = row
+            row["timestamps"].append(t)
+            row["values"].append(v)
+        self._session.run(self.APPEND_QUERY, batch=list(rows.values())).consume()
+
+
+def replay_samples(
+    writer,
+    samples: pa.Table,
+    speedup: float,
+    duration_s: float,
+    stop: Optional[threading.Event] = None,
+    flush_interval_s: float = FLUSH_INTERVAL_S,
+) -> Dict:
+    """Write samples as they fall due at speedup x real time.
+
+    Every flush_interval_s, all samples whose (scaled) time has passed are
+    written in one call. A writer that cannot keep up falls behind; the
+    largest backlog is reported as max_lag_s (wall-clock seconds).
+
+    Returns:
+        Dict with rows, offered_rows, duration_s, write_latencies_ms,
+        max_lag_s, errors, error_samples
+    """
+    ts_us = pc.cast(samples.column("timestamp"), pa.int64()).to_numpy()
+    n = len(ts_us)
+    stats = {
+        "rows": 0,
+        "offered_rows": 0,
+        "duration_s": 0.0,
+        "write_latencies_ms": [],
+        "max_lag_s": 0.0,
+        "errors": 0,
+        "error_samples": [],
+    }
+    if n == 0:
+        return stats
+
+    sim_start = int(ts_us[0])
+    t0 = time.perf_counter()
+    pos = 0
+    next_flush = t0
+    while pos < n and not (stop is not None and stop.is_set()):
+        now = time.perf_counter()
+        if now - t0 >= duration_s:
+            break
+        due = int(np.searchsorted(ts_us, sim_start + int((now - t0) * speedup * 1_000_000), side="right"))
+        if due > pos:
+            first = pos
+            t_write = time.perf_counter()
+            try:
+                writer.write(samples.slice(pos, due - pos))
+                stats["write_latencies_ms"].append((time.perf_counter() - t_write) * 1000)
+                stats["rows"] += due - pos
+            except Exception as e:
+                stats["errors"] += 1
+                if len(stats["error_samples"]) < MAX_ERROR_SAMPLES:
+                    stats["error_samples"].append(str(e))
+            pos = due
+            # Backlog: how long ago the oldest sample of this flush fell due
+            lag = (time.perf_counter() - t0) - (ts_us[first] - sim_start) / 1_000_000 / speedup
+            stats["max_lag_s"] = max(stats["max_lag_s"], lag)
+
+        next_flush += flush_interval_s
+        delay = next_flush - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    elapsed = time.perf_counter() - t0
+    stats["duration_s"] = elapsed
+    stats["offered_rows"] = int(np.searchsorted(ts_us, sim_start + int(elapsed * speedup * 1_000_000), side="right"))
+    return stats
+
+
+def run_streaming_ingest(
+    writer,
+    samples: pa.Table,
+    reader_factory: Callable[[], object],
+    queries: Dict[str, List],
+    n_readers: int = DEFAULT_STREAM_READERS,
+    duration_s: float = 30.0,
+    speedup: float = DEFAULT_SPEEDUP,
+    warmup_s: float = 5.0,
+    seed: int = 42,
+) -> StreamingIngestResult:
+    """Measure readers on the idle store, then again while the writer replays.
+
+    Args:
+        writer: Connected TimescaleWriter or ArchiveDayWriter
+        samples: Replay table from load_replay_samples
+        reader_factory: Returns a new (unconnected) engine for a reader
+        queries: query_id -> executor inputs (one per parameter variant)
+        n_readers: Concurrent reader clients
+        duration_s: Measurement window of each phase
+        speedup: Real-time multiple of the replay
+        warmup_s: Unmeasured ramp-up of each phase (the writer already runs)
+
+    Returns:
+        StreamingIngestResult
+    """
+    result = StreamingIngestResult(target=writer.target, speedup=speedup, n_readers=n_readers)
+
+    result.idle = run_closed_loop(
+        reader_factory, queries, n_readers, duration_s, weights=STREAM_READ_WEIGHTS, warmup_s=warmup_s, seed=seed
+    )
+    print(f"  [IDLE] qps={result.idle.qps:.1f}, p95={result.idle.p95_ms:.1f}ms")
+
+    stop = threading.Event()
+    write_stats: Dict = {}
+    writer_thread = threading.Thread(
+        target=lambda: write_stats.update(replay_samples(writer, samples, speedup, warmup_s + duration_s, stop)),
+        name="ingest-writer",
+        daemon=True,
+    )
+    writer_thread.start()
+    try:
+        result.loaded = run_closed_loop(
+            reader_factory, queries, n_readers, duration_s, weights=STREAM_READ_WEIGHTS, warmup_s=warmup_s, seed=seed
+        )
+    finally:
+        stop.set()
+        writer_thread.join()
+
+    result.rows = write_stats.get("rows", 0)
+    result.offered_rows = write_stats.get("offered_rows", 0)
+    result.duration_s = write_stats.get("duration_s", 0.0)
+    result.write_latencies_ms = write_stats.get("write_latencies_ms", [])
+    result.max_lag_s = write_stats.get("max_lag_s", 0.0)
+    result.write_errors = write_stats.get("errors", 0)
+    result.error_samples = write_stats.get("error_samples", [])
+
+    print(
+        f"  [INGEST] {result.rows:,} rows in {result.duration_s:.1f}s ({result.rows_per_s:,.0f}/s, "
+        f"offered {result.offered_rows_per_s:,.0f}/s), write p95={result.write_p95_ms:.1f}ms, "
+        f"max lag={result.max_lag_s:.1f}s"
+    )
+    print(f"  [LOADED] qps={result.loaded.qps:.1f}, p95={result.loaded.p95_ms:.1f}ms")
+    return result
@@ -0,0 +1,208 @@
+"""Fast N-Triples ingestion paths for Oxigraph.
+
+A single POST of graph.nt is parsed on one server thread. Two faster paths:
+
+- parallel: the file is cut on line boundaries (N-Triples has one triple per
+  line, so any line-aligned slice is a valid document) and the slices are
+  POSTed concurrently to /store?default over the shared keep-alive pool
+- bulk: the server is stopped and the image's offline loader
+  (`oxigraph load --lenient`) writes straight into the store volume; it parses
+  one input file per thread, so the input is first split into part files
+
+Kept free of engine imports so that loaders/oxigraph can use it with only
+requests installed.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from . import docker
+from .pool import get_http_session
+
+
+# Concurrent POSTs in parallel mode
+POST_WORKERS = int(os.getenv("BTB_OXIGRAPH_POST_WORKERS", "4"))
+
+# Size of each line-aligned slice in parallel mode
+POST_CHUNK_BYTES = int(float(os.getenv("BTB_OXIGRAPH_POST_CHUNK_MB", "16")) * 1024 * 1024)
+
+# Part files handed to the offline loader (one parser thread each)
+BULK_PARTS = int(os.getenv("BTB_OXIGRAPH_BULK_PARTS", str(os.cpu_count() or 4)))
+
+# Store directory inside the Oxigraph container (see docker-compose.yml)
+STORE_LOCATION = "/data"
+
+_NT_HEADERS = {"Content-Type": "application/n-triples"}
+
+
+def iter_line_chunks(path: Path, chunk_bytes: int = POST_CHUNK_BYTES) -> Iterator[bytes]:
+    """Yield consecutive slices of a file, each ending on a newline."""
+    with open(path, "rb") as f:
+        carry = b""
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                break
+            data = carry + data
+            cut = data.rfind(b"\n")
+            if cut == -1:
+                carry = data
+                continue
+            carry = data[cut + 1:]
+            yield data[:cut + 1]
+        if carry:
+            yield carry
+
+
+def post_ntriples_parallel(
+    base_url: str,
+    nt_file: Path,
+    workers: int = POST_WORKERS,
+    chunk_bytes: int = POST_CHUNK_BYTES,
+    timeout: int = 600,
+) -> Dict:
+    """POST line-aligned slices of an N-Triples file concurrently.
+
+    At most 2 * workers slices are held in memory at a time.
+
+    Returns:
+        Dict with bytes, chunks and duration_s
+    """
+    def _post(payload: bytes) -> int:
+        # Sessions are per thread; the keep-alive connections are shared
+        resp = get_http_session(base_url).post(f"{base_url}/store?default", data=payload, headers=_NT_HEADERS, timeout=timeout)
+        if resp.status_code not in (200, 201, 204):
+            raise RuntimeError(f"Failed to load N-Triples: HTTP {resp.status_code} - {resp.text[:500]}")
+        return len(payload)
+
+    t0 = time.perf_counter()
+    total_bytes = 0
+    chunks = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = set()
+        for payload in iter_line_chunks(nt_file, chunk_bytes):
+            pending.add(pool.submit(_post, payload))
+            if len(pending) >= 2 * workers:
+                done = next(as_completed(pending))
+                pending.remove(done)
+                total_bytes += done.result()
+                chunks += 1
+        for future in as_completed(pending):
+            total_bytes += future.result()
+            chunks += 1
+
+    return {"bytes": total_bytes, "chunks": chunks, "duration_s": time.perf_counter() - t0}
+
+
+def split_ntriples(nt_files: Sequence[Path], out_dir: Path, parts: int) -> List[Path]:
+    """Split N-Triples files into about `parts` line-aligned part files.
+
+    Data is copied in slices of POST_CHUNK_BYTES; a part ends at the first
+    newline once it reaches its share of the input, so memory stays at one
+    slice whatever the part size.
+    """
+    total = sum(p.stat().st_size for p in nt_files)
+    part_bytes = max(1, total // max(1, parts) + 1)
+    out: List[Path] = []
+    for nt_file in nt_files:
+        dst = None
+        written = 0
+        try:
+            with open(nt_file, "rb") as src:
+                while True:
+                    data = src.read(POST_CHUNK_BYTES)
+                    if not data:
+                        break
+                    view = memoryview(data)
+                    pos = 0
+                    while pos < len(data):
+                        if dst is None:
+                            out.append(out_dir / f"part_{len(out):04d}.nt")
+                            dst = open(out[-1], "wb")
+                            written = 0
+                        # Past the threshold, cut after the first newline
+                        end = len(data)
+                        switch = False
+                        if written + end - pos >= part_bytes:
+                            nl = data.find(b"\n", pos + max(0, part_bytes - written - 1))
+                            if nl != -1:
+                                end = nl + 1
+                                switch = True
+                        dst.write(view[pos:end])
+                        written += end - pos
+                        pos = end
+                        if switch:
+                            dst.close()
+                            dst = None
+        finally:
+            if dst is not None:
+                dst.close()
+    return out
+
+
+def bulk_load_offline(
+    nt_files: Sequence[Path],
+    container: str,
+    parts: int = BULK_PARTS,
+    lenient: bool = True,
+    work_dir: Optional[Path] = None,
+) -> Dict:
+    """Load N-Triples with `oxigraph load` while the server container is stopped.
+
+    The container is restarted afterwards even if loading fails; callers
+    should wait for the HTTP endpoint again before querying.
+
+    Args:
+        nt_files: Input files (loaded into the default graph)
+        container: Oxigraph server container (its /data volume is reused)
+        parts: Part files to split the input into (parser threads)
+        lenient: Skip invalid triples instead of aborting
+        work_dir: Where to write part files (default: next to the first input)
+
+    Returns:
+        Dict with bytes, parts and duration_s
+    """
+    volume = docker.container_mount_source(container, STORE_LOCATION)
+    image = docker.container_image(container)
+    if not volume or not image:
+        raise RuntimeError(f"Cannot resolve image/volume of container {container}")
+
+    # Part files must be visible to the loader container, so keep them on disk
+    base = Path(work_dir or Path(nt_files[0]).parent)
+    tmp = Path(tempfile.mkdtemp(prefix="oxigraph_bulk_", dir=base))
+    t0 = time.perf_counter()
+    try:
+        part_files = split_ntriples(nt_files, tmp, parts)
+        cmd = [
+            "docker", "run", "--rm",
+            "-v", f"{volume}:{STORE_LOCATION}",
+            "-v", f"{tmp.resolve()}:/import:ro",
+            image, "load", "--location", STORE_LOCATION,
+        ]
+        for part in part_files:
+            cmd += ["--file", f"/import/{part.name}"]
+        if lenient:
+            cmd.append("--lenient")
+
+        if not docker.stop_container(container):
+            raise RuntimeError(f"Failed to stop {container}")
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        finally:
+            docker.start_container(container)
+        if result.returncode != 0:
+            raise RuntimeError(f"oxigraph load failed: {(result.stderr or result.stdout).strip()[-500:]}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        "bytes": sum(p.stat().st_size for p in nt_files),
+        "parts": len(part_files),
+        "duration_s": time.perf_counter() - t0,
+    }
@@ -8,9 +8,10 @@ This module handles:
 
 import csv
 import random
+import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 # Query parameters by query ID
@@ -20,12 +21,12 @@ QUERY_PARAMS = {
     "Q3": ["space_id"],
     "Q4": ["floor_id"],
     "Q5": [],  # No parameters
-    "Q6": ["building_id", "date_start", "date_end"],
+    "Q6": ["point_id", "date_start", "date_end"],
     "Q7": ["building_id", "date_start", "date_end"],
     "Q8": ["tenant_id", "date_start", "date_end"],
     "Q9": ["tenant_id", "date_start", "date_end"],
-    "Q10": ["building_id"],
-    "Q11": ["building_id"],
+    "Q10": ["zone_id", "date_start", "date_end"],  # dates used by the M2/O2 timeseries half
+    "Q11": ["building_id", "date_start", "date_end"],
     "Q12": ["building_id", "date_start", "date_end"],
     "Q13": ["building_id", "space_type", "date_start", "date_end"],
 }
@@ -493,17 +494,63 @@ def substitute_params(query_text: str, params: Dict) -> str:
     """
     result = query_text
     for key, value in params.items():
-        placeholder = f"${key.upper()}"
-        # Also try lowercase
-        placeholder_lower = f"${key.lower()}"
-
         str_value = str(value)
-        result = result.replace(placeholder, str_value)
-        result = result.replace(placeholder_lower, str_value)
+        # Upper and lowercase placeholders; never match a prefix of a longer
+        # name ($POINT_ID must not rewrite $POINT_IDS)
+        for placeholder in (f"${key.upper()}", f"${key.lower()}"):
+            result = re.sub(re.escape(placeholder) + r"(?![A-Za-z0-9_])", lambda _: str_value, result)
 
     return result
 
 
+# Placeholder matcher for bind-parameter conversion: '$NAME' (quoted) or bare $NAME
+_PLACEHOLDER_RE = re.compile(r"'\$([A-Za-z_][A-Za-z0-9_]*)'|\$([A-Za-z_][A-Za-z0-9_]*)")
+
+
+def strip_sql_comments(query_text: str) -> str:
+    """Remove full-line and trailing `--` comments (outside string literals)."""
+    lines = []
+    for line in query_text.split("\n"):
+        if line.strip().startswith("--"):
+            continue
+        idx = line.find("--")
+        if idx >= 0 and line[:idx].count("'") % 2 == 0:
+            line = line[:idx].rstrip()
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def to_bind_params(query_text: str, params: Dict) -> Tuple[str, List[str]]:
+    """Convert $PARAM placeholders into positional bind parameters ($1, $2, ...).
+
+    Quoted placeholders ('$DATE_START'::timestamptz) and bare ones
+    (ANY($POINT_IDS)) both become $n, so the statement can be PREPAREd once
+    and executed with different values. Placeholders without a value in
+    `params` are left untouched (same behaviour as substitute_params).
+
+    Args:
+        query_text: SQL query with $PARAM placeholders
+        params: Dict of param_name -> value (only keys are used)
+
+    Returns:
+        Tuple of (sql with $n placeholders, ordered list of param names)
+    """
+    known = {k.lower(): k for k in params}
+    order: List[str] = []
+
+    def _replace(match: "re.Match") -> str:
+        name = match.group(1) or match.group(2)
+        key = known.get(name.lower())
+        if key is None:
+            return match.group(0)
+        if key not in order:
+            order.append(key)
+        return f"${order.index(key) + 1}"
+
+    sql = _PLACEHOLDER_RE.sub(_replace, strip_sql_comments(query_text))
+    return sql, order
+
+
 def get_nodes_csv_path(export_dir: Path, scenario: str) -> Path:
     """Get the path to nodes CSV for a scenario.
 
@@ -0,0 +1,288 @@
+"""Process-wide connection reuse for engines and loaders.
+
+Opening a connection costs a TCP handshake plus authentication, which is
+of the same order as the fastest queries (Q1, Q5). Connections are therefore
+kept for the whole process and handed out again instead of being reopened:
+
+- PostgreSQL/TimescaleDB: one ConnectionPool of idle psycopg2 connections
+  per server/user/database; released connections are reset with DISCARD ALL
+  so the next user starts from a clean session
+- Memgraph: one long-lived neo4j driver per Bolt URI (the driver pools its
+  own sockets; engines keep one session open)
+- Oxigraph: one keep-alive connection pool (HTTPAdapter) per base URL,
+  mounted on a requests.Session per thread (sessions are not thread-safe)
+
+Driver modules are imported lazily so that a loader only needs its own
+database client installed.
+"""
+
+import atexit
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Idle PostgreSQL connections kept per pool (extra released connections are closed)
+PG_POOL_MAX_IDLE = int(os.getenv("BTB_PG_POOL_MAX_IDLE", "64"))
+
+# Keep-alive connections per Oxigraph host (>= concurrent clients)
+HTTP_POOL_SIZE = int(os.getenv("BTB_HTTP_POOL_SIZE", "64"))
+
+_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """Thread-safe pool of idle connections created on demand by a factory.
+
+    Usage:
+        pool = ConnectionPool(get_connection, reset=reset_pg_connection, check=pg_connection_alive)
+        conn = pool.acquire()
+        ...
+        pool.release(conn)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        reset: Optional[Callable[[Any], bool]] = None,
+        check: Optional[Callable[[Any], bool]] = None,
+        max_idle: int = PG_POOL_MAX_IDLE,
+    ):
+        """Initialize an empty pool.
+
+        Args:
+            factory: Opens a new connection (may retry/block until ready)
+            reset: Cleans a released connection, returns False if unusable
+            check: Tells whether an idle connection is still alive before
+                handing it out (the server may have been restarted)
+            max_idle: Idle connections kept; the surplus is closed
+        """
+        self.factory = factory
+        self.reset = reset
+        self.check = check
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return an idle connection, or open a new one."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            if self.check is None or self.check(conn):
+                with self._lock:
+                    self.reused += 1
+                return conn
+            try:
+                conn.close()
+            except Exception:
+                pass
+        conn = self.factory()
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Give a connection back (closed instead if broken, discarded or surplus)."""
+        keep = not discard
+        if keep and self.reset is not None:
+            try:
+                keep = self.reset(conn)
+            except Exception:
+                keep = False
+        if keep:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_all(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+# ----------------------------------------------------------------------
+# PostgreSQL / TimescaleDB
+# ----------------------------------------------------------------------
+
+_PG_POOLS: Dict[Tuple, ConnectionPool] = {}
+_PG_OWNERS: Dict[int, ConnectionPool] = {}
+
+
+def reset_pg_connection(conn) -> bool:
+    """Return a psycopg2 connection to a fresh-session state.
+
+    Rolls back any open transaction, then DISCARD ALL drops prepared
+    statements, temp tables and session settings left by the last user.
+    """
+    if conn.closed:
+        return False
+    conn.rollback()
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("DISCARD ALL")
+    conn.autocommit = False
+    return True
+
+
+def pg_connection_alive(conn) -> bool:
+    """Round-trip check of an idle psycopg2 connection."""
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def acquire_pg_connection(key: Tuple, factory: Callable[[], Any]):
+    """Borrow a PostgreSQL connection from the pool for key.
+
+    Args:
+        key: Connection identity, e.g. (host, port, user, database)
+        factory: Opens a new connection when the pool has none idle
+
+    Returns:
+        psycopg2 connection (give it back with release_pg_connection)
+    """
+    with _lock:
+        pool = _PG_POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(factory, reset=reset_pg_connection, check=pg_connection_alive)
+            _PG_POOLS[key] = pool
+    conn = pool.acquire()
+    with _lock:
+        _PG_OWNERS[id(conn)] = pool
+    return conn
+
+
+def release_pg_connection(conn, discard: bool = False) -> None:
+    """Return a connection obtained from acquire_pg_connection (or close a foreign one)."""
+    with _lock:
+        pool = _PG_OWNERS.pop(id(conn), None)
+    if pool is None:
+        conn.close()
+        return
+    pool.release(conn, discard=discard)
+
+
+# ----------------------------------------------------------------------
+# Memgraph (Bolt)
+# ----------------------------------------------------------------------
+
+_BOLT_DRIVERS: Dict[Tuple, Any] = {}
+
+
+def get_bolt_driver(uri: str, auth: Optional[tuple] = None, factory: Optional[Callable[[], Any]] = None):
+    """Return the process-wide neo4j driver for uri (created on first use).
+
+    Args:
+        uri: Bolt URI
+        auth: Optional (user, password) tuple
+        factory: Creates the driver (default: GraphDatabase.driver(uri, auth=auth))
+    """
+    key = (uri, auth)
+    with _lock:
+        driver = _BOLT_DRIVERS.get(key)
+    if driver is not None:
+        return driver
+
+    # Created outside the lock: factories may retry until Memgraph is up
+    if factory is None:
+        from neo4j import GraphDatabase
+
+        driver = GraphDatabase.driver(uri, auth=auth)
+    else:
+        driver = factory()
+    with _lock:
+        shared = _BOLT_DRIVERS.setdefault(key, driver)
+    if shared is not driver:
+        driver.close()
+    return shared
+
+
+def close_bolt_driver(uri: str, auth: Optional[tuple] = None) -> None:
+    """Close and forget the driver for uri (e.g. after a container restart)."""
+    with _lock:
+        driver = _BOLT_DRIVERS.pop((uri, auth), None)
+    if driver is not None:
+        driver.close()
+
+
+# ----------------------------------------------------------------------
+# Oxigraph (HTTP)
+# ----------------------------------------------------------------------
+
+_HTTP_ADAPTERS: Dict[str, Any] = {}
+_http_local = threading.local()
+
+
+def get_http_session(base_url: str):
+    """Return the calling thread's keep-alive requests.Session for base_url.
+
+    requests.Session is not thread-safe, so each thread gets its own; all of
+    them share one HTTPAdapter per base_url, i.e. one pool of at most
+    HTTP_POOL_SIZE keep-alive connections. Fetch the session in the thread
+    that uses it rather than passing it to other threads.
+    """
+    sessions = getattr(_http_local, "sessions", None)
+    if sessions is None:
+        sessions = _http_local.sessions = {}
+    session = sessions.get(base_url)
+    if session is not None:
+        return session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        adapter = _HTTP_ADAPTERS.get(base_url)
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            _HTTP_ADAPTERS[base_url] = adapter
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    sessions[base_url] = session
+    return session
+
+
+def close_all() -> None:
+    """Close every pooled connection, driver and HTTP connection pool."""
+    with _lock:
+        pg_pools = list(_PG_POOLS.values())
+        drivers = list(_BOLT_DRIVERS.values())
+        adapters = list(_HTTP_ADAPTERS.values())
+        _PG_POOLS.clear()
+        _PG_OWNERS.clear()
+        _BOLT_DRIVERS.clear()
+        _HTTP_ADAPTERS.clear()
+    # New sessions of this thread mount fresh adapters
+    _http_local.__dict__.pop("sessions", None)
+    for pool in pg_pools:
+        pool.close_all()
+    for resource in drivers + adapters:
+        try:
+            resource.close()
+        except Exception:
+            pass
+
+
+atexit.register(close_all)
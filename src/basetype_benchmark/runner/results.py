@@ -8,6 +8,15 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (same convention as QueryResult.p95_ms)."""
+    if not values:
+        return 0.0
+    sorted_vals = sorted(values)
+    idx = int(len(sorted_vals) * pct)
+    return sorted_vals[min(idx, len(sorted_vals) - 1)]
+
+
 @dataclass
 class QueryResult:
     """Results for a single query."""
@@ -16,6 +25,35 @@ class QueryResult:
     rows: int = 0
     variants: List[str] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
+    mode: str = "adhoc"  # adhoc, prepared (PREPARE/EXECUTE), or M2/O2 query type (graph_only, ts_direct, hybrid)
+    prepare_ms: float = 0.0
+    planning_ms: List[float] = field(default_factory=list)
+    execution_ms: List[float] = field(default_factory=list)
+    stages_ms: Dict[str, List[float]] = field(default_factory=dict)  # hybrid: graph_ms, extract_ms, ts_ms
+    point_ids: int = 0  # hybrid: point ids shipped from graph to TimescaleDB (last run)
+    fetch: str = "full"  # full (rows materialized) or stream (rows only counted)
+    first_row_ms: List[float] = field(default_factory=list)  # stream: time to first row
+    server_ms: List[float] = field(default_factory=list)  # explain: engine-internal time, one per variant
+    server_profiles: List[Dict[str, Any]] = field(default_factory=list)  # explain: timings, buffers, plan per variant
+
+    @property
+    def server_p50_ms(self) -> float:
+        if not self.server_ms:
+            return 0.0
+        return statistics.median(self.server_ms)
+
+    @property
+    def client_overhead_p50_ms(self) -> float:
+        """Median wall-clock latency not spent inside the engine (network, driver, Python)."""
+        if not self.server_ms or not self.latencies_ms:
+            return 0.0
+        return self.p50_ms - self.server_p50_ms
+
+    @property
+    def first_row_p50_ms(self) -> float:
+        if not self.first_row_ms:
+            return 0.0
+        return statistics.median(self.first_row_ms)
 
     @property
     def p50_ms(self) -> float:
@@ -24,12 +62,24 @@ class QueryResult:
         return statistics.median(self.latencies_ms)
 
     @property
-    def p95_ms(self) -> float:
-        if not self.latencies_ms:
+    def planning_p50_ms(self) -> float:
+        if not self.planning_ms:
+            return 0.0
+        return statistics.median(self.planning_ms)
+
+    @property
+    def execution_p50_ms(self) -> float:
+        if not self.execution_ms:
             return 0.0
-        sorted_lat = sorted(self.latencies_ms)
-        idx = int(len(sorted_lat) * 0.95)
-        return sorted_lat[min(idx, len(sorted_lat) - 1)]
+        return statistics.median(self.execution_ms)
+
+    @property
+    def p95_ms(self) -> float:
+        return _percentile(self.latencies_ms, 0.95)
+
+    @property
+    def p99_ms(self) -> float:
+        return _percentile(self.latencies_ms, 0.99)
 
     @property
     def avg_ms(self) -> float:
@@ -43,10 +93,29 @@ class QueryResult:
             "latencies_ms": self.latencies_ms,
             "p50_ms": round(self.p50_ms, 2),
             "p95_ms": round(self.p95_ms, 2),
+            "p99_ms": round(self.p99_ms, 2),
             "avg_ms": round(self.avg_ms, 2),
             "rows": self.rows,
             "variants": self.variants,
             "errors": self.errors,
+            "mode": self.mode,
+            "prepare_ms": round(self.prepare_ms, 3),
+            "planning_ms": self.planning_ms,
+            "execution_ms": self.execution_ms,
+            "planning_p50_ms": round(self.planning_p50_ms, 3),
+            "execution_p50_ms": round(self.execution_p50_ms, 3),
+            "stages_p50_ms": {
+                stage: round(statistics.median(values), 2)
+                for stage, values in self.stages_ms.items() if values
+            },
+            "point_ids": self.point_ids,
+            "fetch": self.fetch,
+            "first_row_ms": self.first_row_ms,
+            "first_row_p50_ms": round(self.first_row_p50_ms, 3),
+            "server_ms": self.server_ms,
+            "server_p50_ms": round(self.server_p50_ms, 3),
+            "client_overhead_p50_ms": round(self.client_overhead_p50_ms, 3),
+            "server_profiles": self.server_profiles,
         }
 
     def to_summary(self) -> Dict[str, Any]:
@@ -57,6 +126,104 @@ class QueryResult:
         }
 
 
+@dataclass
+class ConcurrencyResult:
+    """Results for one load level of a multi-client workload run.
+
+    Closed loop: n_clients each wait for their reply before sending again.
+    Open loop: queries are issued at target_qps (Poisson arrivals) by a pool
+    of n_clients; latencies_ms then run from the *intended* send time
+    (coordinated-omission corrected) and service_ms holds the engine-side
+    latency alone.
+    """
+    n_clients: int
+    mode: str = "closed"  # closed or open
+    duration_s: float = 0.0
+    latencies_ms: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    error_samples: List[str] = field(default_factory=list)
+    connect_errors: int = 0
+    target_qps: float = 0.0
+    service_ms: Dict[str, List[float]] = field(default_factory=dict)
+    dropped: int = 0  # open loop: scheduled queries never sent before the drain timeout
+
+    @property
+    def completed(self) -> int:
+        return sum(len(lat) for lat in self.latencies_ms.values())
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def qps(self) -> float:
+        if self.duration_s <= 0:
+            return 0.0
+        return self.completed / self.duration_s
+
+    @property
+    def error_rate(self) -> float:
+        total = self.completed + self.failed + self.dropped
+        return (self.failed + self.dropped) / total if total else 0.0
+
+    @property
+    def p95_ms(self) -> float:
+        all_latencies = [l for lat in self.latencies_ms.values() for l in lat]
+        return _percentile(all_latencies, 0.95)
+
+    @property
+    def p99_ms(self) -> float:
+        all_latencies = [l for lat in self.latencies_ms.values() for l in lat]
+        return _percentile(all_latencies, 0.99)
+
+    def query_stats(self, query_id: str) -> Dict[str, Any]:
+        lat = self.latencies_ms.get(query_id, [])
+        errors = self.errors.get(query_id, 0)
+        total = len(lat) + errors
+        stats = {
+            "count": len(lat),
+            "p50_ms": round(statistics.median(lat), 2) if lat else 0.0,
+            "p95_ms": round(_percentile(lat, 0.95), 2),
+            "p99_ms": round(_percentile(lat, 0.99), 2),
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+        }
+        service = self.service_ms.get(query_id)
+        if service:
+            stats["service_p50_ms"] = round(statistics.median(service), 2)
+            stats["service_p95_ms"] = round(_percentile(service, 0.95), 2)
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        query_ids = sorted(set(self.latencies_ms) | set(self.errors), key=lambda q: int(q.lstrip("Q")))
+        d = {
+            "n_clients": self.n_clients,
+            "mode": self.mode,
+            "duration_s": round(self.duration_s, 3),
+            "qps": round(self.qps, 2),
+            "completed": self.completed,
+            "failed": self.failed,
+            "error_rate": round(self.error_rate, 4),
+            "connect_errors": self.connect_errors,
+            "p95_ms": round(self.p95_ms, 2),
+            "p99_ms": round(self.p99_ms, 2),
+            "queries": {qid: self.query_stats(qid) for qid in query_ids},
+            "error_samples": self.error_samples,
+        }
+        if self.mode == "open":
+            d["target_qps"] = round(self.target_qps, 2)
+            d["dropped"] = self.dropped
+        return d
+
+    def to_summary(self) -> Dict[str, Any]:
+        return {
+            "qps": round(self.qps, 2),
+            "p95_ms": round(self.p95_ms, 2),
+            "p99_ms": round(self.p99_ms, 2),
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
 @dataclass
 class LoadResult:
     """Results for data loading phase."""
@@ -78,6 +245,121 @@ class LoadResult:
         }
 
 
+@dataclass
+class IngestResult:
+    """Results for incremental (append/upsert) ingestion into a loaded scenario."""
+    mode: str = "append"  # append, upsert
+    rows: int = 0
+    duration_s: float = 0.0
+    since: Optional[str] = None  # exclusive lower bound of the ingested range
+    chunks_analyzed: int = 0
+    error: Optional[str] = None
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.duration_s if self.duration_s > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "rows": self.rows,
+            "duration_s": round(self.duration_s, 2),
+            "rows_per_s": round(self.rows_per_s, 1),
+            "since": self.since,
+            "chunks_analyzed": self.chunks_analyzed,
+            "error": self.error,
+        }
+
+
+@dataclass
+class StreamingIngestResult:
+    """Replayed live ingest measured together with concurrent readers.
+
+    idle holds the readers alone, loaded the same readers while the writer
+    replays samples at speedup x real time; the read degradation is the
+    loaded/idle latency ratio per query.
+    """
+    target: str  # timescaledb, memgraph
+    speedup: float = 1.0
+    n_readers: int = 0
+    duration_s: float = 0.0
+    rows: int = 0
+    offered_rows: int = 0  # samples that fell due during the run
+    write_latencies_ms: List[float] = field(default_factory=list)
+    max_lag_s: float = 0.0
+    write_errors: int = 0
+    error_samples: List[str] = field(default_factory=list)
+    idle: Optional[ConcurrencyResult] = None
+    loaded: Optional[ConcurrencyResult] = None
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.duration_s if self.duration_s > 0 else 0.0
+
+    @property
+    def offered_rows_per_s(self) -> float:
+        return self.offered_rows / self.duration_s if self.duration_s > 0 else 0.0
+
+    @property
+    def write_p50_ms(self) -> float:
+        return statistics.median(self.write_latencies_ms) if self.write_latencies_ms else 0.0
+
+    @property
+    def write_p95_ms(self) -> float:
+        return _percentile(self.write_latencies_ms, 0.95)
+
+    @property
+    def write_p99_ms(self) -> float:
+        return _percentile(self.write_latencies_ms, 0.99)
+
+    def read_degradation(self) -> Dict[str, Dict[str, float]]:
+        """Per query: idle vs loaded p50/p95 and their ratio."""
+        if self.idle is None or self.loaded is None:
+            return {}
+        out = {}
+        for qid in sorted(set(self.idle.latencies_ms) & set(self.loaded.latencies_ms), key=lambda q: int(q.lstrip("Q"))):
+            idle, loaded = self.idle.query_stats(qid), self.loaded.query_stats(qid)
+            out[qid] = {
+                "idle_p50_ms": idle["p50_ms"],
+                "loaded_p50_ms": loaded["p50_ms"],
+                "p50_ratio": round(loaded["p50_ms"] / idle["p50_ms"], 3) if idle["p50_ms"] else 0.0,
+                "idle_p95_ms": idle["p95_ms"],
+                "loaded_p95_ms": loaded["p95_ms"],
+                "p95_ratio": round(loaded["p95_ms"] / idle["p95_ms"], 3) if idle["p95_ms"] else 0.0,
+            }
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "target": self.target,
+            "speedup": self.speedup,
+            "n_readers": self.n_readers,
+            "duration_s": round(self.duration_s, 3),
+            "rows": self.rows,
+            "rows_per_s": round(self.rows_per_s, 1),
+            "offered_rows_per_s": round(self.offered_rows_per_s, 1),
+            "write_p50_ms": round(self.write_p50_ms, 2),
+            "write_p95_ms": round(self.write_p95_ms, 2),
+            "write_p99_ms": round(self.write_p99_ms, 2),
+            "writes": len(self.write_latencies_ms),
+            "write_errors": self.write_errors,
+            "max_lag_s": round(self.max_lag_s, 3),
+            "read_degradation": self.read_degradation(),
+            "idle": self.idle.to_dict() if self.idle else None,
+            "loaded": self.loaded.to_dict() if self.loaded else None,
+            "error_samples": self.error_samples,
+        }
+
+    def to_summary(self) -> Dict[str, Any]:
+        return {
+            "rows_per_s": round(self.rows_per_s, 1),
+            "write_p95_ms": round(self.write_p95_ms, 2),
+            "max_lag_s": round(self.max_lag_s, 3),
+            "idle_p95_ms": round(self.idle.p95_ms, 2) if self.idle else 0.0,
+            "loaded_p95_ms": round(self.loaded.p95_ms, 2) if self.loaded else 0.0,
+        }
+
+
 @dataclass
 class BenchmarkResult:
     """Complete benchmark result for a scenario run."""
@@ -90,6 +372,11 @@ class BenchmarkResult:
     queries: Dict[str, QueryResult] = field(default_factory=dict)
     error: Optional[str] = None
     system_info: Dict[str, Any] = field(default_factory=dict)
+    concurrency: List[ConcurrencyResult] = field(default_factory=list)
+    open_loop: List[ConcurrencyResult] = field(default_factory=list)
+    saturation_knee_qps: Optional[float] = None
+    ingest: Optional[IngestResult] = None
+    streaming: Optional[StreamingIngestResult] = None
 
     @property
     def global_p95_ms(self) -> float:
@@ -97,11 +384,7 @@ class BenchmarkResult:
         all_latencies = []
         for qr in self.queries.values():
             all_latencies.extend(qr.latencies_ms)
-        if not all_latencies:
-            return 0.0
-        sorted_lat = sorted(all_latencies)
-        idx = int(len(sorted_lat) * 0.95)
-        return sorted_lat[min(idx, len(sorted_lat) - 1)]
+        return _percentile(all_latencies, 0.95)
 
     def to_full_dict(self) -> Dict[str, Any]:
         """Full result with all details."""
@@ -115,6 +398,13 @@ class BenchmarkResult:
             "load": self.load.to_dict(),
             "queries": {qid: qr.to_dict() for qid, qr in self.queries.items()},
             "global_p95_ms": round(self.global_p95_ms, 2),
+            "concurrency": [c.to_dict() for c in self.concurrency],
+            "open_loop": {
+                "levels": [l.to_dict() for l in self.open_loop],
+                "saturation_knee_qps": self.saturation_knee_qps,
+            },
+            "ingest": self.ingest.to_dict() if self.ingest else None,
+            "streaming_ingest": self.streaming.to_dict() if self.streaming else None,
             "error": self.error,
         }
 
@@ -127,6 +417,11 @@ class BenchmarkResult:
             "load_s": round(self.load.duration_s, 2),
             "queries": {qid: qr.to_summary() for qid, qr in self.queries.items()},
             "global_p95_ms": round(self.global_p95_ms, 2),
+            "concurrency": {str(c.n_clients): c.to_summary() for c in self.concurrency},
+            "open_loop": {f"{l.target_qps:g}": l.to_summary() for l in self.open_loop},
+            "saturation_knee_qps": self.saturation_knee_qps,
+            "ingest_rows_per_s": round(self.ingest.rows_per_s, 1) if self.ingest else None,
+            "streaming_ingest": self.streaming.to_summary() if self.streaming else None,
             "status": self.status,
         }
 
@@ -1,14 +1,26 @@
 """Scenario orchestration for benchmark execution."""
 
 import os
+import statistics
 import time
+from datetime import timedelta
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 
 from . import docker
 from .protocol import Protocol, get_protocol, QUERIES, QUERY_TYPE
 from .metrics import ResourceMonitor, get_peak_memory_mb
-from .results import BenchmarkResult, QueryResult, LoadResult, save_results
+from .results import BenchmarkResult, IngestResult, QueryResult, LoadResult, StreamingIngestResult, save_results
+from .hybrid import PIPELINED, HybridClient, HybridExecutor
+from .ingest import (
+    DEFAULT_STREAM_READERS,
+    STREAM_READ_WEIGHTS,
+    ArchiveDayWriter,
+    TimescaleWriter,
+    load_replay_samples,
+    run_streaming_ingest,
+)
+from .workload import DEFAULT_OPEN_LOOP_CLIENTS, run_arrival_rate_sweep, run_concurrency_sweep
 from .params import (
     extract_dataset_info,
     extract_timeseries_range,
@@ -19,7 +31,7 @@ from .params import (
     get_nodes_csv_path,
 )
 from .engines.postgres import PostgresEngine
-from .engines.memgraph import MemgraphEngine
+from .engines.memgraph import LOAD_CSV_ENABLED as MEMGRAPH_LOAD_CSV, MemgraphEngine
 from .engines.oxigraph import OxigraphEngine
 from .engines.timescale import TimescaleEngine
 
@@ -45,6 +57,14 @@ QUERY_DIRS = {
     "O2": Path("queries/o2/graph"),
 }
 
+# Scenarios whose Q6-Q13 span the graph engine and TimescaleDB
+HYBRID_SCENARIOS = {"M2", "O2"}
+
+# Timeseries load path: "parquet" (parallel binary COPY straight from
+# timeseries.parquet, no text CSV is written) or "csv" (export the shared
+# timeseries.csv and load it with timescaledb-parallel-copy)
+TS_LOADER = os.getenv("BTB_TS_LOADER", "parquet")
+
 # Query file extensions
 QUERY_EXT = {
     "P1": ".sql",
@@ -95,10 +115,15 @@ def ensure_scenario_exported(
     # Scenarios that need timeseries.csv (use TimescaleDB)
     NEEDS_TIMESERIES_CSV = {"P1", "P2", "M2", "O2"}
 
-    # Export shared timeseries.csv ONCE for all scenarios that need it.
+    # Export shared timeseries.csv ONCE for all scenarios that need it, only
+    # for the CSV loader (the default loader COPYs from timeseries.parquet).
     # If we only run graph-only queries, skip generating timeseries.csv.
     # timeseries.csv goes at export_dir root (not in parquet/ subdirectory)
-    if scenario in NEEDS_TIMESERIES_CSV and _queries_need_timeseries(selected):
+    if (
+        TS_LOADER == "csv"
+        and scenario in NEEDS_TIMESERIES_CSV
+        and _queries_need_timeseries(selected)
+    ):
         shared_ts = export_dir / "timeseries.csv"
         if not shared_ts.exists():
             print(f"  [EXPORT] Generating shared timeseries.csv...")
@@ -235,6 +260,18 @@ def run_scenario(
     query_ids: Optional[list[str]] = None,
     protocol_override: Optional[Protocol] = None,
     output_dir: Path = None,
+    prepared: bool = False,
+    pipelined_hybrid: bool = False,
+    concurrency: Optional[list[int]] = None,
+    arrival_rates: Optional[list[float]] = None,
+    workload_duration_s: float = 30.0,
+    open_loop_clients: int = DEFAULT_OPEN_LOOP_CLIENTS,
+    fetch: str = "full",
+    explain: bool = False,
+    append_dir: Optional[Path] = None,
+    upsert: bool = False,
+    stream_speedup: Optional[float] = None,
+    stream_readers: int = DEFAULT_STREAM_READERS,
 ) -> BenchmarkResult:
     """Run benchmark for a single scenario.
 
@@ -244,14 +281,46 @@ def run_scenario(
         profile: Profile name (e.g., 'small-2d')
         ram_gb: RAM limit in GB
         output_dir: Output directory for results
+        prepared: Use server-side prepared statements (P1/P2 only); they
+            always fetch in full and record their own planning/execution
+            split, so fetch="stream" and explain are rejected with it
+        pipelined_hybrid: M2/O2 - overlap graph streaming with batched
+            TimescaleDB fetches instead of running the halves serially
+        concurrency: Client counts for the closed-loop multi-client workload
+            (run after the serial queries; None = skip)
+        arrival_rates: Target rates (req/s) for the open-loop sweep with
+            coordinated-omission corrected latencies (None = skip)
+        workload_duration_s: Measurement window per concurrency level / rate
+        open_loop_clients: Sender pool size for the open-loop sweep
+        fetch: "full" materializes every row client-side; "stream" only
+            counts rows off a server-side cursor / Bolt stream / TSV stream
+            and also records time to first row (M2/O2: end-to-end, not with
+            pipelined_hybrid)
+        explain: After each variant's measured runs, run it once more under
+            EXPLAIN (ANALYZE, BUFFERS) / PROFILE and store engine-internal
+            timings, buffer stats and plans on the QueryResult
+        append_dir: Dataset export holding new days for the same profile;
+            after the workloads they are ingested into the loaded hypertable /
+            ArchiveDay graph and the ingest throughput is recorded
+        upsert: With append_dir, replace rows already present for the same
+            (point_id, time) / (point_id, day) instead of only appending
+            rows newer than the loaded data
+        stream_speedup: Replay the dataset's samples as live ingest at this
+            real-time multiple while stream_readers clients run Q6/Q7/Q13,
+            and compare read latency with the idle store (None = skip)
+        stream_readers: Reader clients of the streaming ingest run
 
     Returns:
         BenchmarkResult
     """
     if output_dir is None:
         output_dir = Path("benchmark_results")
+    if prepared and (fetch != "full" or explain):
+        raise ValueError("prepared statements cannot be combined with fetch='stream' or explain")
 
     scenario = scenario.upper()
+    if fetch == "stream" and scenario in HYBRID_SCENARIOS and (pipelined_hybrid or PIPELINED):
+        raise ValueError("pipelined hybrid mode cannot be combined with fetch='stream'")
     protocol = protocol_override or get_protocol(profile)
 
     result = BenchmarkResult(
@@ -282,15 +351,64 @@ def run_scenario(
 
         # Run scenario-specific benchmark
         if scenario in ("P1", "P2"):
-            result = _run_postgres(scenario, export_dir, protocol, result, query_ids=query_ids)
+            result = _run_postgres(
+                scenario, export_dir, protocol, result, query_ids=query_ids, prepared=prepared, fetch=fetch,
+                explain=explain,
+            )
         elif scenario in ("M1", "M2"):
-            result = _run_memgraph(scenario, export_dir, protocol, result, query_ids=query_ids)
+            result = _run_memgraph(
+                scenario, export_dir, protocol, result, query_ids=query_ids, pipelined_hybrid=pipelined_hybrid,
+                fetch=fetch, explain=explain,
+            )
         elif scenario in ("O1", "O2"):
-            result = _run_oxigraph(scenario, export_dir, protocol, result, query_ids=query_ids)
+            result = _run_oxigraph(
+                scenario, export_dir, protocol, result, query_ids=query_ids, pipelined_hybrid=pipelined_hybrid,
+                fetch=fetch, explain=explain,
+            )
         else:
             result.status = "failed"
             result.error = f"Unknown scenario: {scenario}"
 
+        # Multi-client workloads on the already loaded containers
+        if (concurrency or arrival_rates) and result.status != "failed":
+            client_factory, workload_queries = _workload_setup(scenario, export_dir, profile, protocol, selected)
+
+            if concurrency:
+                print(f"\n[4b] Closed-loop workload (clients: {concurrency}, {workload_duration_s:.0f}s each)...")
+                result.concurrency = run_concurrency_sweep(
+                    client_factory,
+                    workload_queries,
+                    levels=concurrency,
+                    duration_s=workload_duration_s,
+                )
+
+            if arrival_rates:
+                print(f"\n[4c] Open-loop workload (rates: {arrival_rates} req/s, {workload_duration_s:.0f}s each)...")
+                result.open_loop, result.saturation_knee_qps = run_arrival_rate_sweep(
+                    client_factory,
+                    workload_queries,
+                    rates=arrival_rates,
+                    duration_s=workload_duration_s,
+                    n_clients=open_loop_clients,
+                )
+                knee = result.saturation_knee_qps
+                print(f"  Saturation knee: {f'{knee:g} req/s' if knee is not None else 'below lowest rate'}")
+
+        # Incremental ingest of new days into the already loaded containers
+        if append_dir is not None and result.status != "failed":
+            print(f"\n[4d] Incremental ingest ({'upsert' if upsert else 'append'}) from {append_dir}...")
+            result.ingest = _run_append_ingest(scenario, Path(append_dir), upsert=upsert)
+
+        # Live ingest with concurrent readers (after --append: replays after the newest day)
+        if stream_speedup and result.status != "failed":
+            print(
+                f"\n[4e] Streaming ingest ({stream_speedup:g}x real time, {stream_readers} readers, "
+                f"{workload_duration_s:.0f}s per phase)..."
+            )
+            result.streaming = _run_streaming_ingest(
+                scenario, export_dir, profile, protocol, stream_speedup, stream_readers, workload_duration_s,
+            )
+
     except Exception as e:
         result.status = "failed"
         result.error = str(e)
@@ -320,6 +438,9 @@ def _run_postgres(
     protocol: Protocol,
     result: BenchmarkResult,
     query_ids: Optional[list[str]] = None,
+    prepared: bool = False,
+    fetch: str = "full",
+    explain: bool = False,
 ) -> BenchmarkResult:
     """Run PostgreSQL benchmark (P1 or P2)."""
     container = docker.get_container_name("timescaledb")
@@ -351,7 +472,9 @@ def _run_postgres(
         ts_parquet = parquet_dir / "timeseries.parquet"
         ts_rows = 0
 
-        if _queries_need_timeseries(selected) and ts_csv.exists():
+        if _queries_need_timeseries(selected) and _use_parquet_timeseries(ts_csv, ts_parquet):
+            ts_rows = engine.load_timeseries_parquet_parallel(ts_parquet)
+        elif _queries_need_timeseries(selected) and ts_csv.exists():
             # Prefer fastest in-container bulk path
             try:
                 ts_rows = engine.load_timeseries_parallel_copy("/data/timeseries.csv")
@@ -362,9 +485,6 @@ def _run_postgres(
                 except Exception as e2:
                     print(f"  [WARN] Server-side COPY failed ({e2}), falling back to client-side...")
                     ts_rows = engine.load_timeseries(ts_csv)
-        elif _queries_need_timeseries(selected) and ts_parquet.exists() and hasattr(engine, "load_timeseries_from_parquet"):
-            print("  [LOAD] timeseries.csv missing; falling back to Parquet enrichment path...")
-            ts_rows = engine.load_timeseries_from_parquet(ts_parquet)
 
         load_stats = monitor.stop()
         result.load = LoadResult(
@@ -388,7 +508,11 @@ def _run_postgres(
                 monitors[cname] = m
 
         t_q0 = time.time()
-        result = _run_queries(engine.get_executor(), scenario, protocol, result, export_dir, query_ids=selected)
+        result = _run_queries(
+            engine.get_executor(fetch), scenario, protocol, result, export_dir, query_ids=selected,
+            prepared_engine=engine if prepared else None, fetch=fetch,
+            explain_engine=engine if explain else None,
+        )
         query_elapsed = time.time() - t_q0
 
         query_stats: Dict[str, Dict] = {"duration_s": round(query_elapsed, 3), "containers": {}}
@@ -409,12 +533,147 @@ def _run_postgres(
     return result
 
 
+def _use_parquet_timeseries(ts_csv: Path, ts_parquet: Path) -> bool:
+    """True when the timeseries is loaded from Parquet rather than the CSV."""
+    return ts_parquet.exists() and (TS_LOADER != "csv" or not ts_csv.exists())
+
+
+def _load_hybrid_timeseries(export_dir: Path) -> int:
+    """Load the shared timeseries into TimescaleDB for M2/O2 (returns rows)."""
+    ts_csv = export_dir / "timeseries.csv"
+    ts_parquet = export_dir / "parquet" / "timeseries.parquet"
+    use_parquet = _use_parquet_timeseries(ts_csv, ts_parquet)
+    if not use_parquet and not ts_csv.exists():
+        return 0
+
+    ts_rows = 0
+    ts_engine = TimescaleEngine()
+    ts_engine.connect()
+    try:
+        if use_parquet:
+            return ts_engine.load_timeseries_parquet_parallel(ts_parquet)
+
+        ts_engine.create_timeseries_schema()
+        try:
+            ts_rows = ts_engine.load_timeseries_parallel_copy(
+                "/data/timeseries.csv",
+                container_name=docker.get_container_name("timescaledb"),
+                workers=int(os.getenv("BTB_TS_PARALLEL_COPY_WORKERS", "8")),
+                batch_size=int(os.getenv("BTB_TS_PARALLEL_COPY_BATCH_SIZE", "50000")),
+            )
+        except Exception as e:
+            print(f"  [WARN] parallel-copy failed ({e}); trying server-side COPY...")
+            try:
+                ts_rows = ts_engine.load_timeseries_server_copy("/data/timeseries.csv")
+            except Exception as e2:
+                print(f"  [WARN] Server-side COPY failed ({e2}), falling back to client-side...")
+                ts_rows = ts_engine.load_timeseries(ts_csv)
+    finally:
+        ts_engine.close()
+    return ts_rows
+
+
+def _run_append_ingest(scenario: str, append_dir: Path, upsert: bool = False) -> IngestResult:
+    """Ingest the timeseries of append_dir into the loaded scenario (no reload).
+
+    P1/P2 append into the PostgreSQL hypertable, M2/O2 into the TimescaleDB
+    half, M1 into the ArchiveDay graph. O1 is not supported: its chunks are
+    plain triples that cannot be replaced per day.
+    """
+    ingest = IngestResult(mode="upsert" if upsert else "append")
+    parquet_dir = append_dir / "parquet" if (append_dir / "parquet").exists() else append_dir
+    ts_parquet = parquet_dir / "timeseries.parquet"
+    if not ts_parquet.exists():
+        ingest.error = f"No timeseries.parquet in {append_dir}"
+        print(f"  [WARN] {ingest.error}")
+        return ingest
+
+    try:
+        if scenario in ("P1", "P2", "M2", "O2"):
+            engine = PostgresEngine(scenario) if scenario in ("P1", "P2") else TimescaleEngine()
+            engine.connect()
+            try:
+                stats = engine.append_timeseries_from_parquet(ts_parquet, upsert=upsert)
+            finally:
+                engine.close()
+        elif scenario == "M1":
+            chunks_file = get_scenario_files(append_dir, "M1")["chunks"]
+            if not chunks_file.exists():
+                export_memgraph_chunks_csv(parquet_dir, chunks_file.parent)
+            engine = MemgraphEngine(scenario)
+            engine.connect()
+            try:
+                stats = engine.append_chunks(chunks_file, upsert=upsert)
+            finally:
+                engine.close()
+        else:
+            ingest.error = f"Incremental ingest not supported for {scenario}"
+            print(f"  NOTE: {ingest.error}")
+            return ingest
+    except Exception as e:
+        ingest.error = str(e)
+        print(f"  [WARN] Incremental ingest failed: {e}")
+        return ingest
+
+    ingest.rows = stats["rows"]
+    ingest.duration_s = stats["duration_s"]
+    ingest.since = str(stats["since"]) if stats.get("since") is not None else None
+    ingest.chunks_analyzed = stats.get("chunks_analyzed", 0)
+    return ingest
+
+
+def _run_streaming_ingest(
+    scenario: str,
+    export_dir: Path,
+    profile: str,
+    protocol: Protocol,
+    speedup: float,
+    n_readers: int,
+    duration_s: float,
+    warmup_s: float = 5.0,
+) -> Optional[StreamingIngestResult]:
+    """Replay samples into the loaded store while readers run Q6/Q7/Q13."""
+    if scenario == "O1":
+        print("  NOTE: Streaming ingest not supported for O1 (chunk triples cannot be appended per sample)")
+        return None
+
+    ts_parquet = export_dir / "parquet" / "timeseries.parquet"
+    if not ts_parquet.exists():
+        print(f"  [WARN] No timeseries.parquet in {export_dir / 'parquet'}, skipping streaming ingest")
+        return None
+
+    reader_factory, queries = _workload_setup(scenario, export_dir, profile, protocol, list(STREAM_READ_WEIGHTS))
+
+    writer = ArchiveDayWriter() if scenario == "M1" else TimescaleWriter(ts_parquet.parent / "nodes.parquet")
+    writer.connect()
+    try:
+        latest = writer.latest_day()
+        samples = load_replay_samples(
+            ts_parquet,
+            sim_seconds=(warmup_s + duration_s) * speedup,
+            start_day=latest + timedelta(days=1) if latest else None,
+        )
+        if samples.num_rows == 0:
+            print("  [WARN] No samples to replay, skipping streaming ingest")
+            return None
+        print(f"  [INGEST] Replaying {samples.num_rows:,} samples from {samples.column('timestamp')[0]}")
+        return run_streaming_ingest(
+            writer, samples, reader_factory, queries,
+            n_readers=n_readers, duration_s=duration_s, speedup=speedup, warmup_s=warmup_s,
+        )
+    finally:
+        writer.close()
+
+
 def _run_memgraph(
     scenario: str,
     export_dir: Path,
     protocol: Protocol,
     result: BenchmarkResult,
     query_ids: Optional[list[str]] = None,
+    pipelined_hybrid: bool = False,
+    fetch: str = "full",
+    explain: bool = False,
 ) -> BenchmarkResult:
     """Run Memgraph benchmark (M1 or M2)."""
     container = docker.get_container_name("memgraph")
@@ -434,36 +693,35 @@ def _run_memgraph(
 
         engine.clear()
 
-        nodes = engine.load_nodes(files["nodes"])
-        edges = engine.load_edges(files["edges"])
-
         selected = query_ids or QUERIES
+        load_chunks = scenario == "M1" and _queries_need_timeseries(selected) and files.get("chunks")
+
+        # Bulk path: Memgraph reads the CSVs itself (LOAD CSV), UNWIND batches as fallback
+        bulk = None
+        if MEMGRAPH_LOAD_CSV:
+            try:
+                bulk = engine.load_bulk(
+                    files["nodes"], files["edges"],
+                    chunks_file=files["chunks"] if load_chunks else None,
+                    data_dir=export_dir, container=container,
+                )
+            except Exception as e:
+                print(f"  [WARN] LOAD CSV failed ({e}); falling back to UNWIND batches...")
+                engine.clear()
 
-        # M1: load chunks, M2: load timeseries to TimescaleDB
         ts_rows = 0
-        if scenario == "M1" and _queries_need_timeseries(selected) and files.get("chunks"):
-            ts_rows = engine.load_chunks(files["chunks"])
-        elif scenario == "M2" and _queries_need_timeseries(selected):
-            ts_csv = export_dir / "timeseries.csv"
-            if ts_csv.exists():
-                ts_engine = TimescaleEngine()
-                ts_engine.connect()
-                ts_engine.create_timeseries_schema()
-                try:
-                    ts_rows = ts_engine.load_timeseries_parallel_copy(
-                        "/data/timeseries.csv",
-                        container_name=docker.get_container_name("timescaledb"),
-                        workers=int(os.getenv("BTB_TS_PARALLEL_COPY_WORKERS", "8")),
-                        batch_size=int(os.getenv("BTB_TS_PARALLEL_COPY_BATCH_SIZE", "50000")),
-                    )
-                except Exception as e:
-                    print(f"  [WARN] parallel-copy failed ({e}); trying server-side COPY...")
-                    try:
-                        ts_rows = ts_engine.load_timeseries_server_copy("/data/timeseries.csv")
-                    except Exception as e2:
-                        print(f"  [WARN] Server-side COPY failed ({e2}), falling back to client-side...")
-                        ts_rows = ts_engine.load_timeseries(ts_csv)
-                ts_engine.close()
+        if bulk is not None:
+            nodes, edges, ts_rows = bulk
+        else:
+            nodes = engine.load_nodes(files["nodes"])
+            edges = engine.load_edges(files["edges"])
+            # M1: load chunks
+            if load_chunks:
+                ts_rows = engine.load_chunks(files["chunks"])
+
+        # M2: load timeseries to TimescaleDB
+        if scenario == "M2" and _queries_need_timeseries(selected):
+            ts_rows = _load_hybrid_timeseries(export_dir)
 
         load_stats = monitor.stop()
         result.load = LoadResult(
@@ -483,8 +741,24 @@ def _run_memgraph(
             if m.start():
                 monitors[cname] = m
 
+        # M2/O2: run the TimescaleDB half of hybrid queries on its own connection
+        hybrid = None
+        if scenario in HYBRID_SCENARIOS and _queries_need_timeseries(selected):
+            query_ts_engine = TimescaleEngine()
+            query_ts_engine.connect()
+            hybrid = HybridExecutor(
+                scenario, engine, query_ts_engine, pipelined=pipelined_hybrid or PIPELINED, fetch=fetch
+            )
+
         t_q0 = time.time()
-        result = _run_queries(engine.get_executor(), scenario, protocol, result, export_dir, query_ids=selected)
+        try:
+            result = _run_queries(
+                engine.get_executor(fetch), scenario, protocol, result, export_dir, query_ids=selected,
+                hybrid=hybrid, fetch=fetch, explain_engine=engine if explain else None,
+            )
+        finally:
+            if hybrid is not None:
+                hybrid.close()
         query_elapsed = time.time() - t_q0
 
         query_stats: Dict[str, Dict] = {"duration_s": round(query_elapsed, 3), "containers": {}}
@@ -511,6 +785,9 @@ def _run_oxigraph(
     protocol: Protocol,
     result: BenchmarkResult,
     query_ids: Optional[list[str]] = None,
+    pipelined_hybrid: bool = False,
+    fetch: str = "full",
+    explain: bool = False,
 ) -> BenchmarkResult:
     """Run Oxigraph benchmark (O1 or O2)."""
     container = docker.get_container_name("oxigraph")
@@ -530,38 +807,18 @@ def _run_oxigraph(
 
         engine.clear()
 
-        triples = 0
-        if files.get("graph"):
-            triples = engine.load_ntriples(files["graph"])
-
         selected = query_ids or QUERIES
 
+        # Loaded together so the bulk mode stops the server only once
+        nt_files = [files["graph"]] if files.get("graph") else []
         if scenario == "O1" and _queries_need_timeseries(selected) and files.get("chunks"):
-            triples += engine.load_ntriples(files["chunks"])
+            nt_files.append(files["chunks"])
+        triples = engine.load_ntriples_files(nt_files) if nt_files else 0
 
         # O2: load timeseries to TimescaleDB
         ts_rows = 0
         if scenario == "O2" and _queries_need_timeseries(selected):
-            ts_csv = export_dir / "timeseries.csv"
-            if ts_csv.exists():
-                ts_engine = TimescaleEngine()
-                ts_engine.connect()
-                ts_engine.create_timeseries_schema()
-                try:
-                    ts_rows = ts_engine.load_timeseries_parallel_copy(
-                        "/data/timeseries.csv",
-                        container_name=docker.get_container_name("timescaledb"),
-                        workers=int(os.getenv("BTB_TS_PARALLEL_COPY_WORKERS", "8")),
-                        batch_size=int(os.getenv("BTB_TS_PARALLEL_COPY_BATCH_SIZE", "50000")),
-                    )
-                except Exception as e:
-                    print(f"  [WARN] parallel-copy failed ({e}); trying server-side COPY...")
-                    try:
-                        ts_rows = ts_engine.load_timeseries_server_copy("/data/timeseries.csv")
-                    except Exception as e2:
-                        print(f"  [WARN] Server-side COPY failed ({e2}), falling back to client-side...")
-                        ts_rows = ts_engine.load_timeseries(ts_csv)
-                ts_engine.close()
+            ts_rows = _load_hybrid_timeseries(export_dir)
 
         load_stats = monitor.stop()
         result.load = LoadResult(
@@ -573,6 +830,8 @@ def _run_oxigraph(
         )
 
         print(f"\n[4] Running queries ({len(selected)} queries)...")
+        if explain:
+            print("  NOTE: Oxigraph exposes no query explanation over HTTP - server timings only for TimescaleDB")
 
         monitors: Dict[str, ResourceMonitor] = {}
         for svc in docker.SCENARIO_CONTAINERS.get(scenario, []):
@@ -581,8 +840,24 @@ def _run_oxigraph(
             if m.start():
                 monitors[cname] = m
 
+        # M2/O2: run the TimescaleDB half of hybrid queries on its own connection
+        hybrid = None
+        if scenario in HYBRID_SCENARIOS and _queries_need_timeseries(selected):
+            query_ts_engine = TimescaleEngine()
+            query_ts_engine.connect()
+            hybrid = HybridExecutor(
+                scenario, engine, query_ts_engine, pipelined=pipelined_hybrid or PIPELINED, fetch=fetch
+            )
+
         t_q0 = time.time()
-        result = _run_queries(engine.get_executor(), scenario, protocol, result, export_dir, query_ids=selected)
+        try:
+            result = _run_queries(
+                engine.get_executor(fetch), scenario, protocol, result, export_dir, query_ids=selected,
+                hybrid=hybrid, fetch=fetch, explain_engine=engine if explain else None,
+            )
+        finally:
+            if hybrid is not None:
+                hybrid.close()
         query_elapsed = time.time() - t_q0
 
         query_stats: Dict[str, Dict] = {"duration_s": round(query_elapsed, 3), "containers": {}}
@@ -603,6 +878,94 @@ def _run_oxigraph(
     return result
 
 
+def _load_dataset_info(export_dir: Path, scenario: str) -> Dict:
+    """Extract dataset info (IDs + timeseries range) for parameterization."""
+    nodes_csv = get_nodes_csv_path(export_dir, scenario)
+    if nodes_csv.exists():
+        dataset_info = extract_dataset_info(nodes_csv, scenario)
+    else:
+        nodes_parquet = export_dir / "parquet" / "nodes.parquet"
+        dataset_info = extract_dataset_info_from_parquet(nodes_parquet)
+
+    # Add timeseries range (prefer CSV if present; else use parquet stats)
+    ts_csv = export_dir / "timeseries.csv"
+    if ts_csv.exists():
+        dataset_info.update(extract_timeseries_range(ts_csv))
+    else:
+        ts_parquet = export_dir / "parquet" / "timeseries.parquet"
+        dataset_info.update(extract_timeseries_range_from_parquet(ts_parquet))
+
+    return dataset_info
+
+
+def _engine_factory(scenario: str):
+    """Return a callable creating a fresh query engine for a scenario."""
+    if scenario in ("P1", "P2"):
+        return lambda: PostgresEngine(scenario)
+    if scenario in ("M1", "M2"):
+        return lambda: MemgraphEngine(scenario)
+    return lambda: OxigraphEngine(scenario)
+
+
+def _workload_setup(
+    scenario: str,
+    export_dir: Path,
+    profile: str,
+    protocol: Protocol,
+    query_ids: list[str],
+) -> tuple[Callable[[], object], Dict[str, list]]:
+    """Client factory and per-query inputs for multi-client workloads.
+
+    M2/O2 clients are HybridClients running both the graph and the
+    TimescaleDB halves, fed (query_id, params) pairs; other scenarios use
+    plain engines fed rendered query texts.
+    """
+    if scenario in HYBRID_SCENARIOS:
+        dataset_info = _load_dataset_info(export_dir, scenario)
+        queries = {
+            qid: [
+                (qid, v) for v in get_query_variants(
+                    query_id=qid, profile=profile, dataset_info=dataset_info, seed=42,
+                    scenario=scenario, n_variants=protocol.n_variants,
+                )
+            ]
+            for qid in query_ids
+        }
+        graph_factory = _engine_factory(scenario)
+        return (lambda: HybridClient(scenario, graph_factory)), queries
+    return _engine_factory(scenario), _build_workload_queries(scenario, export_dir, profile, protocol, query_ids)
+
+
+def _build_workload_queries(
+    scenario: str,
+    export_dir: Path,
+    profile: str,
+    protocol: Protocol,
+    query_ids: list[str],
+) -> Dict[str, list[str]]:
+    """Render every parameter variant of the selected queries up front.
+
+    Returns:
+        query_id -> list of executable query texts
+    """
+    dataset_info = _load_dataset_info(export_dir, scenario)
+    queries: Dict[str, list[str]] = {}
+    for query_id in query_ids:
+        query_text = load_query(scenario, query_id)
+        if not query_text:
+            continue
+        variants = get_query_variants(
+            query_id=query_id,
+            profile=profile,
+            dataset_info=dataset_info,
+            seed=42,
+            scenario=scenario,
+            n_variants=protocol.n_variants,
+        )
+        queries[query_id] = [substitute_params(query_text, v) for v in variants]
+    return queries
+
+
 def _run_queries(
     executor,
     scenario: str,
@@ -610,34 +973,35 @@ def _run_queries(
     result: BenchmarkResult,
     export_dir: Path,
     query_ids: Optional[list[str]] = None,
+    prepared_engine=None,
+    hybrid: Optional[HybridExecutor] = None,
+    fetch: str = "full",
+    explain_engine=None,
 ) -> BenchmarkResult:
     """Run all queries with warmup and measurement using parameter variants.
 
     Args:
-        executor: Function that executes queries (query -> (rows, latency_ms))
+        executor: Function that executes queries (query -> (rows, latency_ms)
+            or, in stream fetch mode, (rows, latency_ms, first_row_ms))
         scenario: Scenario code
         protocol: Benchmark protocol
         result: Result object to update
         export_dir: Export directory for extracting dataset info
+        prepared_engine: Engine with prepare/execute_prepared/explain_prepared.
+            When set, each query is PREPAREd once and variants are run as
+            bind parameters; planning/execution times are recorded per variant.
+        hybrid: M2/O2 executor running graph selection + TimescaleDB end-to-end;
+            latencies are then end-to-end and per-stage times are recorded.
+        fetch: Fetch mode the executor was built with ("full" or "stream")
+        explain_engine: Engine whose explain_query() is run once per variant
+            (hybrid: per engine via HybridExecutor.explain) to record
+            server-side timings next to the wall-clock latencies. Engines
+            without explain_query() (Oxigraph) are skipped.
 
     Returns:
         Updated result
     """
-    # Extract dataset info for parameterization
-    nodes_csv = get_nodes_csv_path(export_dir, scenario)
-    if nodes_csv.exists():
-        dataset_info = extract_dataset_info(nodes_csv, scenario)
-    else:
-        nodes_parquet = export_dir / "parquet" / "nodes.parquet"
-        dataset_info = extract_dataset_info_from_parquet(nodes_parquet)
-
-    # Add timeseries range (prefer CSV if present; else use parquet stats)
-    ts_csv = export_dir / "timeseries.csv"
-    if ts_csv.exists():
-        dataset_info.update(extract_timeseries_range(ts_csv))
-    else:
-        ts_parquet = export_dir / "parquet" / "timeseries.parquet"
-        dataset_info.update(extract_timeseries_range_from_parquet(ts_parquet))
+    dataset_info = _load_dataset_info(export_dir, scenario)
 
     for query_id in (query_ids or QUERIES):
         query_text = load_query(scenario, query_id)
@@ -657,31 +1021,155 @@ def _run_queries(
             n_variants=protocol.n_variants,
         )
 
-        # Warmup with first variant
-        if variants:
-            warmup_query = substitute_params(query_text, variants[0])
-            for _ in range(protocol.n_warmup):
-                try:
-                    executor(warmup_query)
-                except Exception:
-                    pass
-
-        # Measurement runs across all variants
-        for variant in variants:
-            variant_query = substitute_params(query_text, variant)
-            for run in range(protocol.n_runs):
-                try:
-                    rows, latency_ms = executor(variant_query)
-                    qr.latencies_ms.append(latency_ms)
-                    qr.rows = rows
-                except Exception as e:
-                    qr.errors.append(str(e))
+        if hybrid is not None and variants:
+            _run_hybrid_variants(hybrid, query_id, variants, protocol, qr, explain=explain_engine is not None)
+        elif prepared_engine is not None and variants:
+            _run_prepared_variants(prepared_engine, scenario, query_id, query_text, variants, protocol, qr)
+        else:
+            qr.fetch = fetch
+            # Warmup with first variant
+            if variants:
+                warmup_query = substitute_params(query_text, variants[0])
+                for _ in range(protocol.n_warmup):
+                    try:
+                        executor(warmup_query)
+                    except Exception:
+                        pass
+
+            # Measurement runs across all variants
+            for variant in variants:
+                variant_query = substitute_params(query_text, variant)
+                for run in range(protocol.n_runs):
+                    try:
+                        out = executor(variant_query)
+                        rows, latency_ms = out[0], out[1]
+                        qr.latencies_ms.append(latency_ms)
+                        qr.rows = rows
+                        if len(out) > 2:
+                            qr.first_row_ms.append(out[2])
+                    except Exception as e:
+                        qr.errors.append(str(e))
+
+                explain_query = getattr(explain_engine, "explain_query", None)
+                if explain_query is not None:
+                    try:
+                        _record_server_profile(qr, variant, {"query": explain_query(variant_query)})
+                    except Exception as e:
+                        qr.errors.append(f"EXPLAIN failed: {e}")
 
         result.queries[query_id] = qr
         n_total = len(variants) * protocol.n_runs
         status = f"p95={qr.p95_ms:.1f}ms, rows={qr.rows}, variants={len(variants)}, runs={n_total}"
+        if qr.mode == "prepared":
+            status += f", plan={qr.planning_p50_ms:.2f}ms, exec={qr.execution_p50_ms:.2f}ms"
+        if qr.first_row_ms:
+            status += f", first_row={qr.first_row_p50_ms:.1f}ms"
+        if qr.server_ms:
+            status += f", server={qr.server_p50_ms:.1f}ms, client={qr.client_overhead_p50_ms:.1f}ms"
+        if qr.mode == "hybrid":
+            stages = ", ".join(
+                f"{stage[:-3]}={statistics.median(values):.1f}ms"
+                for stage, values in qr.stages_ms.items() if values
+            )
+            status += f", {stages}, point_ids={qr.point_ids}"
+            if hybrid is not None and hybrid.pipelined:
+                status += " [pipelined]"
         if qr.errors:
             status += f", errors={len(qr.errors)}"
         print(f"  [{query_id}] {status}")
 
     return result
+
+
+def _run_hybrid_variants(
+    hybrid: HybridExecutor,
+    query_id: str,
+    variants: list,
+    protocol: Protocol,
+    qr: QueryResult,
+    explain: bool = False,
+) -> None:
+    """Measure an M2/O2 query end-to-end (graph selection + TimescaleDB)."""
+    qr.mode = hybrid.query_type(query_id)
+    qr.fetch = hybrid.fetch
+
+    for _ in range(protocol.n_warmup):
+        try:
+            hybrid.execute(query_id, variants[0])
+        except Exception:
+            pass
+
+    for variant in variants:
+        for run in range(protocol.n_runs):
+            try:
+                timing = hybrid.execute(query_id, variant)
+                qr.latencies_ms.append(timing.total_ms)
+                qr.rows = timing.rows
+                qr.point_ids = timing.n_point_ids
+                if timing.first_row_ms is not None:
+                    qr.first_row_ms.append(timing.first_row_ms)
+                for stage, value in timing.stages().items():
+                    qr.stages_ms.setdefault(stage, []).append(value)
+            except Exception as e:
+                qr.errors.append(str(e))
+
+        if explain:
+            try:
+                profiles = hybrid.explain(query_id, variant)
+                if profiles:
+                    _record_server_profile(qr, variant, profiles)
+            except Exception as e:
+                qr.errors.append(f"EXPLAIN failed: {e}")
+
+
+def _record_server_profile(qr: QueryResult, variant: Dict, profiles: Dict[str, Dict]) -> None:
+    """Store engine-internal timings of one variant (summed over engines) and its plans."""
+    qr.server_ms.append(sum(p["server_ms"] for p in profiles.values()))
+    qr.server_profiles.append({"params": variant, **profiles})
+
+
+def _run_prepared_variants(
+    engine,
+    scenario: str,
+    query_id: str,
+    query_text: str,
+    variants: list,
+    protocol: Protocol,
+    qr: QueryResult,
+) -> None:
+    """Measure a query through server-side prepared statements.
+
+    The statement is PREPAREd once per connection; warmup runs also let
+    PostgreSQL settle on its cached (generic) plan before measurement.
+    """
+    qr.mode = "prepared"
+    stmt_name = f"{scenario}_{query_id}".lower()
+
+    try:
+        qr.prepare_ms = engine.prepare(stmt_name, query_text, variants[0])
+    except Exception as e:
+        qr.errors.append(f"PREPARE failed: {e}")
+        return
+
+    for _ in range(protocol.n_warmup):
+        try:
+            engine.execute_prepared(stmt_name, variants[0])
+        except Exception:
+            pass
+
+    for variant in variants:
+        for run in range(protocol.n_runs):
+            try:
+                rows, latency_ms = engine.execute_prepared(stmt_name, variant)
+                qr.latencies_ms.append(latency_ms)
+                qr.rows = rows
+            except Exception as e:
+                qr.errors.append(str(e))
+
+        # One instrumented run per variant to split planning vs execution
+        try:
+            timing = engine.explain_prepared(stmt_name, variant)
+            qr.planning_ms.append(timing["planning_ms"])
+            qr.execution_ms.append(timing["execution_ms"])
+        except Exception as e:
+            qr.errors.append(f"EXPLAIN failed: {e}")
@@ -0,0 +1,231 @@
+"""Warm per-scenario query sessions.
+
+A ScenarioSession keeps a single engine connection open for the whole
+measurement phase of a scenario and caches everything that does not change
+between queries (dataset info extracted from Parquet, parsed query
+templates, parameter variants). Connection setup and Parquet scans are
+therefore paid once per scenario instead of around every measured query.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .hybrid import HYBRID_LAYOUT, HybridExecutor
+from .params import (
+    extract_dataset_info_from_parquet,
+    extract_timeseries_range_from_parquet,
+    get_query_variants,
+    substitute_params,
+)
+
+
+# Query directory (relative to queries/), file extension and comment prefix by scenario
+SESSION_QUERY_LAYOUT = {
+    "P1": ("p1_p2", ".sql", "--"),
+    "P2": ("p1_p2", ".sql", "--"),
+    "M1": ("m1", ".cypher", "//"),
+    "M2": ("m2/graph", ".cypher", "//"),
+    "O1": ("o1", ".sparql", "#"),
+    "O2": ("o2/graph", ".sparql", "#"),
+}
+
+# Dataset info shared by all sessions of a benchmark run, keyed by parquet dir
+_DATASET_INFO_CACHE: Dict[str, Dict] = {}
+
+
+def get_dataset_info(parquet_dir: Path) -> Dict:
+    """Return dataset info (IDs + timeseries range) for a parquet directory.
+
+    The Parquet files are only scanned on the first call for a given
+    directory; later calls (other scenarios, other RAM levels) reuse it.
+    """
+    key = str(Path(parquet_dir).resolve())
+    info = _DATASET_INFO_CACHE.get(key)
+    if info is None:
+        info = extract_dataset_info_from_parquet(parquet_dir / "nodes.parquet")
+        info.update(extract_timeseries_range_from_parquet(parquet_dir / "timeseries.parquet"))
+        _DATASET_INFO_CACHE[key] = info
+    return info
+
+
+def clear_dataset_info_cache() -> None:
+    """Forget cached dataset info (e.g. after regenerating a dataset)."""
+    _DATASET_INFO_CACHE.clear()
+
+
+def _default_queries_dir() -> Path:
+    # runner/session.py -> parents: runner(0), basetype_benchmark(1), src(2), repo_root(3)
+    return Path(__file__).resolve().parents[3] / "queries"
+
+
+def _profile_from_dataset_path(dataset_path: Path) -> str:
+    """Extract profile name from an export directory name (e.g. large-1w_seed42)."""
+    name = dataset_path.name
+    return name.split("_seed")[0] if "_seed" in name else "small-2d"
+
+
+class ScenarioSession:
+    """One warm engine connection plus cached query inputs for a scenario.
+
+    Usage:
+        with ScenarioSession("P1", dataset_path) as session:
+            for q in QUERIES:
+                row_count, latency_ms, rows = session.execute(q, return_rows=True)
+    """
+
+    def __init__(
+        self,
+        scenario: str,
+        dataset_path: Path,
+        queries_dir: Optional[Path] = None,
+        profile: Optional[str] = None,
+        seed: int = 42,
+    ):
+        """Initialize session (does not connect yet).
+
+        Args:
+            scenario: P1, P2, M1, M2, O1, O2
+            dataset_path: Dataset export directory (containing parquet/)
+            queries_dir: Root of query files (default: repo queries/)
+            profile: Profile name (default: derived from dataset_path)
+            seed: Seed for deterministic parameter variants
+        """
+        self.scenario = scenario.upper()
+        if self.scenario not in SESSION_QUERY_LAYOUT:
+            raise ValueError(f"Unknown scenario: {scenario}")
+
+        self.dataset_path = Path(dataset_path)
+        self.parquet_dir = self.dataset_path / "parquet"
+        self.queries_dir = Path(queries_dir) if queries_dir else _default_queries_dir()
+        self.profile = profile or _profile_from_dataset_path(self.dataset_path)
+        self.seed = seed
+
+        self.engine = None
+        self.hybrid = None  # M2/O2: HybridExecutor over engine + TimescaleDB
+        self.last_timing = None  # HybridTiming of the last hybrid execute()
+        self.connect_s = 0.0
+        self._templates: Dict[str, str] = {}
+        self._params: Dict[str, Dict] = {}
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+
+    def _create_engine(self):
+        from .engines.postgres import PostgresEngine
+        from .engines.memgraph import MemgraphEngine
+        from .engines.oxigraph import OxigraphEngine
+
+        if self.scenario in ("P1", "P2"):
+            return PostgresEngine(self.scenario)
+        if self.scenario in ("M1", "M2"):
+            return MemgraphEngine(self.scenario)
+        return OxigraphEngine(self.scenario)
+
+    def open(self) -> "ScenarioSession":
+        """Connect the engine(s) once for the lifetime of the session.
+
+        Hybrid scenarios (M2/O2) also open a TimescaleDB connection for the
+        timeseries half of Q6-Q13.
+        """
+        if self.engine is None:
+            t0 = time.perf_counter()
+            engine = self._create_engine()
+            engine.connect()
+            self.engine = engine
+            if self.scenario in HYBRID_LAYOUT:
+                from .engines.timescale import TimescaleEngine
+
+                ts_engine = TimescaleEngine()
+                try:
+                    ts_engine.connect()
+                except Exception:
+                    self.close()
+                    raise
+                self.hybrid = HybridExecutor(self.scenario, engine, ts_engine, queries_dir=self.queries_dir)
+            self.connect_s = time.perf_counter() - t0
+        return self
+
+    def close(self) -> None:
+        """Close the engine connection(s) (cached templates/params are kept)."""
+        if self.hybrid is not None:
+            self.hybrid.close()
+            self.hybrid = None
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = None
+
+    def __enter__(self) -> "ScenarioSession":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Cached inputs
+    # ------------------------------------------------------------------
+
+    @property
+    def dataset_info(self) -> Dict:
+        return get_dataset_info(self.parquet_dir)
+
+    def get_template(self, query_id: str) -> str:
+        """Return the comment-stripped query template (with $PARAM placeholders)."""
+        template = self._templates.get(query_id)
+        if template is None:
+            subdir, ext, comment = SESSION_QUERY_LAYOUT[self.scenario]
+            matches = sorted(self.queries_dir.glob(f"{subdir}/{query_id}_*{ext}"))
+            if not matches:
+                raise FileNotFoundError(f"Query {query_id} not found for {self.scenario}")
+            text = matches[0].read_text(encoding="utf-8")
+            lines = [l for l in text.split("\n") if not l.strip().startswith(comment)]
+            template = "\n".join(lines)
+            self._templates[query_id] = template
+        return template
+
+    def get_params(self, query_id: str) -> Dict:
+        """Return the (cached) first parameter variant for a query."""
+        params = self._params.get(query_id)
+        if params is None:
+            variants = get_query_variants(
+                query_id,
+                self.profile,
+                self.dataset_info,
+                seed=self.seed,
+                scenario=self.scenario,
+                n_variants=1,
+            )
+            params = variants[0] if variants else {}
+            self._params[query_id] = params
+        return params
+
+    def render(self, query_id: str, params: Optional[Dict] = None) -> str:
+        """Return executable query text for query_id."""
+        return substitute_params(self.get_template(query_id), params or self.get_params(query_id))
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def execute(self, query_id: str, return_rows: bool = False) -> Tuple[int, float, Optional[List]]:
+        """Execute one query on the warm connection.
+
+        Returns:
+            (row_count, latency_ms, rows_data) - rows_data is None unless return_rows
+        """
+        if self.engine is None:
+            self.open()
+
+        # M2/O2: graph selection + TimescaleDB, end-to-end latency
+        if self.hybrid is not None:
+            timing = self.hybrid.execute(query_id, self.get_params(query_id))
+            self.last_timing = timing
+            return timing.rows, timing.total_ms, (timing.rows_data if return_rows else None)
+
+        query_text = self.render(query_id)
+        if return_rows:
+            rows, latency_ms = self.engine.execute_query_with_results(query_text)
+            return len(rows), latency_ms, rows
+        row_count, latency_ms = self.engine.execute_query(query_text)
+        return row_count, latency_ms, None
@@ -0,0 +1,455 @@
+"""Multi-client workload generation.
+
+The serial loop in scenario._run_queries measures single-user latency only.
+This module drives the same rendered queries from N concurrent clients to
+see how each engine behaves under contention (many BMS dashboards at once).
+
+Closed-loop model: every client owns its own engine connection and sends
+its next query as soon as the previous reply arrived. Each client picks the
+next query from a weighted Q1-Q13 mix and a random parameter variant.
+
+Open-loop model: queries arrive at a fixed rate (Poisson process) no matter
+how fast the engine answers. Latency is measured from the intended send
+time, so a stalled engine shows up as queueing delay instead of silently
+lowering the offered load (coordinated omission).
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .results import ConcurrencyResult
+
+
+# Default query mix: dashboards mostly read recent point series (Q6/Q7) and
+# equipment/zone aggregates, navigation queries (Q1-Q5) are less frequent.
+DEFAULT_QUERY_WEIGHTS = {
+    "Q1": 1.0,
+    "Q2": 1.0,
+    "Q3": 1.0,
+    "Q4": 1.0,
+    "Q5": 1.0,
+    "Q6": 4.0,
+    "Q7": 3.0,
+    "Q8": 2.0,
+    "Q9": 2.0,
+    "Q10": 1.0,
+    "Q11": 1.0,
+    "Q12": 1.0,
+    "Q13": 1.0,
+}
+
+# Default concurrency sweep
+DEFAULT_CONCURRENCY_LEVELS = [1, 4, 16, 32]
+
+# Keep at most this many error messages per level (counts are always exact)
+MAX_ERROR_SAMPLES = 10
+
+# Default open-loop arrival rates (req/s) and sender pool size
+DEFAULT_ARRIVAL_RATES = [5.0, 10.0, 20.0, 50.0, 100.0, 200.0]
+DEFAULT_OPEN_LOOP_CLIENTS = 32
+
+# A level is saturated when throughput falls below this share of the offered
+# rate, tail latency exceeds this multiple of the lightest level, or errors
+# (including dropped arrivals) exceed this rate
+KNEE_MIN_THROUGHPUT_RATIO = 0.9
+KNEE_MAX_P99_FACTOR = 10.0
+KNEE_MAX_ERROR_RATE = 0.01
+
+
+def parse_levels(value: str) -> List[int]:
+    """Parse a comma-separated list of positive integers (e.g. '1,4,16')."""
+    levels = [int(v) for v in value.split(",") if v.strip()]
+    if not levels or any(l <= 0 for l in levels):
+        raise ValueError(f"Invalid levels: {value!r}")
+    return levels
+
+
+def parse_rates(value: str) -> List[float]:
+    """Parse a comma-separated list of positive rates (e.g. '10,50,100')."""
+    rates = [float(v) for v in value.split(",") if v.strip()]
+    if not rates or any(r <= 0 for r in rates):
+        raise ValueError(f"Invalid rates: {value!r}")
+    return rates
+
+
+def _select_mix(queries: Dict[str, List[str]], weights: Optional[Dict[str, float]]) -> tuple:
+    weights = weights or DEFAULT_QUERY_WEIGHTS
+    query_ids = [q for q in queries if queries[q] and weights.get(q, 0) > 0]
+    if not query_ids:
+        raise ValueError("No queries with a positive weight in the workload mix")
+    return query_ids, [weights[q] for q in query_ids]
+
+
+def run_closed_loop(
+    engine_factory: Callable[[], object],
+    queries: Dict[str, List[str]],
+    n_clients: int,
+    duration_s: float,
+    weights: Optional[Dict[str, float]] = None,
+    warmup_s: float = 0.0,
+    seed: int = 42,
+) -> ConcurrencyResult:
+    """Run a closed-loop workload with n_clients concurrent clients.
+
+    Args:
+        engine_factory: Returns a new (unconnected) engine with connect(),
+            close() and get_executor()
+        queries: query_id -> rendered query texts (one per parameter variant)
+        n_clients: Number of concurrent clients (one connection each)
+        duration_s: Measurement window in seconds
+        weights: query_id -> relative weight (default: DEFAULT_QUERY_WEIGHTS)
+        warmup_s: Unmeasured ramp-up before the window starts
+        seed: Base seed; client i uses seed + i for its query choices
+
+    Returns:
+        ConcurrencyResult for this level
+    """
+    query_ids, query_weights = _select_mix(queries, weights)
+    result = ConcurrencyResult(n_clients=n_clients, mode="closed")
+    lock = threading.Lock()
+
+    # All clients connect first, then start together; the window is fixed by
+    # the barrier action, i.e. once every connection is up
+    window = {}
+
+    def open_window() -> None:
+        now = time.perf_counter()
+        window["start"] = now + warmup_s
+        window["end"] = now + warmup_s + duration_s
+
+    ready = threading.Barrier(n_clients + 1, action=open_window)
+
+    def client(idx: int) -> None:
+        rng = random.Random(seed + idx)
+        latencies: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        samples: List[str] = []
+
+        engine = None
+        try:
+            engine = engine_factory()
+            engine.connect()
+            executor = engine.get_executor()
+        except Exception as e:
+            with lock:
+                result.connect_errors += 1
+                if len(result.error_samples) < MAX_ERROR_SAMPLES:
+                    result.error_samples.append(f"connect: {e}")
+            ready.wait()
+            if engine is not None:
+                engine.close()
+            return
+
+        try:
+            ready.wait()
+            measure_from = window["start"]
+            deadline = window["end"]
+
+            while True:
+                query_id = rng.choices(query_ids, weights=query_weights)[0]
+                query = rng.choice(queries[query_id])
+                t_send = time.perf_counter()
+                if t_send >= deadline:
+                    break
+                try:
+                    _, latency_ms = executor(query)
+                    if t_send >= measure_from:
+                        latencies.setdefault(query_id, []).append(latency_ms)
+                except Exception as e:
+                    if t_send >= measure_from:
+                        errors[query_id] = errors.get(query_id, 0) + 1
+                        if len(samples) < MAX_ERROR_SAMPLES:
+                            samples.append(f"{query_id}: {e}")
+        finally:
+            engine.close()
+
+        with lock:
+            for qid, lat in latencies.items():
+                result.latencies_ms.setdefault(qid, []).extend(lat)
+            for qid, n in errors.items():
+                result.errors[qid] = result.errors.get(qid, 0) + n
+            room = MAX_ERROR_SAMPLES - len(result.error_samples)
+            result.error_samples.extend(samples[:max(room, 0)])
+
+    threads = [
+        threading.Thread(target=client, args=(i,), name=f"client-{i}", daemon=True)
+        for i in range(n_clients)
+    ]
+    for t in threads:
+        t.start()
+
+    ready.wait()
+    for t in threads:
+        t.join()
+
+    # Only queries sent inside the window are counted, so QPS uses the window
+    result.duration_s = duration_s
+    return result
+
+
+def run_concurrency_sweep(
+    engine_factory: Callable[[], object],
+    queries: Dict[str, List[str]],
+    levels: List[int],
+    duration_s: float,
+    weights: Optional[Dict[str, float]] = None,
+    warmup_s: float = 5.0,
+    seed: int = 42,
+) -> List[ConcurrencyResult]:
+    """Run the closed-loop workload at each concurrency level.
+
+    Returns:
+        One ConcurrencyResult per level, in the order given
+    """
+    results = []
+    for n_clients in levels:
+        level = run_closed_loop(
+            engine_factory,
+            queries,
+            n_clients=n_clients,
+            duration_s=duration_s,
+            weights=weights,
+            warmup_s=warmup_s,
+            seed=seed,
+        )
+        status = (
+            f"qps={level.qps:.1f}, p95={level.p95_ms:.1f}ms, "
+            f"ok={level.completed}, errors={level.failed}"
+        )
+        if level.connect_errors:
+            status += f", connect_errors={level.connect_errors}"
+        print(f"  [C={n_clients}] {status}")
+        results.append(level)
+    return results
+
+
+def run_open_loop(
+    engine_factory: Callable[[], object],
+    queries: Dict[str, List[str]],
+    rate_qps: float,
+    duration_s: float,
+    n_clients: int = DEFAULT_OPEN_LOOP_CLIENTS,
+    weights: Optional[Dict[str, float]] = None,
+    warmup_s: float = 0.0,
+    drain_s: Optional[float] = None,
+    seed: int = 42,
+) -> ConcurrencyResult:
+    """Issue queries at a fixed Poisson arrival rate.
+
+    The arrival schedule is drawn up front. A pool of n_clients senders (one
+    connection each) takes the next scheduled query, waits until its intended
+    send time if early, and runs it. When every sender is busy, arrivals queue
+    up and their latency includes that wait.
+
+    Args:
+        engine_factory: Returns a new (unconnected) engine
+        queries: query_id -> rendered query texts (one per parameter variant)
+        rate_qps: Target arrival rate (req/s)
+        duration_s: Length of the measured arrival window
+        n_clients: Sender pool size (upper bound on in-flight queries)
+        weights: query_id -> relative weight (default: DEFAULT_QUERY_WEIGHTS)
+        warmup_s: Unmeasured arrivals before the window
+        drain_s: Time allowed after the window to work off the backlog
+            (default: duration_s); arrivals still unsent are counted as dropped
+        seed: Seed for arrivals and query choices
+
+    Returns:
+        ConcurrencyResult (mode='open')
+    """
+    query_ids, query_weights = _select_mix(queries, weights)
+    if drain_s is None:
+        drain_s = duration_s
+
+    # Arrival schedule: (offset_s from start, query_id, query text)
+    rng = random.Random(seed)
+    schedule = []
+    offset = 0.0
+    while True:
+        offset += rng.expovariate(rate_qps)
+        if offset >= warmup_s + duration_s:
+            break
+        query_id = rng.choices(query_ids, weights=query_weights)[0]
+        schedule.append((offset, query_id, rng.choice(queries[query_id])))
+
+    result = ConcurrencyResult(n_clients=n_clients, mode="open", target_qps=rate_qps)
+    lock = threading.Lock()
+    state = {"next": 0, "last_done": 0.0}
+
+    def start_clock() -> None:
+        state["t0"] = time.perf_counter()
+
+    ready = threading.Barrier(n_clients + 1, action=start_clock)
+
+    def sender() -> None:
+        latencies: Dict[str, List[float]] = {}
+        service: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        samples: List[str] = []
+        last_done = 0.0
+
+        engine = None
+        try:
+            engine = engine_factory()
+            engine.connect()
+            executor = engine.get_executor()
+        except Exception as e:
+            with lock:
+                result.connect_errors += 1
+                if len(result.error_samples) < MAX_ERROR_SAMPLES:
+                    result.error_samples.append(f"connect: {e}")
+            ready.wait()
+            if engine is not None:
+                engine.close()
+            return
+
+        try:
+            ready.wait()
+            t0 = state["t0"]
+            hard_stop = t0 + warmup_s + duration_s + drain_s
+
+            while True:
+                with lock:
+                    idx = state["next"]
+                    if idx >= len(schedule):
+                        break
+                    if time.perf_counter() >= hard_stop:
+                        # Backlog not worked off in time: drop what is left
+                        result.dropped += sum(1 for s in schedule[idx:] if s[0] >= warmup_s)
+                        state["next"] = len(schedule)
+                        break
+                    state["next"] = idx + 1
+
+                offset, query_id, query = schedule[idx]
+                intended = t0 + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                measured = offset >= warmup_s
+                try:
+                    _, service_ms = executor(query)
+                    done = time.perf_counter()
+                    if measured:
+                        latencies.setdefault(query_id, []).append((done - intended) * 1000)
+                        service.setdefault(query_id, []).append(service_ms)
+                        last_done = max(last_done, done)
+                except Exception as e:
+                    if measured:
+                        errors[query_id] = errors.get(query_id, 0) + 1
+                        if len(samples) < MAX_ERROR_SAMPLES:
+                            samples.append(f"{query_id}: {e}")
+        finally:
+            engine.close()
+
+        with lock:
+            for qid, lat in latencies.items():
+                result.latencies_ms.setdefault(qid, []).extend(lat)
+            for qid, lat in service.items():
+                result.service_ms.setdefault(qid, []).extend(lat)
+            for qid, n in errors.items():
+                result.errors[qid] = result.errors.get(qid, 0) + n
+            room = MAX_ERROR_SAMPLES - len(result.error_samples)
+            result.error_samples.extend(samples[:max(room, 0)])
+            state["last_done"] = max(state["last_done"], last_done)
+
+    threads = [
+        threading.Thread(target=sender, name=f"sender-{i}", daemon=True)
+        for i in range(n_clients)
+    ]
+    for t in threads:
+        t.start()
+    ready.wait()
+    for t in threads:
+        t.join()
+
+    # Achieved throughput: measured completions over the time it took to
+    # serve them (longer than the window once the engine falls behind)
+    window_start = state["t0"] + warmup_s
+    result.duration_s = max(duration_s, state["last_done"] - window_start)
+    return result
+
+
+def is_saturated(
+    level: ConcurrencyResult,
+    baseline_p99_ms: float,
+    min_throughput_ratio: float = KNEE_MIN_THROUGHPUT_RATIO,
+    max_p99_factor: float = KNEE_MAX_P99_FACTOR,
+    max_error_rate: float = KNEE_MAX_ERROR_RATE,
+) -> bool:
+    """True if an open-loop level is past the knee.
+
+    baseline_p99_ms is the p99 of the lightest level of the sweep.
+    """
+    return (
+        level.completed == 0
+        or level.qps < min_throughput_ratio * level.target_qps
+        or level.error_rate > max_error_rate
+        or (baseline_p99_ms > 0 and level.p99_ms > max_p99_factor * baseline_p99_ms)
+    )
+
+
+def find_saturation_knee(levels: List[ConcurrencyResult]) -> Optional[float]:
+    """Return the highest arrival rate served before saturation.
+
+    Levels are taken in increasing target_qps order; the first saturated
+    level ends the search. Returns None if even the lightest level is
+    saturated.
+    """
+    ordered = sorted(levels, key=lambda l: l.target_qps)
+    if not ordered:
+        return None
+
+    baseline_p99 = ordered[0].p99_ms
+    knee = None
+    for level in ordered:
+        if is_saturated(level, baseline_p99):
+            break
+        knee = level.target_qps
+    return knee
+
+
+def run_arrival_rate_sweep(
+    engine_factory: Callable[[], object],
+    queries: Dict[str, List[str]],
+    rates: List[float],
+    duration_s: float,
+    n_clients: int = DEFAULT_OPEN_LOOP_CLIENTS,
+    weights: Optional[Dict[str, float]] = None,
+    warmup_s: float = 5.0,
+    seed: int = 42,
+) -> tuple:
+    """Run the open-loop workload at increasing arrival rates.
+
+    The sweep stops at the first saturated rate: higher rates would only
+    grow the backlog.
+
+    Returns:
+        (levels, knee_qps) - one ConcurrencyResult per rate run, and the
+        highest rate served before saturation (None if none was)
+    """
+    levels: List[ConcurrencyResult] = []
+    for rate in sorted(rates):
+        level = run_open_loop(
+            engine_factory,
+            queries,
+            rate_qps=rate,
+            duration_s=duration_s,
+            n_clients=n_clients,
+            weights=weights,
+            warmup_s=warmup_s,
+            seed=seed,
+        )
+        levels.append(level)
+        status = (
+            f"qps={level.qps:.1f}, p95={level.p95_ms:.1f}ms, p99={level.p99_ms:.1f}ms, "
+            f"ok={level.completed}, errors={level.failed}, dropped={level.dropped}"
+        )
+        print(f"  [R={rate:g}/s] {status}")
+        if is_saturated(level, levels[0].p99_ms):
+            print(f"  [R={rate:g}/s] saturated, stopping sweep")
+            break
+
+    knee = find_saturation_knee(levels)
+    return levels, knee